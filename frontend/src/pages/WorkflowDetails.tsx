@@ -41,6 +41,7 @@ interface NodeExecution {
   status: string;
   input_data?: any;
   output_data?: any;
+  output_in_blob?: boolean;
   error_message?: string;
   started_at?: string;
   completed_at?: string;
@@ -57,6 +58,8 @@ function WorkflowDetails() {
   const [showOutput, setShowOutput] = useState(false);
   const [outputData, setOutputData] = useState<any>(null);
   const [isRerunning, setIsRerunning] = useState(false);
+  // Full outputs fetched for executions whose output is kept in the blob store
+  const [loadedOutputs, setLoadedOutputs] = useState<Record<string, any>>({});
 
   useEffect(() => {
     fetchWorkflowDetails();
@@ -106,12 +109,44 @@ function WorkflowDetails() {
     if (runExecutions.length > 0) {
       const outputExecution = runExecutions.find(ex => ex.node_type === 'output' && ex.status === 'success');
       if (outputExecution && outputExecution.output_data) {
-        setOutputData(outputExecution.output_data);
-        setShowOutput(true);
+        if (outputExecution.output_in_blob) {
+          loadFullOutput(outputExecution).then(full => {
+            if (full !== undefined) {
+              setOutputData(full);
+              setShowOutput(true);
+            }
+          });
+        } else {
+          setOutputData(outputExecution.output_data);
+          setShowOutput(true);
+        }
       }
     }
   }, [runExecutions]);
 
+  // Large outputs come back as {"$blob", size_bytes, summary}; fetch on demand
+  const isUnloadedBlob = (execution: NodeExecution) =>
+    !!execution.output_in_blob && !(execution.id in loadedOutputs);
+
+  const outputOf = (execution: NodeExecution) => loadedOutputs[execution.id] ?? execution.output_data;
+
+  const loadFullOutput = async (execution: NodeExecution) => {
+    if (execution.id in loadedOutputs) return loadedOutputs[execution.id];
+    try {
+      const response = await fetch(
+        apiUrl(`/api/nodes/${selectedRun}/nodes/${execution.node_id}?execution_id=${execution.id}`)
+      );
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      const data = await response.json();
+      setLoadedOutputs(prev => ({ ...prev, [execution.id]: data.output_data }));
+      return data.output_data;
+    } catch (err) {
+      console.error('Failed to load node output:', err);
+      toast.error('Failed to load node output');
+      return undefined;
+    }
+  };
+
   const fetchWorkflowDetails = async () => {
     try {
       const response = await fetch(apiUrl(`/api/workflows/${id}/details`));
@@ -496,19 +531,36 @@ function WorkflowDetails() {
                         )}
 
                         {/* Output Data */}
-                        {execution.output_data && (
+                        {outputOf(execution) && (
                           <details className="mt-1" open>
                             <summary className="text-xs font-medium text-gray-700 cursor-pointer hover:text-gray-900">
                               Output
                             </summary>
                             <div className="mt-1 p-2 bg-white rounded border border-gray-200 max-h-48 overflow-y-auto">
+                              {/* Large output kept in the blob store: summary until loaded */}
+                              {isUnloadedBlob(execution) ? (
+                                <div className="space-y-1">
+                                  <p className="text-xs text-gray-600">
+                                    Large output ({Math.round(outputOf(execution).size_bytes / 1024)} KB)
+                                  </p>
+                                  <pre className="text-xs text-gray-600 whitespace-pre-wrap break-words">
+                                    {JSON.stringify(outputOf(execution).summary, null, 2)}
+                                  </pre>
+                                  <button
+                                    onClick={() => loadFullOutput(execution)}
+                                    className="text-xs font-medium text-indigo-600 hover:text-indigo-800"
+                                  >
+                                    Load full output
+                                  </button>
+                                </div>
+                              ) : (<>
                               {/* Pretty display for articles */}
-                              {execution.output_data.articles && (
+                              {outputOf(execution).articles && (
                                 <div className="space-y-1">
                                   <p className="text-xs font-medium text-gray-700">
-                                    Fetched {execution.output_data.articles.length} articles
+                                    Fetched {outputOf(execution).articles.length} articles
                                   </p>
-                                  {execution.output_data.articles.slice(0, 2).map((article: any, idx: number) => (
+                                  {outputOf(execution).articles.slice(0, 2).map((article: any, idx: number) => (
                                     <div key={idx} className="text-xs text-gray-600 border-l-2 border-blue-300 pl-2">
                                       <p className="font-medium">{article.title}</p>
                                       {article.error && (
@@ -520,19 +572,19 @@ function WorkflowDetails() {
                               )}
 
                               {/* Pretty display for summaries */}
-                              {execution.output_data.individual_summaries && (
+                              {outputOf(execution).individual_summaries && (
                                 <div className="space-y-2">
-                                  {execution.output_data.individual_summaries.map((summary: any, idx: number) => (
+                                  {outputOf(execution).individual_summaries.map((summary: any, idx: number) => (
                                     <div key={idx} className="border-l-2 border-green-300 pl-2">
                                       <p className="text-xs font-medium text-gray-800">{summary.article_title}</p>
                                       <p className="text-xs text-gray-600 mt-0.5">{summary.summary}</p>
                                     </div>
                                   ))}
-                                  {execution.output_data.combined_summary && (
+                                  {outputOf(execution).combined_summary && (
                                     <div className="mt-2 p-2 bg-indigo-50 rounded border border-indigo-200">
                                       <p className="text-xs font-medium text-indigo-900">Combined:</p>
                                       <p className="text-xs text-indigo-700 mt-0.5">
-                                        {execution.output_data.combined_summary.overview}
+                                        {outputOf(execution).combined_summary.overview}
                                       </p>
                                     </div>
                                   )}
@@ -540,11 +592,12 @@ function WorkflowDetails() {
                               )}
 
                               {/* Fallback to JSON */}
-                              {!execution.output_data.articles && !execution.output_data.individual_summaries && (
+                              {!outputOf(execution).articles && !outputOf(execution).individual_summaries && (
                                 <pre className="text-xs text-gray-600 whitespace-pre-wrap break-words">
-                                  {JSON.stringify(execution.output_data, null, 2)}
+                                  {JSON.stringify(outputOf(execution), null, 2)}
                                 </pre>
                               )}
+                              </>)}
                             </div>
                           </details>
                         )}
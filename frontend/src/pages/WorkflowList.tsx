@@ -12,14 +12,19 @@ interface Workflow {
 
 function WorkflowList() {
   const [workflows, setWorkflows] = useState<Workflow[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const navigate = useNavigate();
 
-  const fetchWorkflows = () => {
-    fetch(apiUrl('/api/workflows/'))
+  // Pages are newest first; without a cursor the list starts over
+  const fetchWorkflows = (cursor?: string) => {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    fetch(apiUrl(`/api/workflows/${query}`))
       .then(res => res.json())
       .then(data => {
-        setWorkflows(data || []);
+        const page: Workflow[] = data?.workflows || [];
+        setWorkflows(prev => (cursor ? [...prev, ...page] : page));
+        setNextCursor(data?.next_cursor ?? null);
         setLoading(false);
       })
       .catch(err => {
@@ -190,6 +195,16 @@ function WorkflowList() {
                   </tbody>
                 </table>
               </div>
+              {nextCursor && (
+                <div className="mt-4 text-center">
+                  <button
+                    onClick={() => fetchWorkflows(nextCursor)}
+                    className="inline-flex items-center justify-center rounded-md border border-gray-300 bg-white px-3 py-2 text-sm font-medium text-gray-700 shadow-sm hover:bg-gray-50"
+                  >
+                    Load more
+                  </button>
+                </div>
+              )}
             </div>
           </div>
         </div>
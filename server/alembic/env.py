@@ -13,6 +13,7 @@ from app.models import (
     WorkflowVersion,
     WorkflowRun,
     NodeExecution,
+    RunPayload,
     HumanTask,
     User,
     Organization,
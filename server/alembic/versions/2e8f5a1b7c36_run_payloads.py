@@ -0,0 +1,32 @@
+"""Run payloads: node inputs shared across a run, stored once
+
+Revision ID: 2e8f5a1b7c36
+Revises: 9c4d2a6e1f73
+Create Date: 2026-10-17 16:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e8f5a1b7c36'
+down_revision = '9c4d2a6e1f73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('run_payloads',
+    sa.Column('run_id', sa.String(), nullable=False),
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['run_id'], ['workflow_runs.id'], ),
+    sa.PrimaryKeyConstraint('run_id', 'hash')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('run_payloads')
@@ -0,0 +1,32 @@
+"""Run leases for Postgres-based run claiming
+
+Revision ID: 5b1e7c2d9f40
+Revises: 734374aa0282
+Create Date: 2026-10-17 10:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e7c2d9f40'
+down_revision = '734374aa0282'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('workflow_runs', sa.Column('lease_owner', sa.String(), nullable=True))
+    op.add_column('workflow_runs', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('workflow_runs', sa.Column('claim_count', sa.Integer(), nullable=False, server_default='0'))
+    op.create_index('ix_workflow_runs_status_started_at', 'workflow_runs', ['status', 'started_at'])
+    op.create_index('ix_workflow_runs_status_lease_expires_at', 'workflow_runs', ['status', 'lease_expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workflow_runs_status_lease_expires_at', table_name='workflow_runs')
+    op.drop_index('ix_workflow_runs_status_started_at', table_name='workflow_runs')
+    op.drop_column('workflow_runs', 'claim_count')
+    op.drop_column('workflow_runs', 'lease_expires_at')
+    op.drop_column('workflow_runs', 'lease_owner')
@@ -0,0 +1,26 @@
+"""Blob references for large node outputs
+
+Revision ID: 6a3f9d0c8b21
+Revises: 2e8f5a1b7c36
+Create Date: 2026-10-17 18:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a3f9d0c8b21'
+down_revision = '2e8f5a1b7c36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('node_executions', sa.Column('output_blob', sa.String(length=64), nullable=True))
+    op.create_index('ix_node_executions_output_blob', 'node_executions', ['output_blob'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_node_executions_output_blob', table_name='node_executions')
+    op.drop_column('node_executions', 'output_blob')
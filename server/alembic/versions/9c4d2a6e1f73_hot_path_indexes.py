@@ -0,0 +1,71 @@
+"""Indexes for hot lookups; unique workflow version numbers
+
+Revision ID: 9c4d2a6e1f73
+Revises: 5b1e7c2d9f40
+Create Date: 2026-10-17 14:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4d2a6e1f73'
+down_revision = '5b1e7c2d9f40'
+branch_labels = None
+depends_on = None
+
+
+def _renumber_duplicate_versions() -> None:
+    """Give versions that collided under concurrent saves fresh numbers
+    (after the workflow's highest) so the unique constraint can be added."""
+    bind = op.get_bind()
+    versions = sa.table(
+        'workflow_versions',
+        sa.column('id', sa.String),
+        sa.column('workflow_id', sa.String),
+        sa.column('version', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+    )
+    duplicates = bind.execute(
+        sa.select(versions.c.workflow_id, versions.c.version)
+        .group_by(versions.c.workflow_id, versions.c.version)
+        .having(sa.func.count() > 1)
+    ).all()
+    for workflow_id, version in duplicates:
+        latest = bind.execute(
+            sa.select(sa.func.max(versions.c.version)).where(versions.c.workflow_id == workflow_id)
+        ).scalar()
+        ids = bind.execute(
+            sa.select(versions.c.id)
+            .where(versions.c.workflow_id == workflow_id, versions.c.version == version)
+            .order_by(versions.c.created_at, versions.c.id)
+        ).scalars().all()
+        # The earliest keeps its number
+        for offset, version_id in enumerate(ids[1:], start=1):
+            bind.execute(
+                versions.update().where(versions.c.id == version_id).values(version=latest + offset)
+            )
+
+
+def upgrade() -> None:
+    op.create_index('ix_node_executions_run_id_started_at', 'node_executions', ['run_id', 'started_at'])
+    op.create_index('ix_workflow_runs_workflow_id_started_at', 'workflow_runs', ['workflow_id', 'started_at'])
+    op.create_index(
+        'ix_workflow_versions_workflow_id_is_published_version',
+        'workflow_versions',
+        ['workflow_id', 'is_published', 'version'],
+    )
+    _renumber_duplicate_versions()
+    with op.batch_alter_table('workflow_versions') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_workflow_versions_workflow_id_version', ['workflow_id', 'version']
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('workflow_versions') as batch_op:
+        batch_op.drop_constraint('uq_workflow_versions_workflow_id_version', type_='unique')
+    op.drop_index('ix_workflow_versions_workflow_id_is_published_version', table_name='workflow_versions')
+    op.drop_index('ix_workflow_runs_workflow_id_started_at', table_name='workflow_runs')
+    op.drop_index('ix_node_executions_run_id_started_at', table_name='node_executions')
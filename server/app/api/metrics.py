@@ -0,0 +1,28 @@
+import asyncio
+
+from fastapi import APIRouter
+
+from app.core.security import dns_cache
+from app.services.execution_plan import plan_cache
+from app.services.http_cache import article_cache
+from app.services.llm_cache import llm_cache
+from app.services.rate_limiter import gemini_rate_limiter
+from app.services.run_executor import run_executor
+from app.services.run_queue import run_queue
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_metrics():
+    """Process-local cache counters (hit rates, saved latency), LLM quota waits
+    and run queue / executor gauges"""
+    return {
+        "llm_cache": llm_cache.stats() if llm_cache else None,
+        "article_cache": article_cache.stats() if article_cache else None,
+        "dns_cache": dns_cache.stats(),
+        "plan_cache": plan_cache.stats(),
+        "llm_rate_limit": gemini_rate_limiter.stats(),
+        "run_queue": await asyncio.to_thread(run_queue.stats) if run_queue else None,
+        "run_executor": run_executor.stats() if run_executor.started else None,
+    }
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from typing import Optional
+import asyncio
 
 from app.db.session import get_db
+from app.models.run import NodeExecution, WorkflowRun
+from app.services.blob_store import blob_store
+from app.services.run_payloads import TRIGGER_REF, expand, load_payloads, references
 
 router = APIRouter()
 
@@ -14,11 +19,81 @@ async def list_nodes():
 
 @router.get("/{run_id}/nodes")
 async def list_node_executions(run_id: str, db: Session = Depends(get_db)):
-    """List node executions for a run"""
-    return {"nodes": []}
+    """List node executions for a run, without their inputs and outputs"""
+    if not db.query(WorkflowRun.id).filter(WorkflowRun.id == run_id).first():
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    executions = db.query(
+        NodeExecution.id,
+        NodeExecution.node_id,
+        NodeExecution.node_type,
+        NodeExecution.status,
+        NodeExecution.output_blob,
+        NodeExecution.error_message,
+        NodeExecution.retry_count,
+        NodeExecution.started_at,
+        NodeExecution.completed_at,
+    ).filter(NodeExecution.run_id == run_id).order_by(NodeExecution.started_at).all()
+
+    return {
+        "nodes": [
+            {
+                "id": ex.id,
+                "node_id": ex.node_id,
+                "node_type": ex.node_type,
+                "status": ex.status.value,
+                "output_in_blob": ex.output_blob is not None,
+                "error_message": ex.error_message,
+                "retry_count": ex.retry_count,
+                "started_at": ex.started_at.isoformat() if ex.started_at else None,
+                "completed_at": ex.completed_at.isoformat() if ex.completed_at else None
+            }
+            for ex in executions
+        ]
+    }
 
 
 @router.get("/{run_id}/nodes/{node_id}")
-async def get_node_execution(run_id: str, node_id: str, db: Session = Depends(get_db)):
-    """Get node execution details"""
-    return {"run_id": run_id, "node_id": node_id}
+async def get_node_execution(
+    run_id: str,
+    node_id: str,
+    execution_id: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get a node execution with its full input and output.
+
+    Outputs kept in the blob store are loaded here; run details only carry
+    a reference and summary. Without ``execution_id`` the latest execution
+    of the node is returned.
+    """
+    query = db.query(NodeExecution).filter(
+        NodeExecution.run_id == run_id, NodeExecution.node_id == node_id
+    )
+    if execution_id:
+        query = query.filter(NodeExecution.id == execution_id)
+    ex = query.order_by(NodeExecution.started_at.desc()).first()
+    if not ex:
+        raise HTTPException(status_code=404, detail="Node execution not found")
+
+    payloads = load_payloads(db, run_id, references(ex.input_data))
+    trigger_data = None
+    if ex.input_data == TRIGGER_REF:
+        trigger_data = db.query(WorkflowRun.trigger_data).filter(WorkflowRun.id == run_id).scalar()
+    try:
+        output = await asyncio.to_thread(blob_store.load_output, ex.output_data, ex.output_blob)
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="Node output is no longer stored")
+
+    return {
+        "id": ex.id,
+        "run_id": run_id,
+        "node_id": ex.node_id,
+        "node_type": ex.node_type,
+        "status": ex.status.value,
+        "input_data": expand(ex.input_data, payloads, trigger_data),
+        "output_data": output,
+        "error_message": ex.error_message,
+        "retry_count": ex.retry_count,
+        "started_at": ex.started_at.isoformat() if ex.started_at else None,
+        "completed_at": ex.completed_at.isoformat() if ex.completed_at else None
+    }
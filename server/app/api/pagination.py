@@ -0,0 +1,73 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered newest first on a sort key that ends in a unique column
+(e.g. ``(started_at, id)``). The cursor is the key of the last row of the
+previous page, so fetching page N costs the same as page 1 and rows
+inserted meanwhile never shift or duplicate entries, unlike OFFSET.
+Cursors are opaque URL-safe strings; clients pass back ``next_cursor``
+until it is null.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[Any, ...]:
+    """Key encoded in ``cursor``; 400 if it is not a cursor of ``size`` values."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+        if not isinstance(key, list) or len(key) != size:
+            raise ValueError(key)
+        return tuple(_decode_value(v) for v in key)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query, columns: Sequence[Any], cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Return one page of ``query`` in descending ``columns`` order and the
+    cursor of the next page (None on the last page).
+
+    ``columns`` must identify rows uniquely (end with the primary key) and
+    be selected by the query (rows are read back with ``getattr``).
+    """
+    if cursor:
+        key = decode_cursor(cursor, len(columns))
+        # (c1, c2, ...) < (k1, k2, ...), spelled out for every backend
+        clauses = []
+        for i, column in enumerate(columns):
+            equal = [columns[j] == key[j] for j in range(i)]
+            clauses.append(and_(*equal, column < key[i]))
+        query = query.filter(or_(*clauses))
+    rows = query.order_by(*(c.desc() for c in columns)).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, c.key) for c in columns])
@@ -1,22 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import Optional
+import asyncio
+import redis
 import uuid
 from datetime import datetime
 
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
+from app.core.config import settings
 from app.db.session import get_db
 from app.models.workflow import WorkflowVersion
 from app.models.run import WorkflowRun, NodeExecution, RunStatus
 from app.schemas.workflow import WorkflowRunCreate, WorkflowRunResponse
-from app.services.workflow_executor import WorkflowExecutor
+from app.services.run_payloads import expand, load_payloads, references
+from app.services.run_queue import run_queue
+from app.services.run_executor import ExecutorFull, run_executor
 
 router = APIRouter()
 
+_RUN_SUMMARY_COLUMNS = (
+    WorkflowRun.id,
+    WorkflowRun.workflow_id,
+    WorkflowRun.status,
+    WorkflowRun.started_at,
+    WorkflowRun.completed_at,
+)
+
 
 @router.get("/")
-async def list_runs(db: Session = Depends(get_db)):
-    """List all workflow runs"""
-    runs = db.query(WorkflowRun).order_by(WorkflowRun.started_at.desc()).all()
-    return {
+async def list_runs(
+    workflow_id: Optional[str] = None,
+    status: Optional[RunStatus] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    all_runs: bool = Query(False, alias="all"),
+    db: Session = Depends(get_db)
+):
+    """List workflow runs, newest first, one page at a time.
+
+    Pass ``next_cursor`` back as ``cursor`` for the following page.
+    ``all=true`` returns every matching run in one response (legacy).
+    Only summary columns are loaded, never trigger data.
+    """
+    query = db.query(*_RUN_SUMMARY_COLUMNS)
+    if workflow_id:
+        query = query.filter(WorkflowRun.workflow_id == workflow_id)
+    if status:
+        query = query.filter(WorkflowRun.status == status)
+
+    if all_runs:
+        runs, next_cursor = query.order_by(WorkflowRun.started_at.desc()).all(), None
+    else:
+        runs, next_cursor = paginate(
+            query, (WorkflowRun.started_at, WorkflowRun.id), cursor, limit
+        )
+
+    response = {
         "runs": [
             {
                 "id": run.id,
@@ -28,12 +67,59 @@ async def list_runs(db: Session = Depends(get_db)):
             for run in runs
         ]
     }
+    if not all_runs:
+        response["next_cursor"] = next_cursor
+    return response
+
+
+async def _start_execution(run: WorkflowRun, db: Session) -> str:
+    """Hand a PENDING run to the configured backend; returns a status message."""
+    if settings.RUN_BACKEND == "postgres":
+        # Claimed from the table by a `python -m app.worker` process
+        message = "Workflow execution queued"
+    elif run_queue is not None:
+        # Executed by a `python -m app.worker` process
+        try:
+            await asyncio.to_thread(run_queue.enqueue, run.id)
+        except redis.RedisError as e:
+            run.status = RunStatus.FAILED
+            run.error_message = f"Could not queue run: {e}"
+            run.completed_at = datetime.utcnow()
+            db.commit()
+            raise HTTPException(status_code=503, detail="Run queue unavailable")
+        message = "Workflow execution queued"
+    else:
+        try:
+            run_executor.submit(run.id)
+        except ExecutorFull:
+            run.status = RunStatus.FAILED
+            run.error_message = "Rejected: run executor is at capacity"
+            run.completed_at = datetime.utcnow()
+            db.commit()
+            raise HTTPException(status_code=503, detail="Too many runs in progress, retry later")
+        message = "Workflow execution started"
+    return message
+
+
+async def _owned(run: WorkflowRun) -> bool:
+    """Whether the configured backend still holds a run: a PENDING one it
+    will execute or a RUNNING one it is executing."""
+    if settings.RUN_BACKEND == "postgres":
+        if run.status == RunStatus.RUNNING:
+            return bool(run.lease_expires_at and run.lease_expires_at > datetime.utcnow())
+        # Workers claim PENDING rows straight from the table
+        return True
+    if run_queue is not None:
+        try:
+            return await asyncio.to_thread(run_queue.contains, run.id)
+        except redis.RedisError:
+            raise HTTPException(status_code=503, detail="Run queue unavailable")
+    return run_executor.owns(run.id)
 
 
 @router.post("/")
 async def create_run(
     run_data: WorkflowRunCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Start a new workflow run"""
@@ -60,27 +146,62 @@ async def create_run(
     db.commit()
     db.refresh(run)
     
-    run_id = run.id
-    
-    # Execute workflow in background with new session
-    def execute_in_background():
-        from app.db.session import SessionLocal
-        import asyncio
-        
-        db_session = SessionLocal()
-        try:
-            executor = WorkflowExecutor(db_session)
-            asyncio.run(executor.execute_workflow(run_id))
-        finally:
-            db_session.close()
-    
-    background_tasks.add_task(execute_in_background)
-    
+    message = await _start_execution(run, db)
+
     return {
         "id": run.id,
         "workflow_id": run.workflow_id,
         "status": run.status.value,
-        "message": "Workflow execution started"
+        "message": message
+    }
+
+
+@router.post("/{run_id}/resume")
+async def resume_run(run_id: str, force: bool = False, db: Session = Depends(get_db)):
+    """Resume a failed or interrupted run after its last completed nodes.
+
+    Nodes that succeeded (or were skipped) in earlier attempts keep their
+    stored output; failed and unfinished nodes run again. A run still marked
+    RUNNING is only resumed with ``force=true`` (its executor died without
+    recording it) and never while a worker holds its lease or a backend is
+    still executing it. The same goes for a PENDING run that no backend
+    will pick up (it was queued in a process that has since stopped).
+    """
+    run = db.query(WorkflowRun).filter(WorkflowRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if run.status == RunStatus.PENDING:
+        if not force:
+            raise HTTPException(
+                status_code=409, detail="Run is already waiting to execute; pass force=true if it was lost"
+            )
+        if await _owned(run):
+            raise HTTPException(status_code=409, detail="Run is already waiting to execute")
+    if run.status == RunStatus.RUNNING:
+        if not force:
+            raise HTTPException(
+                status_code=409, detail="Run is still running; pass force=true if its executor died"
+            )
+        if run.lease_expires_at and run.lease_expires_at > datetime.utcnow():
+            raise HTTPException(status_code=409, detail="Run is held by a worker")
+        if await _owned(run):
+            raise HTTPException(status_code=409, detail="Run is still executing")
+
+    run.status = RunStatus.PENDING
+    run.error_message = None
+    run.completed_at = None
+    run.lease_owner = None
+    run.lease_expires_at = None
+    run.claim_count = 0
+    db.commit()
+
+    message = await _start_execution(run, db)
+    return {
+        "id": run.id,
+        "workflow_id": run.workflow_id,
+        "status": run.status.value,
+        "message": message,
+        "resumed": True
     }
 
 
@@ -95,7 +216,12 @@ async def get_run(run_id: str, db: Session = Depends(get_db)):
     executions = db.query(NodeExecution).filter(
         NodeExecution.run_id == run_id
     ).order_by(NodeExecution.started_at).all()
-    
+
+    # Large inputs are stored once per run and referenced by hash
+    payloads = load_payloads(
+        db, run_id, set().union(*(references(ex.input_data) for ex in executions))
+    )
+
     return {
         "id": run.id,
         "workflow_id": run.workflow_id,
@@ -110,8 +236,9 @@ async def get_run(run_id: str, db: Session = Depends(get_db)):
                 "node_id": ex.node_id,
                 "node_type": ex.node_type,
                 "status": ex.status.value,
-                "input_data": ex.input_data,
+                "input_data": expand(ex.input_data, payloads, run.trigger_data),
                 "output_data": ex.output_data,
+                "output_in_blob": ex.output_blob is not None,
                 "error_message": ex.error_message,
                 "started_at": ex.started_at.isoformat() if ex.started_at else None,
                 "completed_at": ex.completed_at.isoformat() if ex.completed_at else None
@@ -1,21 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 import uuid
 from datetime import datetime
 
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
 from app.db.session import get_db
 from app.models.workflow import Workflow, WorkflowVersion
-from app.schemas.workflow import WorkflowCreate, WorkflowResponse
+from app.schemas.workflow import WorkflowCreate, WorkflowPage, WorkflowResponse
+from app.services.execution_plan import plan_cache
 
 router = APIRouter()
 
+_VERSION_INSERT_ATTEMPTS = 5
 
-@router.get("/", response_model=List[WorkflowResponse])
-async def list_workflows(db: Session = Depends(get_db)):
-    """List all workflows"""
-    workflows = db.query(Workflow).all()
-    return workflows
+
+@router.get("/", response_model=Union[WorkflowPage, List[WorkflowResponse]])
+async def list_workflows(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    all_workflows: bool = Query(False, alias="all"),
+    db: Session = Depends(get_db)
+):
+    """List workflows, newest first, one page at a time.
+
+    ``all=true`` returns the plain list of every workflow (legacy).
+    """
+    query = db.query(Workflow.id, Workflow.name, Workflow.description, Workflow.created_at)
+    if all_workflows:
+        return query.order_by(Workflow.created_at.desc()).all()
+    workflows, next_cursor = paginate(query, (Workflow.created_at, Workflow.id), cursor, limit)
+    return {"workflows": workflows, "next_cursor": next_cursor}
 
 
 @router.post("/", response_model=WorkflowResponse)
@@ -98,25 +115,35 @@ async def create_workflow_version(
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    # Get latest version number
-    latest_version = db.query(WorkflowVersion).filter(
-        WorkflowVersion.workflow_id == workflow_id
-    ).order_by(WorkflowVersion.version.desc()).first()
-    
-    version_number = 1 if not latest_version else latest_version.version + 1
-    
-    version = WorkflowVersion(
-        id=str(uuid.uuid4()),
-        workflow_id=workflow_id,
-        version=version_number,
-        definition=definition,
-        is_published=True,
-        published_at=datetime.utcnow(),
-        created_at=datetime.utcnow()
-    )
-    db.add(version)
-    db.commit()
+    # Next version number; a concurrent save may take it first, in which
+    # case the unique (workflow_id, version) constraint rejects ours
+    for attempt in range(_VERSION_INSERT_ATTEMPTS):
+        latest = db.query(func.max(WorkflowVersion.version)).filter(
+            WorkflowVersion.workflow_id == workflow_id
+        ).scalar()
+        version_number = (latest or 0) + 1
+
+        version = WorkflowVersion(
+            id=str(uuid.uuid4()),
+            workflow_id=workflow_id,
+            version=version_number,
+            definition=definition,
+            is_published=True,
+            published_at=datetime.utcnow(),
+            created_at=datetime.utcnow()
+        )
+        db.add(version)
+        try:
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+    else:
+        raise HTTPException(status_code=409, detail="Workflow is being saved concurrently, retry")
     db.refresh(version)
+
+    # Plans compiled for older versions of this workflow are now superseded
+    plan_cache.invalidate_workflow(workflow_id)
     
     return {
         "id": version.id,
@@ -127,22 +154,55 @@ async def create_workflow_version(
 
 
 @router.get("/{workflow_id}/versions")
-async def get_workflow_versions(workflow_id: str, db: Session = Depends(get_db)):
-    """Get all versions of a workflow"""
-    versions = db.query(WorkflowVersion).filter(
-        WorkflowVersion.workflow_id == workflow_id
-    ).order_by(WorkflowVersion.version.desc()).all()
-    
-    return [
-        {
-            "id": v.id,
-            "version": v.version,
-            "is_published": v.is_published,
-            "created_at": v.created_at,
-            "definition": v.definition
-        }
-        for v in versions
-    ]
+async def get_workflow_versions(
+    workflow_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    all_versions: bool = Query(False, alias="all"),
+    db: Session = Depends(get_db)
+):
+    """List versions of a workflow, newest first, one page at a time.
+
+    Pages omit definitions (fetch one version for that); ``all=true``
+    returns every version with its definition as a plain list (legacy).
+    """
+    if all_versions:
+        versions = db.query(WorkflowVersion).filter(
+            WorkflowVersion.workflow_id == workflow_id
+        ).order_by(WorkflowVersion.version.desc()).all()
+
+        return [
+            {
+                "id": v.id,
+                "version": v.version,
+                "is_published": v.is_published,
+                "created_at": v.created_at,
+                "definition": v.definition
+            }
+            for v in versions
+        ]
+
+    query = db.query(
+        WorkflowVersion.id,
+        WorkflowVersion.version,
+        WorkflowVersion.is_published,
+        WorkflowVersion.created_at,
+    ).filter(WorkflowVersion.workflow_id == workflow_id)
+    versions, next_cursor = paginate(
+        query, (WorkflowVersion.version, WorkflowVersion.id), cursor, limit
+    )
+    return {
+        "versions": [
+            {
+                "id": v.id,
+                "version": v.version,
+                "is_published": v.is_published,
+                "created_at": v.created_at,
+            }
+            for v in versions
+        ],
+        "next_cursor": next_cursor,
+    }
 
 
 def _create_workflow_with_definition(db: Session, name: str, description: str, definition: dict):
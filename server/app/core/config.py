@@ -6,6 +6,34 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     REDIS_URL: str = ""
     GEMINI_API_KEY: Optional[str] = None
+    GEMINI_MODEL: str = "gemini-2.5-flash"
+    # Gemini calls run on a shared pool of this many threads (the process-wide
+    # cap on concurrent calls); each call times out after LLM_TIMEOUT seconds
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_TIMEOUT: float = 60.0
+    # Attempts per Gemini call (including the first) on 429/5xx/timeouts;
+    # every attempt waits for the rate limiter
+    LLM_RETRY_ATTEMPTS: int = 3
+    # Gemini quota shared by every run and process (token buckets in Redis
+    # when REDIS_URL is set, otherwise per process). Set a little under the
+    # project's limits; 0 disables a bucket. Callers wait for capacity.
+    LLM_RPM: int = 900
+    LLM_TPM: int = 900_000
+    # Multi-article summaries: parallel calls, the fraction that must succeed
+    # before the combined overview starts (1.0 = wait for all), and a deadline
+    AI_SUMMARY_CONCURRENCY: int = 4
+    AI_SUMMARY_QUORUM: float = 1.0
+    AI_SUMMARY_DEADLINE: float = 120.0
+    # Pack several articles into one summary prompt up to this many estimated
+    # tokens (article text plus room for each summary); 0 = one call per article
+    AI_SUMMARY_PACK_TOKENS: int = 16000
+    # Cache of LLM responses keyed on (model, prompt): local SQLite file plus
+    # Redis (REDIS_URL) when configured. Workflows can opt out with
+    # {"settings": {"llm_cache": false}}.
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = ".cache/llm.sqlite3"
+    LLM_CACHE_TTL: float = 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 10000
     LOG_LEVEL: str = "INFO"
     # Comma-separated CORS origins
     CORS_ORIGINS: str = "http://localhost:3000"
@@ -16,6 +44,104 @@ class Settings(BaseSettings):
     GMAIL_USER: Optional[str] = None
     GMAIL_APP_PASSWORD: Optional[str] = None
 
+    # Where runs execute: "background" (the API process's run executor),
+    # "redis" (queued in REDIS_URL) or "postgres" (claimed from workflow_runs);
+    # the last two are executed by `python -m app.worker`
+    RUN_BACKEND: str = "background"
+    # In-process run executor: runs are tasks on one dedicated event loop, at
+    # most MAX_CONCURRENT_RUNS at once with RUN_ADMISSION_QUEUE_SIZE more
+    # waiting (beyond that the API answers 503). Active runs get
+    # RUN_SHUTDOWN_GRACE seconds to finish on shutdown.
+    MAX_CONCURRENT_RUNS: int = 8
+    RUN_ADMISSION_QUEUE_SIZE: int = 100
+    RUN_SHUTDOWN_GRACE: float = 30.0
+    RUN_QUEUE_NAME: str = "runs"
+    # A claimed run is redelivered if its worker stops renewing the claim for
+    # this long; runs delivered more than RUN_QUEUE_MAX_DELIVERIES times fail
+    RUN_QUEUE_VISIBILITY_TIMEOUT: float = 300.0
+    RUN_QUEUE_MAX_DELIVERIES: int = 3
+    # Runs a worker process executes at once
+    WORKER_CONCURRENCY: int = 4
+    # RUN_BACKEND=postgres: claimed runs hold a lease renewed every third of
+    # RUN_LEASE_SECONDS; runs whose lease expires are re-queued (and failed
+    # after RUN_QUEUE_MAX_DELIVERIES claims). Idle workers poll this often.
+    RUN_LEASE_SECONDS: float = 60.0
+    RUN_CLAIM_POLL_INTERVAL: float = 1.0
+
+    # Upper bound on nodes executing at once within a single run. A workflow
+    # definition can lower it with {"settings": {"max_concurrency": N}}.
+    MAX_NODE_CONCURRENCY: int = 8
+    # Compiled execution plans kept in memory, keyed by WorkflowVersion.id
+    EXECUTION_PLAN_CACHE_SIZE: int = 256
+    # Per-node defaults, overridable in node data with {"timeout": seconds}
+    # and {"retry": {"attempts", "backoff", "max_backoff", "jitter"}}. Only
+    # transient failures (timeouts, connection errors, 429/5xx) are retried,
+    # with exponential backoff and jitter. NODE_TIMEOUT=0 disables the timeout.
+    NODE_TIMEOUT: float = 300.0
+    NODE_RETRY_ATTEMPTS: int = 1
+    NODE_RETRY_BACKOFF: float = 1.0
+    NODE_RETRY_MAX_BACKOFF: float = 30.0
+
+    # NodeExecution rows are buffered per run and written in batches.
+    # Strict mode commits every state transition immediately (debugging).
+    NODE_EXECUTION_STRICT_WRITES: bool = False
+    NODE_EXECUTION_FLUSH_SIZE: int = 50
+    NODE_EXECUTION_FLUSH_INTERVAL: float = 1.0
+    # Node executions record the node's resolved inputs; top-level input
+    # values at least this large (JSON bytes) are stored once per run and
+    # referenced by hash (0 = always inline)
+    NODE_INPUT_INLINE_BYTES: int = 1024
+    # Node outputs at least this large (JSON bytes) are written zstd-compressed
+    # to a content-addressed blob store on disk (shared by the API and workers)
+    # and fetched on demand; the row keeps a reference and summary (0 = inline)
+    NODE_OUTPUT_INLINE_BYTES: int = 64 * 1024
+    BLOB_STORE_PATH: str = ".blobs"
+    BLOB_COMPRESSION_LEVEL: int = 3
+    # Finished runs older than this many days are deleted with their node
+    # executions and payloads (0 = keep forever). Blobs no longer referenced
+    # by any execution are removed once they are BLOB_GC_GRACE seconds old.
+    # Both run every RETENTION_INTERVAL seconds in the API process.
+    RUN_RETENTION_DAYS: float = 0
+    BLOB_GC_GRACE: float = 3600.0
+    RETENTION_INTERVAL: float = 3600.0
+
+    # Shared outbound HTTP client (http / notify nodes). HTTP/2 needs the
+    # optional 'h2' package (pip install httpx[http2]).
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 10
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False
+
+    # SSRF validation: resolved addresses are cached and connections are
+    # pinned to the validated address
+    DNS_CACHE_TTL: float = 60.0
+    DNS_CACHE_MAX_ENTRIES: int = 4096
+
+    # Bulk article fetching (trigger nodes with article_urls)
+    ARTICLE_FETCH_CONCURRENCY: int = 8
+    ARTICLE_FETCH_PER_HOST: int = 2
+    ARTICLE_FETCH_TIMEOUT: float = 10.0
+    ARTICLE_FETCH_DEADLINE: float = 60.0
+    # Stream pages into an incremental parser and stop early instead of
+    # downloading and parsing the whole document; never read past the cap
+    ARTICLE_STREAMING: bool = True
+    ARTICLE_MAX_BYTES: int = 2 * 1024 * 1024
+    # Threads shared by all streamed fetches for parsing pages as they arrive
+    ARTICLE_PARSE_THREADS: int = 4
+    # Worker processes for HTML extraction (0 = parse in a thread of the API
+    # process) and how many pages may be queued for them at once (0 = 2x workers)
+    EXTRACTION_WORKERS: int = 2
+    EXTRACTION_QUEUE_SIZE: int = 0
+
+    # On-disk cache of fetched articles, revalidated with ETag/Last-Modified.
+    # A workflow can opt out with {"settings": {"http_cache": false}}.
+    HTTP_CACHE_ENABLED: bool = True
+    HTTP_CACHE_DIR: str = ".cache/http"
+    HTTP_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    # Freshness for responses without Cache-Control max-age (0 = always revalidate)
+    HTTP_CACHE_DEFAULT_TTL: int = 0
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,29 @@
+"""Lazily created, process-wide Redis client (``REDIS_URL``)."""
+
+import threading
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+
+_client: Optional[redis.Redis] = None
+_lock = threading.Lock()
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Return the shared client, or None when ``REDIS_URL`` is not configured.
+
+    The client is thread-safe (it owns a connection pool) and does not
+    connect until first used, so callers must still handle ``RedisError``.
+    """
+    global _client
+    if not settings.REDIS_URL:
+        return None
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = redis.Redis.from_url(
+                    settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=2
+                )
+    return _client
@@ -1,7 +1,14 @@
 """URL validation utilities to prevent Server-Side Request Forgery (SSRF)."""
 
+import asyncio
+import bisect
 import ipaddress
 import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 _ALLOWED_SCHEMES = {"http", "https"}
@@ -34,18 +41,139 @@ _BLOCKED_NETWORKS = [
 ]
 
 
-def validate_url_for_ssrf(url: str) -> None:
-    """Validate a URL to prevent SSRF attacks.
+def _merged_ranges(version: int) -> Tuple[List[int], List[int]]:
+    """Blocked networks of one IP version as sorted, non-overlapping [start, end] lists."""
+    ranges = sorted(
+        (int(net.network_address), int(net.broadcast_address))
+        for net in _BLOCKED_NETWORKS if net.version == version
+    )
+    starts: List[int] = []
+    ends: List[int] = []
+    for start, end in ranges:
+        if ends and start <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
 
-    Enforces:
-    - Scheme must be ``http`` or ``https`` (rejects ``file://``, ``ftp://``, etc.)
-    - Hostname must resolve and every resolved IP must be a public, routable
-      address (rejects loopback, RFC 1918 private ranges, link-local addresses
-      such as the AWS/GCP/Azure metadata endpoint 169.254.169.254, etc.)
 
-    Raises:
-        ValueError: with a descriptive message when the URL is not allowed.
+# Binary search over merged intervals instead of a linear scan of the list
+_BLOCKED_RANGES = {4: _merged_ranges(4), 6: _merged_ranges(6)}
+
+
+def is_blocked_address(ip: ipaddress._BaseAddress) -> bool:
+    """True when ``ip`` falls in any of ``_BLOCKED_NETWORKS``."""
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped  # ::ffff:127.0.0.1 is loopback too
+    starts, ends = _BLOCKED_RANGES[ip.version]
+    value = int(ip)
+    i = bisect.bisect_right(starts, value) - 1
+    return i >= 0 and value <= ends[i]
+
+
+class DnsCache:
+    """TTL-bounded cache of ``getaddrinfo`` results.
+
+    Concurrent lookups of the same name (from any thread or event loop)
+    share one in-flight resolution. Failures are not cached.
+
+    This module takes no application settings, so it imports on its own;
+    ``http_client`` sizes the shared ``dns_cache`` from the ``DNS_CACHE_*``
+    settings via ``configure``.
     """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 4096,
+        resolver: Callable = socket.getaddrinfo,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.resolver = resolver
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[str, ...]]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def _cached(self, hostname: str) -> Optional[Tuple[str, ...]]:
+        entry = self._entries.get(hostname)
+        if entry is None:
+            return None
+        expires_at, addresses = entry
+        if expires_at <= time.monotonic():
+            del self._entries[hostname]
+            return None
+        self._entries.move_to_end(hostname)
+        self.hits += 1
+        return addresses
+
+    def _claim(self, hostname: str) -> Tuple[Optional[Tuple[str, ...]], Future, bool]:
+        """Return (cached addresses, in-flight future, whether the caller must resolve)."""
+        with self._lock:
+            addresses = self._cached(hostname)
+            if addresses is not None:
+                return addresses, None, False
+            future = self._inflight.get(hostname)
+            if future is not None:
+                return None, future, False
+            future = self._inflight[hostname] = Future()
+            self.misses += 1
+            return None, future, True
+
+    def _resolve_into(self, hostname: str, future: Future) -> None:
+        try:
+            infos = self.resolver(hostname, None)
+            addresses = tuple(dict.fromkeys(info[4][0] for info in infos))
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(hostname, None)
+            future.set_exception(exc)
+            return
+        with self._lock:
+            self._inflight.pop(hostname, None)
+            if self.ttl > 0 and addresses:
+                self._entries[hostname] = (time.monotonic() + self.ttl, addresses)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        future.set_result(addresses)
+
+    def lookup(self, hostname: str) -> Tuple[str, ...]:
+        addresses, future, owner = self._claim(hostname)
+        if addresses is not None:
+            return addresses
+        if owner:
+            self._resolve_into(hostname, future)
+        return future.result()
+
+    async def lookup_async(self, hostname: str) -> Tuple[str, ...]:
+        addresses, future, owner = self._claim(hostname)
+        if addresses is not None:
+            return addresses
+        if owner:
+            # getaddrinfo blocks; resolve in a worker thread
+            asyncio.get_running_loop().run_in_executor(None, self._resolve_into, hostname, future)
+        # Shielded: a cancelled caller must not cancel the shared lookup
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+dns_cache = DnsCache()
+
+
+def _hostname_of(url: str) -> str:
     try:
         parsed = urlparse(url)
     except Exception as exc:
@@ -60,27 +188,89 @@ def validate_url_for_ssrf(url: str) -> None:
     hostname = parsed.hostname
     if not hostname:
         raise ValueError("URL must include a valid hostname.")
+    return hostname
 
+
+def _literal_ip(hostname: str) -> Optional[str]:
     try:
-        addr_infos = socket.getaddrinfo(hostname, None)
-    except socket.gaierror as exc:
-        raise ValueError(
-            f"Could not resolve hostname '{hostname}': {exc}"
-        ) from exc
+        return str(ipaddress.ip_address(hostname))
+    except ValueError:
+        return None
 
-    if not addr_infos:
+
+def _check_addresses(hostname: str, addresses: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Reject ``hostname`` if any address is internal; return the addresses to connect to."""
+    if not addresses:
         raise ValueError(f"Hostname '{hostname}' did not resolve to any address.")
 
-    for addr_info in addr_infos:
-        ip_str = addr_info[4][0]
+    for ip_str in addresses:
         try:
-            ip = ipaddress.ip_address(ip_str)
+            ip = ipaddress.ip_address(ip_str.split("%", 1)[0])
         except ValueError:
             continue
 
-        for blocked in _BLOCKED_NETWORKS:
-            if ip in blocked:
-                raise ValueError(
-                    f"Requests to internal or private addresses are not permitted "
-                    f"('{hostname}' resolved to {ip})."
-                )
+        if is_blocked_address(ip):
+            raise ValueError(
+                f"Requests to internal or private addresses are not permitted "
+                f"('{hostname}' resolved to {ip})."
+            )
+    return addresses
+
+
+def _resolution_error(hostname: str, exc: Exception) -> ValueError:
+    return ValueError(f"Could not resolve hostname '{hostname}': {exc}")
+
+
+def resolve_public_host(hostname: str) -> Tuple[str, ...]:
+    """Resolve ``hostname`` (cached) and return its validated public addresses.
+
+    Addresses keep resolver order; connect to them in turn, so a host whose
+    first record is unreachable (e.g. IPv6 without a route) still works.
+
+    Raises:
+        ValueError: when the name does not resolve or any address is internal.
+    """
+    literal = _literal_ip(hostname)
+    if literal is not None:
+        return _check_addresses(hostname, (literal,))
+    try:
+        addresses = dns_cache.lookup(hostname)
+    except socket.gaierror as exc:
+        raise _resolution_error(hostname, exc) from exc
+    return _check_addresses(hostname, addresses)
+
+
+async def resolve_public_host_async(hostname: str) -> Tuple[str, ...]:
+    """Async counterpart of ``resolve_public_host``; never blocks the loop."""
+    literal = _literal_ip(hostname)
+    if literal is not None:
+        return _check_addresses(hostname, (literal,))
+    try:
+        addresses = await dns_cache.lookup_async(hostname)
+    except socket.gaierror as exc:
+        raise _resolution_error(hostname, exc) from exc
+    return _check_addresses(hostname, addresses)
+
+
+def validate_url_for_ssrf(url: str) -> Tuple[str, ...]:
+    """Validate a URL to prevent SSRF attacks.
+
+    Enforces:
+    - Scheme must be ``http`` or ``https`` (rejects ``file://``, ``ftp://``, etc.)
+    - Hostname must resolve and every resolved IP must be a public, routable
+      address (rejects loopback, RFC 1918 private ranges, link-local addresses
+      such as the AWS/GCP/Azure metadata endpoint 169.254.169.254, etc.)
+
+    Resolutions are cached for ``DNS_CACHE_TTL`` seconds. Returns the
+    validated addresses; connect to those (see ``http_client``) rather than
+    resolving the name again, which would reopen a DNS-rebinding window.
+
+    Raises:
+        ValueError: with a descriptive message when the URL is not allowed.
+    """
+    return resolve_public_host(_hostname_of(url))
+
+
+async def validate_url_for_ssrf_async(url: str) -> Tuple[str, ...]:
+    """Async counterpart of ``validate_url_for_ssrf``."""
+    return await resolve_public_host_async(_hostname_of(url))
@@ -1,5 +1,5 @@
 from app.models.workflow import Workflow, WorkflowVersion
-from app.models.run import WorkflowRun, NodeExecution
+from app.models.run import WorkflowRun, NodeExecution, RunPayload
 from app.models.task import HumanTask
 from app.models.user import User, Organization
 
@@ -8,6 +8,7 @@ __all__ = [
     "WorkflowVersion",
     "WorkflowRun",
     "NodeExecution",
+    "RunPayload",
     "HumanTask",
     "User",
     "Organization",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, Text, JSON, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -34,10 +34,22 @@ class WorkflowRun(Base):
     completed_at = Column(DateTime)
     error_message = Column(Text)
     trigger_data = Column(JSON)
+    # Set while a worker holds the run (RUN_BACKEND=postgres); see run_leases
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)
+    claim_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     workflow = relationship("Workflow", back_populates="runs")
     node_executions = relationship("NodeExecution", back_populates="run")
 
+    __table_args__ = (
+        # Claiming the oldest PENDING runs, and reaping RUNNING runs by lease expiry
+        Index("ix_workflow_runs_status_started_at", "status", "started_at"),
+        Index("ix_workflow_runs_status_lease_expires_at", "status", "lease_expires_at"),
+        # A workflow's runs, newest first (workflow details, filtered run lists)
+        Index("ix_workflow_runs_workflow_id_started_at", "workflow_id", "started_at"),
+    )
+
 
 class NodeExecution(Base):
     __tablename__ = "node_executions"
@@ -49,9 +61,29 @@ class NodeExecution(Base):
     status = Column(SQLEnum(NodeStatus), default=NodeStatus.PENDING)
     input_data = Column(JSON)
     output_data = Column(JSON)
+    # Digest of the blob holding a large output (output_data is then a reference)
+    output_blob = Column(String(64))
     error_message = Column(Text)
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
     retry_count = Column(Integer, default=0)
 
     run = relationship("WorkflowRun", back_populates="node_executions")
+
+    __table_args__ = (
+        # A run's executions in order (run details, resume checkpoints)
+        Index("ix_node_executions_run_id_started_at", "run_id", "started_at"),
+        # Blobs still referenced (garbage collection)
+        Index("ix_node_executions_output_blob", "output_blob"),
+    )
+
+
+class RunPayload(Base):
+    """A large node input value, stored once per run (see run_payloads)."""
+    __tablename__ = "run_payloads"
+
+    run_id = Column(String, ForeignKey("workflow_runs.id"), primary_key=True)
+    hash = Column(String(64), primary_key=True)  # SHA-256 of the canonical JSON
+    data = Column(JSON, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
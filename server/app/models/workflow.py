@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Boolean, JSON
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, Text, Boolean, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -33,3 +33,10 @@ class WorkflowVersion(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     workflow = relationship("Workflow", back_populates="versions")
+
+    __table_args__ = (
+        # Version numbers are assigned as max + 1; concurrent saves must not collide
+        UniqueConstraint("workflow_id", "version", name="uq_workflow_versions_workflow_id_version"),
+        # Latest published version of a workflow (starting a run)
+        Index("ix_workflow_versions_workflow_id_is_published_version", "workflow_id", "is_published", "version"),
+    )
@@ -36,6 +36,11 @@ class WorkflowResponse(BaseModel):
         from_attributes = True
 
 
+class WorkflowPage(BaseModel):
+    workflows: List[WorkflowResponse]
+    next_cursor: Optional[str]
+
+
 class WorkflowRunCreate(BaseModel):
     workflow_id: str
     trigger_data: Dict[str, Any]
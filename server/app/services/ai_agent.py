@@ -1,10 +1,18 @@
-import google.generativeai as genai
 from app.core.config import settings
-from typing import Dict, Any
+from app.services.llm_cache import LLMCache, llm_cache
+from app.services.llm_client import GeminiClient, gemini_client
+from typing import Dict, Any, List, Optional
+import asyncio
 import json
+import logging
+import math
 
-if settings.GEMINI_API_KEY:
-    genai.configure(api_key=settings.GEMINI_API_KEY)
+logger = logging.getLogger("workflow")
+
+# Rough token accounting for packed summary prompts
+_CHARS_PER_TOKEN = 4
+_PACK_OVERHEAD_TOKENS = 200  # instructions and response format
+_SUMMARY_TOKENS = 150  # room left for each article's summary in the response
 
 
 def _clean_json(text: str) -> str:
@@ -19,12 +27,43 @@ def _clean_json(text: str) -> str:
     return text.strip()
 
 
+def _pack(articles: list, budget: int) -> List[List[int]]:
+    """Group article indices, in order, into batches that fit ``budget`` tokens.
+
+    Each article costs its estimated text tokens plus room for its summary.
+    An article too large for the budget gets a batch of its own, and a
+    budget of 0 or less puts every article in its own batch.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = _PACK_OVERHEAD_TOKENS
+    for idx, article in enumerate(articles):
+        cost = len(article.get("content", "")) // _CHARS_PER_TOKEN + _SUMMARY_TOKENS
+        if current and used + cost > budget:
+            batches.append(current)
+            current, used = [], _PACK_OVERHEAD_TOKENS
+        current.append(idx)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
 class AIAgent:
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+    def __init__(self, client: Optional[GeminiClient] = None, cache: Optional[LLMCache] = llm_cache):
+        # One shared client: calls run off the event loop in a bounded pool
+        self.client = client or gemini_client
+        self.cache = cache
 
     # ── Helpers ──────────────────────────────────────────────────────────────
 
+    async def _generate(self, prompt: str) -> str:
+        if self.cache is None:
+            return await self.client.generate(prompt)
+        return await self.cache.get_or_generate(
+            self.client.model_name, prompt, lambda: self.client.generate(prompt)
+        )
+
     def _parse_json_response(self, text: str, fallback: dict) -> dict:
         cleaned = _clean_json(text)
         try:
@@ -45,10 +84,10 @@ Article:
 Respond in JSON:
 {{"summary": "...", "key_points": ["...", "...", "..."], "confidence": 0.9}}
 """
-            response = self.model.generate_content(prompt)
+            text = await self._generate(prompt)
             result = self._parse_json_response(
-                response.text,
-                {"summary": response.text, "key_points": [], "confidence": 0.8},
+                text,
+                {"summary": text, "key_points": [], "confidence": 0.8},
             )
             return {"success": True, "data": result}
         except Exception as e:
@@ -58,16 +97,127 @@ Respond in JSON:
                 "data": {"summary": f"Error: {e}", "key_points": [], "confidence": 0.0},
             }
 
-    async def process_multiple_articles(self, articles: list) -> Dict[str, Any]:
-        """Summarize multiple articles then produce a combined overview."""
+    async def summarize_packed(self, article_texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Summarize several articles with a single call.
+
+        Returns one ``summarize_article``-style result per article, in order.
+        Entries are None for articles the response did not cover (including
+        every article when the call fails or the response is not a JSON
+        array); callers summarize those individually.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(article_texts)
+        sections = "\n\n".join(f"### Article {i}\n{text}" for i, text in enumerate(article_texts))
+        prompt = f"""Summarize each of the following {len(article_texts)} articles concisely (2-3 sentences each).
+
+{sections}
+
+Respond with a JSON array containing one object per article, in the same order:
+[{{"id": 0, "summary": "...", "key_points": ["...", "...", "..."], "confidence": 0.9}}]
+"""
+        try:
+            text = await self._generate(prompt)
+            items = json.loads(_clean_json(text))
+        except Exception as e:
+            logger.warning(f"Packed summary of {len(article_texts)} articles failed: {e}")
+            return results
+        if not isinstance(items, list):
+            logger.warning("Packed summary response is not a JSON array")
+            return results
+
+        for pos, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get("summary"), str):
+                continue
+            idx = item.get("id", pos)
+            if isinstance(idx, int) and 0 <= idx < len(results) and results[idx] is None:
+                data = {k: v for k, v in item.items() if k != "id"}
+                data.setdefault("key_points", [])
+                results[idx] = {"success": True, "data": data}
+        return results
+
+    async def process_multiple_articles(
+        self,
+        articles: list,
+        concurrency: Optional[int] = None,
+        quorum: Optional[float] = None,
+        deadline: Optional[float] = None,
+        pack_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Summarize multiple articles then produce a combined overview.
+
+        Articles are packed into as few prompts as fit ``pack_tokens``
+        estimated tokens (see ``_pack``); a lone article uses the
+        single-article prompt, and articles a packed response misses are
+        summarized individually. Calls run concurrently, at most
+        ``concurrency`` at a time. The combined overview starts once a
+        ``quorum`` fraction of the articles has been summarized
+        successfully, once every summary has finished, or when ``deadline``
+        seconds have passed, whichever is first. Articles still outstanding
+        at that point are cancelled. They keep their slot in
+        ``individual_summaries`` with a placeholder summary.
+        """
+        concurrency = concurrency or settings.AI_SUMMARY_CONCURRENCY
+        quorum = settings.AI_SUMMARY_QUORUM if quorum is None else quorum
+        deadline = deadline or settings.AI_SUMMARY_DEADLINE
+        pack_tokens = settings.AI_SUMMARY_PACK_TOKENS if pack_tokens is None else pack_tokens
+        slots = asyncio.Semaphore(concurrency)
+        contents = [article.get("content", "") for article in articles]
+
+        async def summarize_one(idx: int) -> list:
+            async with slots:
+                return [(idx, await self.summarize_article(contents[idx]))]
+
+        async def summarize_batch(batch: List[int]) -> list:
+            if len(batch) == 1:
+                return await summarize_one(batch[0])
+            async with slots:
+                packed = await self.summarize_packed([contents[i] for i in batch])
+            return list(zip(batch, packed))
+
+        batches = _pack(articles, pack_tokens)
+        logger.info(f"AI: {len(articles)} article(s) in {len(batches)} summary request(s)")
+        pending = {asyncio.create_task(summarize_batch(batch)) for batch in batches}
+        needed = math.ceil(quorum * len(articles))
+        finished: Dict[int, Dict[str, Any]] = {}
+        succeeded = 0
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + deadline
+        try:
+            while pending and succeeded < needed:
+                remaining = give_up_at - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    for idx, result in task.result():
+                        if result is None:
+                            # Not covered by a packed response: summarize on its own
+                            pending.add(asyncio.create_task(summarize_one(idx)))
+                            continue
+                        finished[idx] = result
+                        succeeded += result["success"]
+        finally:
+            for task in pending:
+                task.cancel()
+        if pending:
+            logger.warning(
+                f"Combining {len(finished)}/{len(articles)} article summaries; "
+                f"{len(articles) - len(finished)} cancelled (quorum={quorum}, deadline={deadline}s)"
+            )
+            await asyncio.gather(*pending, return_exceptions=True)
+
         summaries = []
         for idx, article in enumerate(articles):
-            result = await self.summarize_article(article.get("content", ""))
+            if idx in finished:
+                data = finished[idx]["data"]
+            else:
+                data = {"summary": "Summary unavailable: not finished before the deadline", "key_points": []}
             summaries.append(
                 {
                     "article_title": article.get("title", f"Article {idx + 1}"),
-                    "summary": result["data"]["summary"],
-                    "key_points": result["data"].get("key_points", []),
+                    "summary": data["summary"],
+                    "key_points": data.get("key_points", []),
                 }
             )
 
@@ -79,10 +229,10 @@ Respond in JSON:
 {{"overview": "...", "total_articles": {len(articles)}}}
 """
         try:
-            response = self.model.generate_content(combined_prompt)
+            text = await self._generate(combined_prompt)
             combined = self._parse_json_response(
-                response.text,
-                {"overview": response.text, "total_articles": len(articles)},
+                text,
+                {"overview": text, "total_articles": len(articles)},
             )
             return {"success": True, "individual_summaries": summaries, "combined_summary": combined}
         except Exception as e:
@@ -120,10 +270,10 @@ Respond in JSON:
 }}
 """
         try:
-            response = self.model.generate_content(prompt)
+            text = await self._generate(prompt)
             result = self._parse_json_response(
-                response.text,
-                {"reply": response.text, "subject_line": f"Re: {subject}", "tone_used": tone, "action_items": []},
+                text,
+                {"reply": text, "subject_line": f"Re: {subject}", "tone_used": tone, "action_items": []},
             )
             return {"success": True, **result}
         except Exception as e:
@@ -166,15 +316,15 @@ Respond in JSON:
 }}
 """
         try:
-            response = self.model.generate_content(prompt)
+            text = await self._generate(prompt)
             result = self._parse_json_response(
-                response.text,
+                text,
                 {
                     "market_sentiment": "neutral",
                     "key_themes": [],
                     "risk_factors": [],
                     "opportunities": [],
-                    "report": response.text,
+                    "report": text,
                     "recommendation": "",
                 },
             )
@@ -194,8 +344,8 @@ Context / Input:
 Respond in JSON with at minimum: {{"result": "...", "success": true}}
 """
         try:
-            response = self.model.generate_content(prompt)
-            result = self._parse_json_response(response.text, {"result": response.text})
+            text = await self._generate(prompt)
+            result = self._parse_json_response(text, {"result": text})
             return {"success": True, **result}
         except Exception as e:
             return {"success": False, "error": str(e), "result": f"Error: {e}"}
@@ -1,95 +1,301 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import Dict, Any
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from urllib.parse import urlparse
 
-from app.core.security import validate_url_for_ssrf
+import httpx
+
+from app.core.config import settings
+from app.services.extraction import StreamingExtractor, TextCounter, extract_article
+from app.services.extraction_pool import ExtractionPool, extraction_pool as default_extraction_pool
+from app.services.http_cache import ArticleCache, article_cache
+from app.services.http_client import SharedHttpClient, http_client as shared_http_client
+
+logger = logging.getLogger("workflow")
+
+
+def _failure(url: str, error: str) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "error": error,
+        "title": url,
+        "content": "",
+        "url": url
+    }
+
+
+class ParseLanes:
+    """A fixed set of single-thread executors shared by streamed fetches.
+
+    lxml parsers must stay on the thread that created them, so a pooled
+    executor won't do: each fetch holds one lane (thread) for its whole
+    parse. Threads are started on demand up to ``size``; a new fetch takes
+    an idle lane, or else shares the least busy one.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._lanes: List[list] = []  # [executor, fetches using it]
+        self._lock = threading.Lock()
+
+    def acquire(self) -> list:
+        with self._lock:
+            lane = min(self._lanes, key=lambda lane: lane[1], default=None)
+            if (lane is None or lane[1]) and len(self._lanes) < self.size:
+                lane = [ThreadPoolExecutor(max_workers=1, thread_name_prefix="article-parse"), 0]
+                self._lanes.append(lane)
+            lane[1] += 1
+            return lane
+
+    def release(self, lane: list) -> None:
+        with self._lock:
+            lane[1] -= 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for executor, _ in self._lanes:
+                executor.shutdown(wait=False)
+            self._lanes.clear()
+
+
+parse_lanes = ParseLanes(settings.ARTICLE_PARSE_THREADS)
+
+
+class _ChunkFeeder:
+    """Hands streamed chunks to ``consume`` on a worker thread.
+
+    ``SharedHttpClient.stream`` calls ``on_chunk`` on the client's own loop
+    (the API loop), which must not parse pages. ``on_chunk`` therefore only
+    queues the bytes; ``run`` feeds them to ``consume`` off the loop while
+    the download continues, and the download stops at the next chunk once
+    ``consume`` returns True. lxml parsers must stay on the thread that
+    created them, so every call goes to the one lane the feeder holds;
+    close the feeder when done.
+    """
+
+    def __init__(self, consume: Callable[[bytes], bool], lanes: ParseLanes):
+        self.consume = consume
+        self.done = False
+        self._chunks: Deque[bytes] = deque()
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._lanes = lanes
+        self._lane = lanes.acquire()
+
+    def on_chunk(self, chunk: bytes) -> bool:
+        if not self.done:
+            self._chunks.append(chunk)
+            self._loop.call_soon_threadsafe(self._ready.set)
+        return self.done
+
+    def _drain(self) -> None:
+        while self._chunks and not self.done:
+            self.done = bool(self.consume(self._chunks.popleft()))
+        if self.done:
+            self._chunks.clear()
+
+    async def call(self, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` on the feeder's thread."""
+        return await self._loop.run_in_executor(self._lane[0], fn)
+
+    async def run(self, download: Awaitable[httpx.Response]) -> httpx.Response:
+        """Await ``download`` (a ``stream`` call using ``on_chunk``) while
+        consuming its chunks."""
+        task = asyncio.ensure_future(download)
+        try:
+            while not task.done():
+                ready = asyncio.ensure_future(self._ready.wait())
+                await asyncio.wait((task, ready), return_when=asyncio.FIRST_COMPLETED)
+                ready.cancel()
+                # Checked after clearing, so a chunk queued meanwhile is never missed
+                self._ready.clear()
+                if self._chunks:
+                    await self.call(self._drain)
+            response = task.result()
+            if self._chunks:
+                await self.call(self._drain)
+            return response
+        finally:
+            task.cancel()
+
+    def close(self) -> None:
+        self._lanes.release(self._lane)
 
 
 class ArticleFetcher:
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[SharedHttpClient] = None,
+        cache: Optional[ArticleCache] = article_cache,
+        streaming: Optional[bool] = None,
+        max_bytes: Optional[int] = None,
+        extraction_pool: Optional[ExtractionPool] = None,
+        lanes: Optional[ParseLanes] = None,
+    ):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-    
-    def fetch_article(self, url: str) -> Dict[str, Any]:
+        self.http_client = http_client or shared_http_client
+        self.cache = cache
+        self.streaming = settings.ARTICLE_STREAMING if streaming is None else streaming
+        self.max_bytes = max_bytes or settings.ARTICLE_MAX_BYTES
+        self.extraction_pool = extraction_pool or default_extraction_pool
+        self.lanes = lanes or parse_lanes
+
+    async def fetch_article(
+        self, url: str, timeout: Optional[float] = None, use_cache: bool = True
+    ) -> Dict[str, Any]:
         """Fetch article content from URL"""
+        timeout = timeout or settings.ARTICLE_FETCH_TIMEOUT
+        cache = self.cache if use_cache else None
         try:
-            validate_url_for_ssrf(url)
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'lxml')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            
-            # Try to find title
-            title = None
-            if soup.find('h1'):
-                title = soup.find('h1').get_text().strip()
-            elif soup.find('title'):
-                title = soup.find('title').get_text().strip()
-            else:
-                title = url
-            
-            # Try to find main content
-            content = ""
-            
-            # Look for common article containers
-            article_tags = soup.find_all(['article', 'main'])
-            if article_tags:
-                for tag in article_tags:
-                    paragraphs = tag.find_all('p')
-                    content += ' '.join([p.get_text().strip() for p in paragraphs])
+            headers = dict(self.headers)
+            # The cache is on disk: keep its file I/O off the event loop
+            cached = await asyncio.to_thread(cache.get, url) if cache else None
+            if cached:
+                if cache.is_fresh(cached):
+                    cache.hits += 1
+                    return {"success": True, "title": cached["title"], "content": cached["content"], "url": url}
+                headers.update(cache.validators(cached))
+
+            pooled = self.extraction_pool.started
+            if pooled:
+                # Download here, parse in a worker process off the API's GIL
+                response, body = await self._download(url, headers, timeout)
+            elif self.streaming:
+                response, extracted = await self._fetch_streaming(url, headers, timeout)
             else:
-                # Fallback: get all paragraphs
-                paragraphs = soup.find_all('p')
-                content = ' '.join([p.get_text().strip() for p in paragraphs])
-            
-            # Clean up content
-            content = ' '.join(content.split())
-            
-            # Limit content length
-            if len(content) > 5000:
-                content = content[:5000] + "..."
-            
-            return {
-                "success": True,
-                "title": title,
-                "content": content,
-                "url": url
-            }
-            
+                response = await self.http_client.request("GET", url, headers=headers, timeout=timeout)
+            if cached and response.status_code == 304:
+                cache.revalidated += 1
+                await asyncio.to_thread(cache.refresh, url, cached, response.headers)
+                return {"success": True, "title": cached["title"], "content": cached["content"], "url": url}
+            response.raise_for_status()
+
+            if pooled:
+                extracted = await self.extraction_pool.extract(
+                    body, url, response.charset_encoding, self.streaming
+                )
+            elif not self.streaming:
+                # Parsing is CPU-bound; keep it off the event loop
+                extracted = await asyncio.to_thread(
+                    extract_article, response.content, url, response.charset_encoding
+                )
+            if cache:
+                cache.misses += 1
+                await asyncio.to_thread(
+                    cache.put, url, extracted["title"], extracted["content"], response.headers
+                )
+            return {"success": True, **extracted, "url": url}
+
         except ValueError as e:
-            return {
-                "success": False,
-                "error": f"URL validation failed: {str(e)}",
-                "title": url,
-                "content": "",
-                "url": url
-            }
-        except requests.RequestException as e:
-            return {
-                "success": False,
-                "error": f"Failed to fetch URL: {str(e)}",
-                "title": url,
-                "content": "",
-                "url": url
-            }
+            return _failure(url, f"URL validation failed: {str(e)}")
+        except httpx.HTTPError as e:
+            return _failure(url, f"Failed to fetch URL: {str(e)}")
         except Exception as e:
-            return {
-                "success": False,
-                "error": f"Error parsing content: {str(e)}",
-                "title": url,
-                "content": "",
-                "url": url
-            }
-    
-    def fetch_multiple_articles(self, urls: list) -> list:
-        """Fetch multiple articles"""
-        articles = []
-        for url in urls:
-            article = self.fetch_article(url)
-            articles.append(article)
-        return articles
+            return _failure(url, f"Error parsing content: {str(e)}")
+
+    async def _fetch_streaming(self, url: str, headers: Dict[str, str], timeout: float):
+        """GET ``url`` into a StreamingExtractor, reading at most ``max_bytes``.
+
+        Parsing happens on worker threads as the body arrives (``_ChunkFeeder``).
+        """
+        extractor = StreamingExtractor(url)
+        feeder = _ChunkFeeder(extractor.feed, self.lanes)
+
+        def on_response(response: httpx.Response) -> None:
+            extractor.encoding = response.charset_encoding
+
+        try:
+            response = await feeder.run(self.http_client.stream(
+                "GET", url, feeder.on_chunk,
+                on_response=on_response, headers=headers, timeout=timeout, max_bytes=self.max_bytes,
+            ))
+            if not response.is_success:
+                return response, None
+            if not extractor.done:
+                logger.debug(f"Read {extractor.bytes_read} bytes of {url} without reaching the text limit")
+            return response, await feeder.call(extractor.result)
+        finally:
+            feeder.close()
+
+    async def _download(self, url: str, headers: Dict[str, str], timeout: float):
+        """GET ``url`` and return the response with up to ``max_bytes`` of its body.
+
+        When streaming, a ``TextCounter`` ends the download once the page
+        holds more text than the extractor keeps.
+        """
+        if not self.streaming:
+            response = await self.http_client.request("GET", url, headers=headers, timeout=timeout)
+            return response, response.content
+        body = bytearray()
+        counter = TextCounter()
+
+        def consume(chunk: bytes) -> bool:
+            body.extend(chunk)
+            return counter.feed(chunk)
+
+        feeder = _ChunkFeeder(consume, self.lanes)
+        try:
+            response = await feeder.run(self.http_client.stream(
+                "GET", url, feeder.on_chunk, headers=headers, timeout=timeout, max_bytes=self.max_bytes
+            ))
+        finally:
+            feeder.close()
+        if counter.done:
+            logger.debug(f"Stopped downloading {url} after {len(body)} bytes: enough text")
+        return response, bytes(body)
+
+    async def fetch_multiple_articles(
+        self,
+        urls: list,
+        concurrency: Optional[int] = None,
+        per_host: Optional[int] = None,
+        url_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        use_cache: bool = True,
+    ) -> list:
+        """Fetch multiple articles concurrently; results keep the order of ``urls``.
+
+        At most ``concurrency`` fetches run at once and at most ``per_host``
+        against any one host. Each URL gets ``url_timeout`` seconds once it
+        starts, and anything unfinished when ``deadline`` passes is reported
+        as a failed fetch. ``use_cache=False`` bypasses the on-disk cache.
+        """
+        if not urls:
+            return []
+        global_slots = asyncio.Semaphore(concurrency or settings.ARTICLE_FETCH_CONCURRENCY)
+        per_host = per_host or settings.ARTICLE_FETCH_PER_HOST
+        url_timeout = url_timeout or settings.ARTICLE_FETCH_TIMEOUT
+        deadline = deadline or settings.ARTICLE_FETCH_DEADLINE
+        host_slots: Dict[str, asyncio.Semaphore] = {}
+
+        async def fetch_one(url: str) -> Dict[str, Any]:
+            host = urlparse(url).netloc.lower() if isinstance(url, str) else ""
+            host_slot = host_slots.setdefault(host, asyncio.Semaphore(per_host))
+            # Wait for the host budget first so a busy host doesn't hold global slots
+            async with host_slot, global_slots:
+                try:
+                    return await asyncio.wait_for(self.fetch_article(url, url_timeout, use_cache), url_timeout)
+                except asyncio.TimeoutError:
+                    return _failure(url, f"Failed to fetch URL: timed out after {url_timeout}s")
+
+        tasks = [asyncio.create_task(fetch_one(url)) for url in urls]
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Article fetch deadline ({deadline}s) hit with {len(pending)} URL(s) outstanding")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if self.cache and use_cache:
+            logger.debug(f"Article cache stats: {self.cache.stats()}")
+
+        return [
+            task.result() if task not in pending
+            else _failure(url, f"Failed to fetch URL: overall deadline of {deadline}s exceeded")
+            for url, task in zip(urls, tasks)
+        ]
@@ -0,0 +1,154 @@
+"""
+Content-addressed, zstd-compressed blob store for large node outputs.
+
+Outputs such as fetched articles, HTTP bodies and the output node's
+``previous_results`` used to go straight into ``NodeExecution.output_data``
+and into every ``get_run`` response. An output whose JSON is at least
+``NODE_OUTPUT_INLINE_BYTES`` is instead written here, under
+``BLOB_STORE_PATH/<2 hex>/<sha256>.zst``. Its row keeps a small reference:
+
+    {"$blob": "<sha256>", "size_bytes": <json size>, "summary": {...}}
+
+and the digest goes into ``NodeExecution.output_blob``. That column, not
+the shape of ``output_data``, says whether an output is a reference: a
+node may legitimately return a dict with a ``"$blob"`` key. The full
+output is read back on demand (``/api/nodes/{run_id}/nodes/
+{node_id}``, resumed runs). Identical outputs share one file. Files are
+written to a temporary name and renamed, so readers never see partial
+blobs. Unreferenced blobs are removed by ``retention.collect_garbage``.
+
+The store is a local directory: the API and every worker must share it
+(the same volume in docker-compose).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Iterator, Optional, Tuple
+
+import zstandard
+
+from app.core.config import settings
+
+logger = logging.getLogger("workflow")
+
+BLOB_KEY = "$blob"
+_SUFFIX = ".zst"
+
+
+def summarize(value: Any) -> Any:
+    """A shallow description of ``value`` for list views."""
+    if isinstance(value, dict):
+        return {key: summarize_leaf(item) for key, item in list(value.items())[:50]}
+    return summarize_leaf(value)
+
+
+def summarize_leaf(value: Any) -> Any:
+    if isinstance(value, dict):
+        return f"object({len(value)} keys)"
+    if isinstance(value, list):
+        return f"array({len(value)} items)"
+    if isinstance(value, str) and len(value) > 200:
+        return value[:200] + "…"
+    return value
+
+
+class BlobStore:
+    def __init__(self, root: Optional[str] = None, level: Optional[int] = None):
+        self.root = root or settings.BLOB_STORE_PATH
+        self.level = settings.BLOB_COMPRESSION_LEVEL if level is None else level
+
+    def _path(self, digest: str) -> str:
+        if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return os.path.join(self.root, digest[:2], digest + _SUFFIX)
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """Store ``data``; returns its digest and compressed size."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            # Refresh the mtime so a concurrent garbage collection keeps it
+            os.utime(path)
+            return digest, os.path.getsize(path)
+        compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return digest, len(compressed)
+
+    def get(self, digest: str) -> bytes:
+        """Decompressed contents of a blob; ``FileNotFoundError`` if missing."""
+        with open(self._path(digest), "rb") as f:
+            return zstandard.ZstdDecompressor().decompress(f.read())
+
+    def delete(self, digest: str, older_than: Optional[float] = None) -> bool:
+        """Remove a blob; with ``older_than``, only if it was not written
+        (or re-put) within that many seconds."""
+        path = self._path(digest)
+        try:
+            if older_than is not None and os.path.getmtime(path) > time.time() - older_than:
+                return False
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def digests(self, older_than: Optional[float] = None) -> Iterator[str]:
+        """Stored digests, optionally only those last written more than
+        ``older_than`` seconds ago."""
+        if not os.path.isdir(self.root):
+            return
+        cutoff = time.time() - older_than if older_than is not None else None
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if not name.endswith(_SUFFIX):
+                    continue
+                if cutoff is not None:
+                    try:
+                        if os.path.getmtime(os.path.join(directory, name)) > cutoff:
+                            continue
+                    except FileNotFoundError:
+                        continue
+                yield name[: -len(_SUFFIX)]
+
+    # ── JSON outputs ──────────────────────────────────────────────────────
+
+    def store_output(self, output: Any, inline_bytes: Optional[int] = None) -> Tuple[Any, Optional[str]]:
+        """``output`` as it should be stored in a row, and its blob digest:
+        unchanged (digest ``None``) when small, otherwise written to the
+        store and replaced by a reference."""
+        inline_bytes = settings.NODE_OUTPUT_INLINE_BYTES if inline_bytes is None else inline_bytes
+        if inline_bytes <= 0 or not isinstance(output, (dict, list)):
+            return output, None
+        encoded = json.dumps(output, separators=(",", ":"), default=str).encode()
+        if len(encoded) < inline_bytes:
+            return output, None
+        digest, stored = self.put(encoded)
+        logger.debug(f"Stored {len(encoded)} byte output as blob {digest[:12]} ({stored} bytes)")
+        return {BLOB_KEY: digest, "size_bytes": len(encoded), "summary": summarize(output)}, digest
+
+    def load_output(self, stored: Any, digest: Optional[str]) -> Any:
+        """Inverse of ``store_output``: the full output of a row whose
+        ``output_blob`` is ``digest``."""
+        if digest is None:
+            return stored
+        return json.loads(self.get(digest))
+
+
+blob_store = BlobStore()
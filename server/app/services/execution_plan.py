@@ -0,0 +1,211 @@
+"""
+Compiled execution plans for published workflow versions.
+
+A ``WorkflowVersion`` never changes once published, so everything the
+executor derives from its definition — topological order, adjacency,
+parent sets, branch handles and pre-parsed ``{{...}}`` templates —
+is computed once and kept in a bounded in-process LRU keyed by version id.
+"""
+
+import copy
+import logging
+import threading
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from app.core.config import settings
+from app.services.templates import compile_data
+
+logger = logging.getLogger("workflow")
+
+
+@dataclass(frozen=True)
+class PlanNode:
+    """One node of a compiled plan, addressed by its topological index."""
+
+    index: int
+    id: str
+    type: str
+    node: Mapping[str, Any]
+    # (child_index, sourceHandle) for every outgoing edge to a known node
+    children: Tuple[Tuple[int, str], ...]
+    # Bitset of parent indices and the number of incoming edges to wait for
+    parent_mask: int
+    in_degree: int
+    # True when an edge points here from a node that is not in the graph;
+    # such a parent can never be skipped, so the node is never auto-skipped.
+    has_unknown_parent: bool
+    # Pre-compiled ``data`` tree (see app.services.templates.compile_data)
+    template: Any
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    version_id: Optional[str]
+    workflow_id: Optional[str]
+    nodes: Tuple[PlanNode, ...]
+    index: Mapping[str, int]
+    settings: Mapping[str, Any]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def ancestors(self, node_id: str) -> Tuple[PlanNode, ...]:
+        """Every node ``node_id`` transitively depends on, in topological order."""
+        i = self.index.get(node_id)
+        if i is None:
+            return ()
+        mask = self.nodes[i].parent_mask
+        # Parents come earlier in topological order, so one backward pass
+        # collects the closure
+        for j in range(i - 1, -1, -1):
+            if mask >> j & 1:
+                mask |= self.nodes[j].parent_mask
+        return tuple(pn for pn in self.nodes[:i] if mask >> pn.index & 1)
+
+
+def topological_order(nodes: list, edges: list) -> list:
+    """
+    Kahn's algorithm. Returns nodes in execution order.
+    Falls back to array order if there are no edges.
+    """
+    if not edges:
+        return list(nodes)
+
+    node_ids = [n["id"] for n in nodes]
+    adj: Dict[str, List[str]] = defaultdict(list)
+    in_degree: Dict[str, int] = {nid: 0 for nid in node_ids}
+
+    for edge in edges:
+        src, tgt = edge["source"], edge["target"]
+        if src in in_degree and tgt in in_degree:
+            adj[src].append(tgt)
+            in_degree[tgt] += 1
+
+    queue = deque([nid for nid in node_ids if in_degree[nid] == 0])
+    ordered_ids: List[str] = []
+
+    while queue:
+        nid = queue.popleft()
+        ordered_ids.append(nid)
+        for tgt in adj[nid]:
+            in_degree[tgt] -= 1
+            if in_degree[tgt] == 0:
+                queue.append(tgt)
+
+    # Include any nodes left out due to cycles (shouldn't happen, but be safe)
+    seen = set(ordered_ids)
+    for nid in node_ids:
+        if nid not in seen:
+            ordered_ids.append(nid)
+
+    lookup = {n["id"]: n for n in nodes}
+    return [lookup[nid] for nid in ordered_ids if nid in lookup]
+
+
+def compile_plan(
+    definition: dict,
+    version_id: Optional[str] = None,
+    workflow_id: Optional[str] = None,
+) -> ExecutionPlan:
+    """Compile a workflow definition into an immutable ``ExecutionPlan``."""
+    definition = copy.deepcopy(definition or {})
+    nodes: list = definition.get("nodes", [])
+    edges: list = definition.get("edges", [])
+
+    lookup = {n["id"]: n for n in nodes}
+    ordered_ids = [n["id"] for n in topological_order(nodes, edges)]
+    index = {nid: i for i, nid in enumerate(ordered_ids)}
+
+    children: Dict[str, list] = defaultdict(list)
+    parent_mask: Dict[str, int] = defaultdict(int)
+    in_degree: Dict[str, int] = defaultdict(int)
+    unknown_parent: set = set()
+    for edge in edges:
+        src, tgt = edge["source"], edge["target"]
+        handle = edge.get("sourceHandle") or "output"
+        if src in index and tgt in index:
+            children[src].append((index[tgt], handle))
+            in_degree[tgt] += 1
+            parent_mask[tgt] |= 1 << index[src]
+        elif tgt in index:
+            unknown_parent.add(tgt)
+
+    plan_nodes = tuple(
+        PlanNode(
+            index=i,
+            id=nid,
+            type=lookup[nid]["type"],
+            node=lookup[nid],
+            children=tuple(children[nid]),
+            parent_mask=parent_mask[nid],
+            in_degree=in_degree[nid],
+            has_unknown_parent=nid in unknown_parent,
+            template=compile_data(lookup[nid].get("data", {})),
+        )
+        for i, nid in enumerate(ordered_ids)
+    )
+    return ExecutionPlan(
+        version_id=version_id,
+        workflow_id=workflow_id,
+        nodes=plan_nodes,
+        index=MappingProxyType(index),
+        settings=MappingProxyType(dict(definition.get("settings") or {})),
+    )
+
+
+class PlanCache:
+    """Thread-safe LRU of compiled plans keyed by ``WorkflowVersion.id``."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._plans: "OrderedDict[str, ExecutionPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version) -> ExecutionPlan:
+        """Return the plan for a ``WorkflowVersion``, compiling it on a miss."""
+        with self._lock:
+            plan = self._plans.get(version.id)
+            if plan is not None:
+                self._plans.move_to_end(version.id)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        plan = compile_plan(version.definition, version_id=version.id, workflow_id=version.workflow_id)
+        if self.maxsize <= 0:
+            return plan
+        with self._lock:
+            self._plans[version.id] = plan
+            self._plans.move_to_end(version.id)
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+        return plan
+
+    def invalidate(self, version_id: str) -> None:
+        with self._lock:
+            self._plans.pop(version_id, None)
+
+    def invalidate_workflow(self, workflow_id: str) -> None:
+        """Drop every cached plan belonging to a workflow (e.g. on publish)."""
+        with self._lock:
+            stale = [vid for vid, plan in self._plans.items() if plan.workflow_id == workflow_id]
+            for vid in stale:
+                del self._plans[vid]
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached plan(s) for workflow {workflow_id}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._plans), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+plan_cache = PlanCache(settings.EXECUTION_PLAN_CACHE_SIZE)
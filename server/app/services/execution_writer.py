@@ -0,0 +1,239 @@
+"""
+Write-behind persistence for NodeExecution state transitions.
+
+Instead of committing once when a node starts and again when it finishes
+(plus once per skipped node), the executor records transitions in a
+run-scoped buffer that is flushed in bulk: a single multi-row INSERT for new
+rows and a single executemany UPDATE for rows already written. A transition
+that arrives before its row was flushed is folded into the pending INSERT,
+so a fast node usually costs one row in one batch.
+
+The buffer flushes when it reaches ``NODE_EXECUTION_FLUSH_SIZE`` pending
+transitions, every ``NODE_EXECUTION_FLUSH_INTERVAL`` seconds while a run is
+active, and at the end of the run. On an event loop the writes run on a
+worker thread (``flush_async``), so one run's database round-trips do not
+stall the other runs sharing the loop. ``NODE_EXECUTION_STRICT_WRITES``
+restores per-transition commits for debugging; on a loop each transition is
+still written on a worker thread, in order, and ``flush_async`` waits for
+them.
+
+Large input values are replaced by references to run payloads (see
+``run_payloads``); new payload rows are inserted in the same flush, ahead
+of the executions that reference them.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.run import NodeExecution, NodeStatus, RunPayload
+from app.services.run_payloads import PayloadEncoder, drop_stored
+
+logger = logging.getLogger("workflow")
+
+# Every buffered row carries the same keys so each flush is one executemany batch
+_INSERT_FIELDS = (
+    "id", "run_id", "node_id", "node_type", "status", "input_data", "output_data",
+    "output_blob", "error_message", "started_at", "completed_at", "retry_count",
+)
+
+
+class NodeExecutionWriter:
+    def __init__(
+        self,
+        db: Session,
+        strict: Optional[bool] = None,
+        max_pending: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        payloads: Optional[PayloadEncoder] = None,
+        lock: Optional[asyncio.Lock] = None,
+    ):
+        self.db = db
+        self.strict = settings.NODE_EXECUTION_STRICT_WRITES if strict is None else strict
+        self.max_pending = max_pending or settings.NODE_EXECUTION_FLUSH_SIZE
+        self.flush_interval = flush_interval or settings.NODE_EXECUTION_FLUSH_INTERVAL
+        self.payloads = payloads or PayloadEncoder()
+        self._inserts: Dict[str, Dict[str, Any]] = {}
+        self._updates: Dict[str, Dict[str, Any]] = {}
+        self._retry_counts: Dict[str, int] = {}
+        self._pending = 0
+        self._oldest: Optional[float] = None
+        self.flushes = 0
+        # Held while the session is in use on a worker thread; share it
+        # with other users of the session
+        self.lock = lock or asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self._error: Optional[Exception] = None
+
+    # ── Transitions ───────────────────────────────────────────────────────
+
+    def started(self, run_id: str, node: dict, input_data: Any, retry_count: int = 0) -> str:
+        """Record a RUNNING execution of ``node`` with its resolved inputs
+        and return its id."""
+        execution_id = str(uuid.uuid4())
+        row = dict.fromkeys(_INSERT_FIELDS)
+        row.update(
+            id=execution_id,
+            run_id=run_id,
+            node_id=node["id"],
+            node_type=node["type"],
+            status=NodeStatus.RUNNING,
+            input_data=self.payloads.encode(run_id, input_data),
+            started_at=datetime.utcnow(),
+            retry_count=retry_count,
+        )
+        self._inserts[execution_id] = row
+        self._retry_counts[execution_id] = retry_count
+        self._record()
+        return execution_id
+
+    def finished(
+        self,
+        execution_id: str,
+        status: NodeStatus,
+        output_data: Any = None,
+        error_message: Optional[str] = None,
+        retry_count: Optional[int] = None,
+        output_blob: Optional[str] = None,
+    ) -> None:
+        """Record the terminal state (SUCCESS/FAILED) of a started execution.
+
+        ``output_data`` is stored as given; large outputs should already be
+        blob references, with their digest in ``output_blob``
+        (``BlobStore.store_output``).
+        """
+        if retry_count is None:
+            retry_count = self._retry_counts.get(execution_id, 0)
+        changes = {
+            "status": status,
+            "output_data": output_data,
+            "output_blob": output_blob,
+            "error_message": error_message,
+            "completed_at": datetime.utcnow(),
+            "retry_count": retry_count,
+        }
+        self._retry_counts.pop(execution_id, None)
+        pending = self._inserts.get(execution_id)
+        if pending is not None:
+            pending.update(changes)
+        else:
+            self._updates[execution_id] = {"id": execution_id, **changes}
+        self._record()
+
+    def skipped(self, run_id: str, node: dict) -> None:
+        now = datetime.utcnow()
+        row = dict.fromkeys(_INSERT_FIELDS)
+        row.update(
+            id=str(uuid.uuid4()),
+            run_id=run_id,
+            node_id=node["id"],
+            node_type=node["type"],
+            status=NodeStatus.SKIPPED,
+            started_at=now,
+            completed_at=now,
+            retry_count=0,
+        )
+        self._inserts[row["id"]] = row
+        self._record()
+
+    # ── Flushing ──────────────────────────────────────────────────────────
+
+    def _record(self) -> None:
+        self._pending += 1
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if self.strict:
+            self._flush_soon(self._take())
+        elif self._pending >= self.max_pending or time.monotonic() - self._oldest >= self.flush_interval:
+            self._flush_soon()
+
+    def _flush_soon(self, batch=None) -> None:
+        """Write ``batch`` (already taken), or whatever is buffered, in a
+        background task; immediately when not on an event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on an event loop: there is nothing to block
+            if batch is None:
+                self.flush()
+            else:
+                self._write(batch)
+            return
+        task = loop.create_task(self._flush_in_background(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _take(self) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Empty the buffers; the batch is written by ``_write``."""
+        if not self._inserts and not self._updates:
+            return None
+        inserts, updates = list(self._inserts.values()), list(self._updates.values())
+        self._inserts, self._updates = {}, {}
+        self._pending, self._oldest = 0, None
+        return self.payloads.take_pending(), inserts, updates
+
+    def _write(self, batch) -> None:
+        payloads, inserts, updates = batch
+        try:
+            payloads = drop_stored(self.db, payloads)
+            if payloads:
+                self.db.execute(insert(RunPayload), payloads)
+            if inserts:
+                self.db.execute(insert(NodeExecution), inserts)
+            if updates:
+                self.db.execute(update(NodeExecution), updates)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.flushes += 1
+        logger.debug(f"Flushed {len(inserts)} insert(s) and {len(updates)} update(s) of node executions")
+
+    def flush(self) -> None:
+        """Write every buffered transition and commit, on this thread."""
+        batch = self._take()
+        if batch is not None:
+            self._write(batch)
+
+    async def flush_async(self) -> None:
+        """Write every buffered transition and commit on a worker thread,
+        after any flush already in progress.
+
+        Raises the error of a failed background flush, whose transitions
+        are lost.
+        """
+        # Batches already handed to background tasks go first
+        if self._tasks:
+            await asyncio.wait(set(self._tasks))
+        await self._write_async(self._take())
+
+    async def _write_async(self, batch) -> None:
+        # Batches are taken and queued on the lock in the same step (or in
+        # task creation order), so they are written in order
+        async with self.lock:
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            if batch is not None:
+                await asyncio.to_thread(self._write, batch)
+
+    async def _flush_in_background(self, batch=None) -> None:
+        try:
+            await self._write_async(self._take() if batch is None else batch)
+        except Exception as e:
+            logger.error(f"Could not flush node executions: {e}")
+            self._error = e
+
+    async def autoflush(self) -> None:
+        """Flush on the time threshold while a run is active; cancel to stop."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._pending:
+                await self._flush_in_background()
@@ -0,0 +1,308 @@
+"""
+HTML to ``{title, content}`` extraction.
+
+Pure parsing with no application state, so the functions here can run in
+extraction worker processes (see ``extraction_pool``) as well as in-process.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from lxml import etree
+
+MAX_CONTENT_CHARS = 5000
+# Bump whenever extraction output changes: cached articles extracted by
+# another version are treated as misses
+EXTRACTOR_VERSION = 2
+
+_SKIPPED_TAGS = frozenset(["script", "style", "nav", "footer", "header"])
+_CONTAINER_TAGS = frozenset(["article", "main"])
+_TEXT_TAGS = frozenset(["p", "h1", "title"])
+_PERMALINK_CHARS = "¶§ \t\n"
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+
+
+def _html_parser(head: bytes, encoding: Optional[str], parser_cls=etree.HTMLParser, **kwargs):
+    """Build an lxml parser for a page whose first bytes are ``head``."""
+    # A <meta charset> in the page wins over the header, as in browsers
+    m = _META_CHARSET_RE.search(head[:2048])
+    declared = m.group(1).decode("ascii", "ignore") if m else (encoding or "utf-8")
+    try:
+        return parser_cls(encoding=declared, **kwargs)
+    except LookupError:
+        return parser_cls(encoding="utf-8", **kwargs)
+
+
+def _finish(title: Optional[str], paragraphs: List[str], url: str) -> Dict[str, str]:
+    if title:
+        title = title.rstrip(_PERMALINK_CHARS)  # "Heading¶" from docs generators
+    content = " ".join(" ".join(paragraphs).split())
+    if len(content) > MAX_CONTENT_CHARS:
+        content = content[:MAX_CONTENT_CHARS] + "..."
+    return {"title": title or url, "content": content}
+
+
+def extract_article(html: bytes, url: str, encoding: Optional[str] = None) -> Dict[str, str]:
+    """Extract a title and up to 5000 characters of paragraph text from HTML.
+
+    The page is parsed once with lxml, boilerplate subtrees (script, style,
+    nav, footer, header) are stripped in C, and a single ``iter`` pass
+    collects the title and buckets paragraph text by content block: text
+    inside ``<article>``/``<main>`` wins, otherwise every paragraph is used.
+    The pass stops early once the container bucket is full.
+    """
+    try:
+        root = etree.fromstring(html, _html_parser(html, encoding))
+    except etree.XMLSyntaxError:  # empty document
+        root = None
+    if root is None:
+        return _finish(None, [], url)
+    etree.strip_elements(root, *_SKIPPED_TAGS, with_tail=False)
+
+    h1 = title = None
+    scoped: List[str] = []
+    scoped_len = 0
+    everything: List[str] = []
+    seen_container = False
+    for el in root.iter("p", "h1", "title", "article", "main"):
+        tag = el.tag
+        if tag == "p":
+            text = "".join(el.itertext()).strip()
+            everything.append(text)
+            if seen_container and next(el.iterancestors("article", "main"), None) is not None:
+                scoped.append(text)
+                scoped_len += len(text) + 1
+                if scoped_len > MAX_CONTENT_CHARS:
+                    break
+        elif tag in _CONTAINER_TAGS:
+            seen_container = True
+        elif tag == "h1":
+            if h1 is None:
+                h1 = "".join(el.itertext()).strip()
+        elif title is None:
+            title = "".join(el.itertext()).strip()
+
+    return _finish(h1 or title, scoped if seen_container else everything, url)
+
+
+def _local_text(el, parts: List[str]) -> None:
+    """Collect the text of ``el`` without descending into skipped tags."""
+    if el.text:
+        parts.append(el.text)
+    for child in el:
+        if isinstance(child.tag, str) and child.tag not in _SKIPPED_TAGS:
+            _local_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+
+def _text_of(el) -> str:
+    parts: List[str] = []
+    _local_text(el, parts)
+    return "".join(parts).strip()
+
+
+class StreamingExtractor:
+    """Incremental counterpart of ``extract_article``.
+
+    Bytes are fed to an lxml pull parser as they arrive. Paragraph text is
+    collected on the fly (ignoring script, style, nav, footer and header) and
+    finished subtrees are dropped, so memory stays proportional to the chunk
+    rather than the page. ``feed`` returns True once enough text has been
+    collected: ``MAX_CONTENT_CHARS`` of ``<article>``/``<main>`` paragraphs,
+    or of any paragraphs while no such container has been seen.
+    """
+
+    def __init__(self, url: str, encoding: Optional[str] = None):
+        self.url = url
+        self.encoding = encoding
+        self._parser: Optional[etree.HTMLPullParser] = None
+        self._skip_depth = 0
+        self._container_depth = 0
+        self._open_text = 0
+        self._seen_container = False
+        self._h1: Optional[str] = None
+        self._title: Optional[str] = None
+        self._scoped: List[str] = []
+        self._scoped_len = 0
+        self._all: List[str] = []
+        self._all_len = 0
+        self._held = b""
+        self.bytes_read = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.done or not chunk:
+            return self.done
+        if self._parser is None:
+            self._parser = _html_parser(chunk, self.encoding, etree.HTMLPullParser, events=("start", "end"))
+        self.bytes_read += len(chunk)
+        # libxml2's push parser loses the rest of the document when a chunk
+        # boundary falls inside a closing </script> tag, so hold back any
+        # trailing, unterminated tag until the next chunk completes it
+        data = self._held + chunk
+        lt = data.rfind(b"<")
+        if lt != -1 and data.find(b">", lt) == -1:
+            data, self._held = data[:lt], data[lt:]
+        else:
+            self._held = b""
+        self._parser.feed(data)
+        self._drain()
+        return self.done
+
+    def _drain(self) -> None:
+        for event, el in self._parser.read_events():
+            tag = el.tag if isinstance(el.tag, str) else None
+            if event == "start":
+                if tag in _SKIPPED_TAGS:
+                    self._skip_depth += 1
+                elif tag in _CONTAINER_TAGS:
+                    self._container_depth += 1
+                    self._seen_container = True
+                if tag in _TEXT_TAGS:
+                    self._open_text += 1
+                continue
+
+            if tag in _TEXT_TAGS:
+                self._open_text -= 1
+            if tag in _SKIPPED_TAGS:
+                self._skip_depth -= 1
+            elif tag in _CONTAINER_TAGS:
+                self._container_depth -= 1
+            elif tag == "p":
+                if not self._skip_depth:
+                    self._add_paragraph(_text_of(el))
+            elif not self._skip_depth:
+                if tag == "h1" and self._h1 is None:
+                    self._h1 = _text_of(el)
+                elif tag == "title" and self._title is None:
+                    self._title = _text_of(el)
+
+            # Drop finished subtrees unless an enclosing <p>/<h1>/<title> still needs them
+            if not self._open_text and tag not in ("html", "body"):
+                el.clear(keep_tail=True)
+                parent = el.getparent()
+                if parent is not None:
+                    while el.getprevious() is not None:
+                        del parent[0]
+
+            if self._scoped_len > MAX_CONTENT_CHARS or (
+                not self._seen_container and self._all_len > MAX_CONTENT_CHARS
+            ):
+                self.done = True
+                return
+
+    def _add_paragraph(self, text: str) -> None:
+        self._all.append(text)
+        self._all_len += len(text) + 1
+        if self._container_depth:
+            self._scoped.append(text)
+            self._scoped_len += len(text) + 1
+
+    def result(self) -> Dict[str, str]:
+        if self._parser is not None and not self.done:
+            try:
+                self._parser.feed(self._held)
+                self._parser.close()
+            except etree.Error:
+                pass
+            self._drain()
+        paragraphs = self._scoped if self._seen_container else self._all
+        return _finish(self._h1 or self._title, paragraphs, self.url)
+
+
+_TAG_RE = re.compile(rb"<(/?)([a-zA-Z][a-zA-Z0-9]*)[^>]*>")
+# Start tags that end an open <p>, as the HTML parser does
+_P_CLOSERS = frozenset([
+    "p", "div", "section", "article", "main", "aside", "header", "footer", "nav", "ul", "ol", "dl",
+    "table", "form", "pre", "blockquote", "hr", "h1", "h2", "h3", "h4", "h5", "h6",
+])
+
+
+class TextCounter:
+    """Cheap estimate of when ``StreamingExtractor`` would stop.
+
+    For pages parsed elsewhere (the extraction pool): a regex scan over the
+    raw bytes counts paragraph text outside script, style, nav, footer and
+    header, overall and within ``<article>``/``<main>``, without building a
+    tree. ``feed`` returns True once the bucket the extractor would use
+    holds ``margin`` times ``MAX_CONTENT_CHARS``; the margin covers markup
+    and entities the scan counts as text, so a page cut there extracts to
+    the same content.
+    """
+
+    def __init__(self, margin: float = 2.0):
+        self.limit = MAX_CONTENT_CHARS * margin
+        self._held = b""
+        self._skip_depth = 0
+        self._container_depth = 0
+        self._in_p = False
+        self._seen_container = False
+        self._scoped_len = 0
+        self._all_len = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.done or not chunk:
+            return self.done
+        data = self._held + chunk
+        lt = data.rfind(b"<")
+        if lt != -1 and data.find(b">", lt) == -1:
+            data, self._held = data[:lt], data[lt:]
+        else:
+            self._held = b""
+
+        pos = 0
+        for m in _TAG_RE.finditer(data):
+            self._count(data[pos:m.start()])
+            pos = m.end()
+            closing, tag = m.group(1), m.group(2).decode("ascii").lower()
+            if tag in _SKIPPED_TAGS:
+                self._skip_depth = max(0, self._skip_depth + (-1 if closing else 1))
+            elif tag in _CONTAINER_TAGS:
+                self._container_depth = max(0, self._container_depth + (-1 if closing else 1))
+                self._seen_container = True
+            if closing:
+                if tag == "p":
+                    self._in_p = False
+            elif tag in _P_CLOSERS:
+                self._in_p = tag == "p"
+        self._count(data[pos:])
+
+        counted = self._scoped_len if self._seen_container else self._all_len
+        self.done = counted > self.limit
+        return self.done
+
+    def _count(self, text: bytes) -> None:
+        if not self._in_p or self._skip_depth or not text:
+            return
+        n = len(b" ".join(text.split()))
+        self._all_len += n
+        if self._container_depth:
+            self._scoped_len += n
+
+
+_FEED_CHUNK = 64 * 1024
+
+
+def extract_html(html: bytes, url: str, encoding: Optional[str] = None, streaming: bool = True) -> Dict[str, str]:
+    """Extract an already-downloaded page.
+
+    With ``streaming`` the bytes go through ``StreamingExtractor`` in 64 KiB
+    slices and parsing stops as soon as enough text is collected; otherwise
+    the whole document is parsed by ``extract_article``.
+    """
+    if not streaming:
+        return extract_article(html, url, encoding)
+    extractor = StreamingExtractor(url, encoding)
+    for offset in range(0, len(html), _FEED_CHUNK):
+        if extractor.feed(html[offset:offset + _FEED_CHUNK]):
+            break
+    return extractor.result()
+
+
+def warm_up() -> None:
+    """Import and exercise the parsers once so a new worker's first page isn't slow."""
+    page = b"<html><head><title>t</title></head><body><article><p>x</p></article></body></html>"
+    extract_html(page, "warm-up")
+    extract_article(page, "warm-up")
@@ -0,0 +1,94 @@
+"""
+Process pool for CPU-bound HTML extraction.
+
+Parsing holds the GIL, so running it on the API process (even in a thread)
+stalls request handling while a large trigger is being processed. Downloaded
+bytes are handed to a ``ProcessPoolExecutor`` of ``EXTRACTION_WORKERS``
+warm workers instead, and only the small ``{title, content}`` result comes
+back.
+
+The pool is started and shut down by the application lifespan. Submissions
+are bounded to ``EXTRACTION_QUEUE_SIZE`` in flight so a burst of URLs waits
+for a slot rather than piling page bodies into the executor queue. When the
+pool is disabled (``EXTRACTION_WORKERS=0``) or not started (scripts, tests),
+extraction runs in a thread as before.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.extraction import extract_html, warm_up
+
+logger = logging.getLogger("workflow")
+
+
+class ExtractionPool:
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self.workers = settings.EXTRACTION_WORKERS if workers is None else workers
+        self.queue_size = queue_size or settings.EXTRACTION_QUEUE_SIZE or self.workers * 2
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Spawn and warm the workers (blocking; call via ``asyncio.to_thread``)."""
+        with self._lock:
+            if self._executor is not None or self.workers <= 0:
+                return
+            # "spawn" keeps workers free of the parent's threads and sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_up,
+            )
+            self._slots = threading.BoundedSemaphore(self.queue_size)
+        # Workers are spawned on demand; submit one no-op per worker so they
+        # are all up (and warm) before the first trigger arrives
+        for future in [self._executor.submit(int) for _ in range(self.workers)]:
+            future.result()
+        logger.info(f"Extraction pool started ({self.workers} workers, {self.queue_size} in flight)")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            logger.info("Extraction pool stopped")
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    # ── Extraction ────────────────────────────────────────────────────────
+
+    async def extract(
+        self, html: bytes, url: str, encoding: Optional[str] = None, streaming: bool = True
+    ) -> Dict[str, str]:
+        """Extract ``{title, content}`` from ``html`` in a worker process."""
+        executor, slots = self._executor, self._slots
+        if executor is None:
+            return await asyncio.to_thread(extract_html, html, url, encoding, streaming)
+
+        # A threading semaphore because runs execute on different event loops;
+        # poll rather than block so a cancelled caller never holds a slot
+        while not slots.acquire(blocking=False):
+            await asyncio.sleep(0.02)
+        try:
+            future = executor.submit(extract_html, html, url, encoding, streaming)
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            logger.error("Extraction pool is broken; extracting in-process")
+            return await asyncio.to_thread(extract_html, html, url, encoding, streaming)
+        finally:
+            slots.release()
+
+
+extraction_pool = ExtractionPool()
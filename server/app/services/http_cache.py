@@ -0,0 +1,200 @@
+"""
+Size-bounded on-disk cache for fetched articles.
+
+Each entry stores the extracted ``title``/``content`` of a URL together with
+its HTTP validators (``ETag``/``Last-Modified``) and a freshness deadline
+taken from ``Cache-Control: max-age``. A fresh entry is served without a
+request; a stale one is revalidated with ``If-None-Match`` /
+``If-Modified-Since`` so an unchanged page costs a 304 and no parsing.
+
+Entries are JSON files named by the SHA-256 of the URL. File mtimes double
+as LRU order: hits touch the file and the oldest files are evicted once the
+directory grows past ``max_bytes``. Entries record the ``EXTRACTOR_VERSION``
+that produced them; entries from another extractor are misses.
+
+Every method does blocking file I/O; call them from threads or ``to_thread``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from app.core.config import settings
+from app.services.extraction import EXTRACTOR_VERSION
+
+logger = logging.getLogger("workflow")
+
+_MAX_AGE_RE = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds a response may be served without revalidation; None = don't store."""
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "private" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0.0
+    m = _MAX_AGE_RE.search(cache_control)
+    if m:
+        return float(m.group(1))
+    return float(settings.HTTP_CACHE_DEFAULT_TTL)
+
+
+class ArticleCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    # ── Lookups ───────────────────────────────────────────────────────────
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        path = self._path(url)
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or entry.get("extractor") != EXTRACTOR_VERSION:
+            return None
+        os.utime(path)  # LRU: most recently used
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: Mapping[str, Any]) -> bool:
+        return entry.get("expires_at", 0) > time.time()
+
+    @staticmethod
+    def validators(entry: Mapping[str, Any]) -> Dict[str, str]:
+        """Conditional request headers for revalidating ``entry``."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    # ── Updates ───────────────────────────────────────────────────────────
+
+    def put(self, url: str, title: str, content: str, headers: Mapping[str, str]) -> None:
+        lifetime = freshness_lifetime(headers)
+        if lifetime is None:
+            return
+        etag, last_modified = headers.get("etag"), headers.get("last-modified")
+        if lifetime <= 0 and not etag and not last_modified:
+            return  # could never be served or revalidated
+        self._write(url, {
+            "url": url,
+            "extractor": EXTRACTOR_VERSION,
+            "title": title,
+            "content": content,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": time.time() + lifetime,
+            "stored_at": time.time(),
+        })
+
+    def refresh(self, url: str, entry: Dict[str, Any], headers: Mapping[str, str]) -> None:
+        """Extend an entry after a 304 Not Modified."""
+        lifetime = freshness_lifetime(headers)
+        if lifetime is None:
+            self._remove(self._path(url))
+            return
+        entry["expires_at"] = time.time() + lifetime
+        entry["etag"] = headers.get("etag") or entry.get("etag")
+        entry["last_modified"] = headers.get("last-modified") or entry.get("last_modified")
+        self._write(url, entry)
+
+    def _write(self, url: str, entry: Dict[str, Any]) -> None:
+        path = self._path(url)
+        data = json.dumps(entry).encode("utf-8")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            old_size = path.stat().st_size if path.exists() else 0
+            tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"HTTP cache write failed for {url}: {e}")
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - old_size
+            over = self._size > self.max_bytes
+        if over:
+            self._evict()
+
+    def _remove(self, path: Path) -> int:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return 0
+        return size
+
+    def _entries(self) -> list:
+        """(mtime, size, path) for every entry; files removed concurrently are ignored."""
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache is at 90% of its cap."""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda e: e[0])
+            size = sum(e[1] for e in entries)
+            target = self.max_bytes * 0.9
+            for _, _, path in entries:
+                if size <= target:
+                    break
+                size -= self._remove(path)
+                self.evictions += 1
+            self._size = size
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.directory.glob("*/*.json"):
+                self._remove(path)
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0,
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+article_cache: Optional[ArticleCache] = (
+    ArticleCache(settings.HTTP_CACHE_DIR, settings.HTTP_CACHE_MAX_BYTES)
+    if settings.HTTP_CACHE_ENABLED else None
+)
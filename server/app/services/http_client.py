@@ -0,0 +1,327 @@
+"""
+Process-wide pooled async HTTP client for outbound node requests.
+
+One ``httpx.AsyncClient`` is created in the application lifespan and shared
+by every run, so connections (and TLS sessions) are kept alive between
+requests instead of being opened per call on a threadpool thread.
+
+The client belongs to the event loop it was started on. A long-lived loop
+that sends many requests (the run executor, the worker) starts a client of
+its own; callers on any other loop are bridged onto the owner loop as a
+fallback, so the connection pool is never touched from two loops at once.
+Every URL is checked with ``validate_url_for_ssrf_async`` before it is
+sent, and every connection (including redirect hops) is opened to the
+addresses that were validated rather than re-resolving the hostname, so one
+cached lookup is both the check and the connect target.
+"""
+
+import asyncio
+import contextlib
+import logging
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import httpcore
+import httpx
+
+from app.core.config import settings
+from app.core.security import dns_cache, resolve_public_host_async, validate_url_for_ssrf_async
+
+logger = logging.getLogger("workflow")
+
+dns_cache.configure(ttl=settings.DNS_CACHE_TTL, max_entries=settings.DNS_CACHE_MAX_ENTRIES)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _PinnedNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Connects to the SSRF-validated addresses of a host instead of resolving it again.
+
+    Addresses are tried in resolver order until one accepts the connection.
+    TLS still uses the original hostname for SNI and certificate checks.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend):
+        self._backend = backend
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        addresses = await resolve_public_host_async(host)
+        for i, address in enumerate(addresses):
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout):
+                if i == len(addresses) - 1:
+                    raise
+                logger.debug(f"Could not connect to {host} at {address}, trying the next address")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        raise ValueError("Unix socket connections are not permitted.")
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# httpcore errors and their httpx counterparts, most specific first
+_HTTPCORE_ERRORS = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+_HTTPCORE_ERROR_TYPES = tuple(core for core, _ in _HTTPCORE_ERRORS)
+
+
+@contextlib.contextmanager
+def _httpx_errors():
+    """Re-raise httpcore errors as the httpx errors callers catch."""
+    try:
+        yield
+    except _HTTPCORE_ERROR_TYPES as exc:
+        mapped = next(ours for core, ours in _HTTPCORE_ERRORS if isinstance(exc, core))
+        raise mapped(str(exc)) from exc
+
+
+class _PinnedResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def __aiter__(self):
+        with _httpx_errors():
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class _PinnedTransport(httpx.AsyncBaseTransport):
+    """httpx transport over an httpcore pool whose connections use ``_PinnedNetworkBackend``."""
+
+    def __init__(self, limits: httpx.Limits, http2: bool = False):
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            network_backend=_PinnedNetworkBackend(httpcore.AnyIOBackend()),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors():
+            response = await self._pool.handle_async_request(core_request)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_PinnedResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+
+class SharedHttpClient:
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_connections_per_host: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        http2: Optional[bool] = None,
+    ):
+        self.max_connections = max_connections or settings.HTTP_MAX_CONNECTIONS
+        self.max_connections_per_host = max_connections_per_host or settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        self.max_keepalive = max_keepalive or settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+        self.http2 = settings.HTTP2_ENABLED if http2 is None else http2
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Per-host semaphore and its number of users; dropped when unused
+        self._host_slots: Dict[str, list] = {}
+        self._http2_active = False
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = self.http2
+        if http2 and not _http2_available():
+            logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+        self._http2_active = http2
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        return httpx.AsyncClient(
+            transport=_PinnedTransport(limits=limits, http2=http2),
+            follow_redirects=True,
+        )
+
+    async def start(self) -> None:
+        """Create the pool on the running loop (call from the app lifespan)."""
+        if self._client is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._client = self._build_client()
+        logger.info(
+            f"Shared HTTP client started (max_connections={self.max_connections}, "
+            f"per_host={self.max_connections_per_host}, http2={self._http2_active})"
+        )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+        self._host_slots.clear()
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None
+
+    # ── Requests ──────────────────────────────────────────────────────────
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        timeout: float = 30,
+    ) -> httpx.Response:
+        """Send a request and return the fully-read response.
+
+        Raises:
+            ValueError: when the URL (or a redirect target) fails SSRF validation.
+            httpx.HTTPError: on transport errors.
+        """
+        await validate_url_for_ssrf_async(url)
+        kwargs = {"headers": headers, "json": json, "timeout": timeout}
+
+        if self._client is None:
+            # Not started (scripts, tests): use a short-lived client
+            async with self._build_client() as client:
+                return await client.request(method, url, **kwargs)
+
+        if asyncio.get_running_loop() is self._loop:
+            return await self._send(method, url, kwargs)
+        future = asyncio.run_coroutine_threadsafe(self._send(method, url, kwargs), self._loop)
+        return await asyncio.wrap_future(future)
+
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        on_chunk: Callable[[bytes], bool],
+        *,
+        on_response: Optional[Callable[[httpx.Response], None]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30,
+        max_bytes: Optional[int] = None,
+    ) -> httpx.Response:
+        """Send a request and hand the body to ``on_chunk`` as it arrives.
+
+        ``on_response`` is called once the headers of a 2xx response are in;
+        the body is not read for other statuses. Reading stops when
+        ``on_chunk`` returns True or ``max_bytes`` have been delivered, and
+        the connection is released without draining the rest. Both callbacks
+        run on the client's loop, so they must be quick. Returns the response
+        (its body is not retained).
+        """
+        await validate_url_for_ssrf_async(url)
+        args = (method, url, on_chunk, on_response, {"headers": headers, "timeout": timeout}, max_bytes)
+
+        if self._client is None:
+            async with self._build_client() as client:
+                return await self._stream_body(client, *args)
+
+        if asyncio.get_running_loop() is self._loop:
+            return await self._stream_send(*args)
+        future = asyncio.run_coroutine_threadsafe(self._stream_send(*args), self._loop)
+        return await asyncio.wrap_future(future)
+
+    @contextlib.asynccontextmanager
+    async def _host_slot(self, url: str):
+        """Hold one of the host's ``max_connections_per_host`` slots.
+
+        A host's entry is removed once no request uses or waits for it, so
+        the map only holds hosts with requests in flight.
+        """
+        host = urlparse(url).netloc.lower()
+        entry = self._host_slots.get(host)
+        if entry is None:
+            entry = self._host_slots[host] = [asyncio.Semaphore(self.max_connections_per_host), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._host_slots[host]
+
+    async def _send(self, method: str, url: str, kwargs: dict) -> httpx.Response:
+        async with self._host_slot(url):
+            return await self._client.request(method, url, **kwargs)
+
+    async def _stream_send(self, *args) -> httpx.Response:
+        async with self._host_slot(args[1]):
+            return await self._stream_body(self._client, *args)
+
+    @staticmethod
+    async def _stream_body(
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        on_chunk: Callable[[bytes], bool],
+        on_response: Optional[Callable[[httpx.Response], None]],
+        kwargs: dict,
+        max_bytes: Optional[int],
+    ) -> httpx.Response:
+        async with client.stream(method, url, **kwargs) as response:
+            if not response.is_success:
+                return response
+            if on_response is not None:
+                on_response(response)
+            remaining = max_bytes
+            async for chunk in response.aiter_bytes():
+                if remaining is not None:
+                    chunk = chunk[:remaining]
+                    remaining -= len(chunk)
+                if on_chunk(chunk) or remaining == 0:
+                    break
+            return response
+
+
+http_client = SharedHttpClient()
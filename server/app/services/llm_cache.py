@@ -0,0 +1,234 @@
+"""
+Content-addressed cache of LLM responses.
+
+Responses are keyed on SHA-256 of (model, prompt), so the same article text
+or the same instruction+context is sent to Gemini once per TTL no matter
+how many runs ask for it. Two tiers:
+
+- L1: a local SQLite file (``LLM_CACHE_PATH``), LRU-evicted past
+  ``LLM_CACHE_MAX_ENTRIES``.
+- L2: Redis (``REDIS_URL``), shared by every API process and worker; entries
+  expire through Redis' own TTL. Redis errors are logged and treated as a miss.
+
+Concurrent identical prompts (from any run, thread or event loop) are
+coalesced: one caller generates and the others wait for its result. Only
+successful generations are stored. Each entry remembers how long its
+generation took, so hits can report the upstream latency they saved.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger("workflow")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    latency REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+def cache_key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        redis_client: Any = None,
+    ):
+        self.path = path or settings.LLM_CACHE_PATH
+        self.ttl = ttl or settings.LLM_CACHE_TTL
+        self.max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        self.redis = redis_client if redis_client is not None else get_redis()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._puts = 0
+        self.hits_local = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.saved_latency = 0.0
+
+    # ── Storage ───────────────────────────────────────────────────────────
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def _lookup(self, key: str) -> Optional[Tuple[str, float]]:
+        now = time.time()
+        with self._db_lock:
+            db = self._conn()
+            row = db.execute(
+                "SELECT response, latency, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                if row[2] > now:
+                    db.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+                    self.hits_local += 1
+                    return row[0], row[1]
+                db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(f"llm:{key}")
+            except redis.RedisError as e:
+                self.errors += 1
+                logger.debug(f"LLM cache: Redis lookup failed: {e}")
+                raw = None
+            if raw is not None:
+                try:
+                    entry = json.loads(raw)
+                    response, latency = str(entry["response"]), float(entry["latency"])
+                except (ValueError, TypeError, KeyError) as e:
+                    # Corrupt or from an older format: drop it and regenerate
+                    self.errors += 1
+                    logger.debug(f"LLM cache: unreadable Redis entry {key}: {e!r}")
+                    try:
+                        self.redis.delete(f"llm:{key}")
+                    except redis.RedisError:
+                        pass
+                    return None
+                self._store_local(key, response, latency)
+                self.hits_redis += 1
+                return response, latency
+        return None
+
+    def _store_local(self, key: str, response: str, latency: float) -> None:
+        now = time.time()
+        with self._db_lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, latency, expires_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, latency, now + self.ttl, now),
+            )
+            self._puts += 1
+            if self._puts % 100 == 0:
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        (count,) = db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        if count > self.max_entries:
+            db.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def _store(self, key: str, response: str, latency: float) -> None:
+        self._store_local(key, response, latency)
+        if self.redis is not None:
+            try:
+                self.redis.set(
+                    f"llm:{key}", json.dumps({"response": response, "latency": latency}), ex=int(self.ttl)
+                )
+            except redis.RedisError as e:
+                self.errors += 1
+                logger.debug(f"LLM cache: Redis store failed: {e}")
+
+    # ── Lookup with coalescing ────────────────────────────────────────────
+
+    async def get_or_generate(self, model: str, prompt: str, generate: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached response for (model, prompt), generating it at most once."""
+        key = cache_key(model, prompt)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            self.coalesced += 1
+            try:
+                response, latency = await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if future.cancelled():  # the generating caller was cancelled; try ourselves
+                    return await self.get_or_generate(model, prompt, generate)
+                raise
+            self.saved_latency += latency
+            return response
+
+        try:
+            cached = await self._guarded(self._lookup, key)
+            if cached is not None:
+                self.saved_latency += cached[1]
+                future.set_result(cached)
+                return cached[0]
+
+            self.misses += 1
+            started = time.perf_counter()
+            response = await generate()
+            latency = time.perf_counter() - started
+            await self._guarded(self._store, key, response, latency)
+            future.set_result((response, latency))
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    async def _guarded(self, fn: Callable, *args) -> Any:
+        """Run a storage call in a thread; a broken cache must not fail the LLM call."""
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except (sqlite3.Error, OSError) as e:
+            self.errors += 1
+            logger.warning(f"LLM cache unavailable: {e}")
+            return None
+
+    # ── Metrics ───────────────────────────────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.hits_local + self.hits_redis
+        lookups = hits + self.misses + self.coalesced
+        return {
+            "hits_local": self.hits_local,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": round((hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+            "saved_latency_seconds": round(self.saved_latency, 3),
+            "redis": self.redis is not None,
+        }
+
+
+llm_cache: Optional[LLMCache] = LLMCache() if settings.LLM_CACHE_ENABLED else None
@@ -0,0 +1,106 @@
+"""
+Shared, bounded client for Gemini calls.
+
+``GenerativeModel.generate_content`` is synchronous; calling it from an
+``async`` node handler froze the run's event loop for the whole generation.
+Calls are instead run on a dedicated thread pool of ``LLM_MAX_CONCURRENCY``
+workers shared by every run, so the pool size is also the process-wide cap
+on concurrent model calls. Each call has a timeout (``LLM_TIMEOUT``), counted
+from when a pool thread starts it, that is also passed to the SDK so the
+underlying HTTP request is abandoned too.
+Before a call is queued it reserves its share of the RPM/TPM quota from the
+rate limiter, so waiting for quota does not hold a pool thread. Transient
+failures (429/5xx, timeouts) are retried up to ``LLM_RETRY_ATTEMPTS`` times
+in total with jittered exponential backoff.
+
+The SDK's ``generate_content_async`` is not used: its gRPC channel binds to
+the first event loop that uses it, and runs execute on separate loops.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+import google.generativeai as genai
+
+from app.core.config import settings
+from app.services.rate_limiter import RateLimiter, estimate_tokens, gemini_rate_limiter
+from app.services.retry import RetryPolicy, call_with_retry
+
+logger = logging.getLogger("workflow")
+
+if settings.GEMINI_API_KEY:
+    genai.configure(api_key=settings.GEMINI_API_KEY)
+
+
+class GeminiClient:
+    def __init__(
+        self,
+        model: Any = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        self.model_name = settings.GEMINI_MODEL
+        self.model = model or genai.GenerativeModel(self.model_name)
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.timeout = timeout or settings.LLM_TIMEOUT
+        self.rate_limiter = rate_limiter or gemini_rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy(attempts=max(1, settings.LLM_RETRY_ATTEMPTS))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="gemini")
+
+    def _generate_sync(self, prompt: str, timeout: float) -> str:
+        response = self.model.generate_content(prompt, request_options={"timeout": timeout})
+        return response.text
+
+    async def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """Generate a completion for ``prompt`` and return its text.
+
+        Waits for quota, then for a free slot in the shared pool. Cancelling
+        the caller drops a call that has not started yet; one already in
+        flight runs to its SDK timeout in the background. Transient failures
+        (429/5xx, timeouts) are retried with backoff per ``retry_policy``;
+        each attempt waits for quota again.
+
+        Raises:
+            TimeoutError: when no response arrives within ``timeout`` seconds
+                of the last attempt starting on a pool thread.
+        """
+        timeout = timeout or self.timeout
+        tokens = estimate_tokens(prompt)
+
+        async def attempt() -> str:
+            await self.rate_limiter.acquire(tokens)
+            loop = asyncio.get_running_loop()
+            started = asyncio.Event()
+
+            def call() -> str:
+                loop.call_soon_threadsafe(started.set)
+                return self._generate_sync(prompt, timeout)
+
+            future = asyncio.wrap_future(self._executor.submit(call))
+            # The timeout starts when a pool thread picks the call up; time
+            # queued behind other calls must not expire it unsent
+            waiter = asyncio.ensure_future(started.wait())
+            try:
+                await asyncio.wait((future, waiter), return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            finally:
+                waiter.cancel()
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Gemini call timed out after {timeout}s") from None
+
+        text, _ = await call_with_retry(attempt, self.retry_policy, description="Gemini call")
+        return text
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+gemini_client = GeminiClient()
@@ -0,0 +1,186 @@
+"""
+Token-bucket rate limiter for Gemini calls.
+
+Runs execute concurrently in background threads and, with workers, in
+several processes. Without coordination they burst past the project's quota
+and the 429s end up in summaries. Every outgoing call therefore reserves one
+request from an RPM bucket and its estimated prompt tokens from a TPM bucket
+before it is sent.
+
+With ``REDIS_URL`` the buckets live in Redis and are updated by a Lua script,
+so every process shares the same quota; otherwise (or while Redis errors)
+they are kept in process. Reservations may drive a bucket negative: the
+caller then sleeps until its share has refilled, which queues callers in
+arrival order instead of failing them.
+
+Waits are added to the ``RateLimitWait`` meter of the current context (see
+``track_rate_limit_wait``) so the executor can report them per node.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger("workflow")
+
+_CHARS_PER_TOKEN = 4
+
+# KEYS: one hash per bucket. ARGV: (limit per minute, cost) per bucket.
+# Refills each bucket for the time since its last update, takes the cost
+# (going negative if needed) and returns the longest wait in seconds.
+_RESERVE_SCRIPT = """
+redis.replicate_commands()
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local wait = 0
+for i, key in ipairs(KEYS) do
+  local limit = tonumber(ARGV[i * 2 - 1])
+  local cost = tonumber(ARGV[i * 2])
+  local rate = limit / 60
+  local b = redis.call('HMGET', key, 'level', 'ts')
+  local level = tonumber(b[1]) or limit
+  local ts = tonumber(b[2]) or now
+  level = math.min(limit, level + math.max(0, now - ts) * rate) - cost
+  redis.call('HSET', key, 'level', tostring(level), 'ts', tostring(now))
+  if level < 0 then
+    wait = math.max(wait, -level / rate)
+  end
+  redis.call('EXPIRE', key, math.ceil(wait) + 120)
+end
+return tostring(wait)
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+class RateLimitWait:
+    """Time spent waiting for quota by the calls of one node."""
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.calls = 0
+
+
+_current_wait: ContextVar[Optional[RateLimitWait]] = ContextVar("rate_limit_wait", default=None)
+
+
+@contextmanager
+def track_rate_limit_wait() -> Iterator[RateLimitWait]:
+    """Collect waits of calls made in this block, including tasks it spawns."""
+    meter = RateLimitWait()
+    token = _current_wait.set(meter)
+    try:
+        yield meter
+    finally:
+        _current_wait.reset(token)
+
+
+class _LocalBuckets:
+    """In-process equivalent of the Redis script."""
+
+    def __init__(self) -> None:
+        self._levels: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, buckets: List[Tuple[str, int, int]]) -> float:
+        wait = 0.0
+        now = time.monotonic()
+        with self._lock:
+            for name, limit, cost in buckets:
+                rate = limit / 60
+                level, ts = self._levels.get(name, (limit, now))
+                level = min(limit, level + max(0.0, now - ts) * rate) - cost
+                self._levels[name] = (level, now)
+                if level < 0:
+                    wait = max(wait, -level / rate)
+        return wait
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        redis_client: Any = None,
+        name: str = "gemini",
+    ):
+        self.rpm = settings.LLM_RPM if rpm is None else rpm
+        self.tpm = settings.LLM_TPM if tpm is None else tpm
+        self.redis = redis_client if redis_client is not None else get_redis()
+        self.name = name
+        self._local = _LocalBuckets()
+        self._script = self.redis.register_script(_RESERVE_SCRIPT) if self.redis is not None else None
+        self.calls = 0
+        self.delayed = 0
+        self.errors = 0
+        self.wait_seconds = 0.0
+
+    def _buckets(self, tokens: int) -> List[Tuple[str, int, int]]:
+        buckets = []
+        if self.rpm > 0:
+            buckets.append((f"ratelimit:{self.name}:rpm", self.rpm, 1))
+        if self.tpm > 0:
+            # A prompt larger than the whole quota waits for one full minute
+            buckets.append((f"ratelimit:{self.name}:tpm", self.tpm, min(tokens, self.tpm)))
+        return buckets
+
+    def _reserve(self, buckets: List[Tuple[str, int, int]]) -> float:
+        """Blocking; runs in a thread when Redis is used."""
+        if self._script is not None:
+            try:
+                args = [value for _, limit, cost in buckets for value in (limit, cost)]
+                return float(self._script(keys=[name for name, _, _ in buckets], args=args))
+            except redis.RedisError as e:
+                self.errors += 1
+                logger.warning(f"Rate limiter: Redis unavailable, using local buckets: {e}")
+        return self._local.reserve(buckets)
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Reserve one request and ``tokens`` prompt tokens, waiting until
+        they are available. Returns the number of seconds waited.
+
+        A caller cancelled while waiting does not give its reservation back.
+        """
+        buckets = self._buckets(tokens)
+        if not buckets:
+            return 0.0
+        if self._script is not None:
+            wait = await asyncio.to_thread(self._reserve, buckets)
+        else:
+            wait = self._reserve(buckets)
+
+        self.calls += 1
+        if wait > 0:
+            self.delayed += 1
+            self.wait_seconds += wait
+            meter = _current_wait.get()
+            if meter is not None:
+                meter.seconds += wait
+                meter.calls += 1
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "calls": self.calls,
+            "delayed": self.delayed,
+            "errors": self.errors,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "redis": self.redis is not None,
+        }
+
+
+gemini_rate_limiter = RateLimiter()
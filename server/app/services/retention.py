@@ -0,0 +1,97 @@
+"""
+Run retention and blob garbage collection.
+
+``purge_runs`` deletes finished runs older than ``RUN_RETENTION_DAYS``
+together with their node executions, human tasks and run payloads.
+``collect_garbage`` then removes blobs that no execution references any
+more. A blob is only removed once it is older than ``BLOB_GC_GRACE``: an
+output is written to the store before its execution row is flushed, so a
+fresh blob may be referenced by a row that does not exist yet. Storing an
+identical output again refreshes the blob's age.
+
+``retention_loop`` runs both every ``RETENTION_INTERVAL`` seconds in the
+API process; every step is idempotent, so several processes may run it.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.run import NodeExecution, RunPayload, RunStatus, WorkflowRun
+from app.models.task import HumanTask
+from app.services.blob_store import BlobStore, blob_store
+
+logger = logging.getLogger("workflow")
+
+_PURGE_BATCH = 500
+
+
+def purge_runs(db: Session, older_than_days: float) -> int:
+    """Delete runs that finished more than ``older_than_days`` ago; returns how many."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    purged = 0
+    while True:
+        ids = db.execute(
+            select(WorkflowRun.id)
+            .where(
+                WorkflowRun.status.in_((RunStatus.COMPLETED, RunStatus.FAILED)),
+                WorkflowRun.completed_at < cutoff,
+            )
+            .limit(_PURGE_BATCH)
+        ).scalars().all()
+        if not ids:
+            return purged
+        for model in (HumanTask, NodeExecution, RunPayload):
+            db.execute(delete(model).where(model.run_id.in_(ids)))
+        db.execute(delete(WorkflowRun).where(WorkflowRun.id.in_(ids)))
+        db.commit()
+        purged += len(ids)
+
+
+def collect_garbage(db: Session, store: Optional[BlobStore] = None, grace: Optional[float] = None) -> int:
+    """Remove blobs no node execution references; returns how many."""
+    store = store or blob_store
+    grace = settings.BLOB_GC_GRACE if grace is None else grace
+    # Listed before reading references: a blob written after the listing is not a candidate
+    candidates = set(store.digests(older_than=grace))
+    if not candidates:
+        return 0
+    referenced = set(db.execute(
+        select(NodeExecution.output_blob).where(NodeExecution.output_blob.is_not(None)).distinct()
+    ).scalars())
+    removed = 0
+    for digest in candidates - referenced:
+        if store.delete(digest, older_than=grace):
+            removed += 1
+    return removed
+
+
+def _run_once() -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if settings.RUN_RETENTION_DAYS > 0:
+            purged = purge_runs(db, settings.RUN_RETENTION_DAYS)
+            if purged:
+                logger.info(f"Retention: deleted {purged} run(s) older than {settings.RUN_RETENTION_DAYS} days")
+        removed = collect_garbage(db)
+        if removed:
+            logger.info(f"Retention: removed {removed} unreferenced blob(s)")
+    finally:
+        db.close()
+
+
+async def retention_loop() -> None:
+    """Purge expired runs and collect blobs periodically; cancel to stop."""
+    while True:
+        try:
+            await asyncio.to_thread(_run_once)
+        except Exception as e:
+            logger.warning(f"Retention pass failed: {e}", exc_info=True)
+        await asyncio.sleep(settings.RETENTION_INTERVAL)
@@ -0,0 +1,117 @@
+"""
+Retry policies with exponential backoff and jitter.
+
+Used for whole node executions (``node.data.retry`` / ``node.data.timeout``,
+see ``WorkflowExecutor.execute_node``) and for individual Gemini calls.
+Only transient failures are retried: timeouts, connection errors, and
+upstream 429/5xx responses. Anything else (bad input, SSRF rejections,
+programming errors) fails on the first attempt.
+"""
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+import httpx
+from google.api_core import exceptions as google_exceptions
+
+from app.core.config import settings
+
+logger = logging.getLogger("workflow")
+
+RETRYABLE_STATUS = frozenset([408, 429, 500, 502, 503, 504])
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for errors worth another attempt."""
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS
+    if isinstance(exc, google_exceptions.GoogleAPICallError):
+        return exc.code in RETRYABLE_STATUS
+    return False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    # Total attempts, including the first
+    attempts: int = 1
+    # Delay before the first retry, doubled for each further one up to max_backoff
+    backoff: float = 1.0
+    max_backoff: float = 30.0
+    # Randomise each delay between half and all of its value so callers that
+    # failed together do not retry together
+    jitter: bool = True
+
+    @classmethod
+    def from_node(cls, data: Any) -> "RetryPolicy":
+        """Policy from ``node.data["retry"]``: an attempt count or
+        ``{"attempts", "backoff", "max_backoff", "jitter"}``; defaults from settings."""
+        spec = data.get("retry") if isinstance(data, dict) else None
+        if isinstance(spec, bool) or spec is None:
+            spec = {}
+        elif not isinstance(spec, dict):
+            spec = {"attempts": spec}
+        try:
+            return cls(
+                attempts=max(1, int(spec.get("attempts", settings.NODE_RETRY_ATTEMPTS))),
+                backoff=max(0.0, float(spec.get("backoff", settings.NODE_RETRY_BACKOFF))),
+                max_backoff=max(0.0, float(spec.get("max_backoff", settings.NODE_RETRY_MAX_BACKOFF))),
+                jitter=bool(spec.get("jitter", True)),
+            )
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring invalid retry policy {spec!r}")
+            return cls(attempts=settings.NODE_RETRY_ATTEMPTS)
+
+    def delay(self, retry: int) -> float:
+        """Seconds to wait before retry number ``retry`` (1-based)."""
+        base = min(self.max_backoff, self.backoff * 2 ** (retry - 1))
+        return random.uniform(base / 2, base) if self.jitter else base
+
+
+async def call_with_retry(
+    fn: Callable[[], Awaitable[Any]],
+    policy: RetryPolicy,
+    timeout: Optional[float] = None,
+    retryable: Callable[[BaseException], bool] = is_retryable,
+    retry_result: Optional[Callable[[Any], bool]] = None,
+    description: str = "call",
+) -> Tuple[Any, int]:
+    """Await ``fn()`` until it succeeds or ``policy.attempts`` are used up.
+
+    Each attempt is bounded by ``timeout`` seconds (``TimeoutError``). A
+    result for which ``retry_result`` is true is retried like a transient
+    error, but is returned as-is when no attempts are left. Returns the
+    result and the number of retries it took; the last error is re-raised
+    with a ``retries`` attribute.
+    """
+    retry = 0
+    while True:
+        try:
+            if timeout:
+                try:
+                    result = await asyncio.wait_for(fn(), timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"{description} timed out after {timeout}s") from None
+            else:
+                result = await fn()
+        except Exception as e:
+            if retry + 1 >= policy.attempts or not retryable(e):
+                e.retries = retry
+                raise
+            reason = str(e) or type(e).__name__
+        else:
+            if retry + 1 >= policy.attempts or retry_result is None or not retry_result(result):
+                return result, retry
+            reason = "retryable result"
+        retry += 1
+        delay = policy.delay(retry)
+        logger.warning(
+            f"{description} failed ({reason}); retry {retry}/{policy.attempts - 1} in {delay:.2f}s"
+        )
+        await asyncio.sleep(delay)
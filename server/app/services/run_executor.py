@@ -0,0 +1,209 @@
+"""
+Long-lived, in-process executor for workflow runs (``RUN_BACKEND=background``).
+
+Runs used to execute in Starlette background tasks, each building its own
+event loop with ``asyncio.run`` on an API threadpool thread, plus a fresh
+``AIAgent`` and ``ArticleFetcher``, with no bound on how many ran at once.
+A burst of runs could occupy the whole threadpool and starve request
+handling.
+
+The service started by the application lifespan owns one event loop on a
+dedicated thread. Runs are admitted into a bounded queue and executed as
+tasks on that loop by ``MAX_CONCURRENT_RUNS`` consumers sharing one agent, one
+article fetcher and an HTTP client whose pool lives on that loop, so run
+traffic never hops to the API loop. When ``MAX_CONCURRENT_RUNS + RUN_ADMISSION_QUEUE_SIZE``
+runs are already admitted, ``submit`` raises ``ExecutorFull`` and the API
+answers 503 instead of queueing unbounded work.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.models.run import RunStatus, WorkflowRun
+from app.services.ai_agent import AIAgent
+from app.services.article_fetcher import ArticleFetcher
+from app.services.http_client import SharedHttpClient
+from app.services.workflow_executor import run_workflow
+
+logger = logging.getLogger("workflow")
+
+
+class ExecutorFull(Exception):
+    """Raised by ``submit`` when the admission queue is full."""
+
+
+class RunExecutorService:
+    def __init__(
+        self,
+        max_runs: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        http_client: Optional[SharedHttpClient] = None,
+    ):
+        self.max_runs = max_runs or settings.MAX_CONCURRENT_RUNS
+        self.queue_size = settings.RUN_ADMISSION_QUEUE_SIZE if queue_size is None else queue_size
+        # Started on, and closed with, the executor loop
+        self.http_client = http_client or SharedHttpClient()
+        self.ai_agent = AIAgent()
+        self.article_fetcher = ArticleFetcher(http_client=self.http_client)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers: List[asyncio.Task] = []
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._run_ids: Set[str] = set()
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Start the executor loop and its consumers (blocking)."""
+        with self._lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="run-executor", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_consumers(), self._loop).result()
+        logger.info(f"Run executor started ({self.max_runs} concurrent runs, {self.queue_size} queued)")
+
+    async def _start_consumers(self) -> None:
+        await self.http_client.start()
+        self._queue = asyncio.Queue()
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.max_runs)]
+
+    def shutdown(self, grace: Optional[float] = None) -> None:
+        """Stop admitting runs, give active ones ``grace`` seconds, then stop.
+
+        Runs cancelled here stay RUNNING (``force=true`` resumes them); runs
+        still queued are marked FAILED so they can be resumed, since no
+        other process would pick them up.
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        grace = settings.RUN_SHUTDOWN_GRACE if grace is None else grace
+        asyncio.run_coroutine_threadsafe(self._drain(grace), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+        logger.info("Run executor stopped")
+
+    async def _drain(self, grace: float) -> None:
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + grace
+        while self.active and loop.time() < give_up_at:
+            await asyncio.sleep(0.1)
+        if self.active:
+            logger.warning(f"Run executor: cancelling {self.active} run(s) still active after {grace}s")
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+
+        queued = []
+        while not self._queue.empty():
+            queued.append(self._queue.get_nowait())
+        if queued:
+            with self._lock:
+                self._admitted -= len(queued)
+                self._run_ids.difference_update(queued)
+            logger.warning(f"Run executor: {len(queued)} queued run(s) never started; marking them failed")
+            try:
+                await asyncio.to_thread(self._fail_queued, queued)
+            except Exception as e:
+                logger.error(f"Run executor: could not mark queued runs failed: {e}")
+        await self.http_client.aclose()
+
+    def _fail_queued(self, run_ids: List[str]) -> None:
+        """Mark runs that were admitted but never started FAILED."""
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            db.query(WorkflowRun).filter(
+                WorkflowRun.id.in_(run_ids), WorkflowRun.status == RunStatus.PENDING
+            ).update(
+                {
+                    "status": RunStatus.FAILED,
+                    "error_message": "Interrupted: the server stopped before the run started",
+                    "completed_at": datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    # ── Runs ──────────────────────────────────────────────────────────────
+
+    def submit(self, run_id: str) -> None:
+        """Admit a run for execution; callable from any thread.
+
+        Raises:
+            ExecutorFull: when the admission queue is full.
+            RuntimeError: when the service is not running.
+        """
+        with self._lock:
+            loop = self._loop
+            if loop is None:
+                raise RuntimeError("Run executor is not running")
+            if self._admitted >= self.max_runs + self.queue_size:
+                self.rejected += 1
+                raise ExecutorFull(f"{self._admitted} runs already admitted")
+            self._admitted += 1
+            self._run_ids.add(run_id)
+        loop.call_soon_threadsafe(self._queue.put_nowait, run_id)
+
+    def owns(self, run_id: str) -> bool:
+        """Whether the run is admitted (queued or executing) here."""
+        with self._lock:
+            return run_id in self._run_ids
+
+    async def _consume(self) -> None:
+        while True:
+            run_id = await self._queue.get()
+            self.active += 1
+            try:
+                await self._execute(run_id)
+            except Exception as e:
+                logger.error(f"Run executor: run {run_id} crashed: {e}", exc_info=True)
+            finally:
+                self.active -= 1
+                with self._lock:
+                    self._admitted -= 1
+                    self._run_ids.discard(run_id)
+                    self.completed += 1
+
+    async def _execute(self, run_id: str) -> None:
+        await run_workflow(
+            run_id,
+            http_client=self.http_client,
+            ai_agent=self.ai_agent,
+            article_fetcher=self.article_fetcher,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            admitted = self._admitted
+        return {
+            "max_runs": self.max_runs,
+            "queue_size": self.queue_size,
+            "queued": admitted - self.active,
+            "active": self.active,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+run_executor = RunExecutorService()
@@ -0,0 +1,107 @@
+"""
+Lease-based claiming of runs from ``workflow_runs`` (``RUN_BACKEND=postgres``).
+
+Any number of ``python -m app.worker`` processes share the table:
+
+- ``claim_runs`` locks the oldest PENDING rows with
+  ``SELECT ... FOR UPDATE SKIP LOCKED`` (workers never wait on each other's
+  rows), marks them RUNNING and writes a lease: owner and expiry.
+- ``renew_leases`` pushes the expiry forward while runs execute
+  (the worker heartbeat) and reports which leases the worker still holds.
+- ``reap_expired`` puts RUNNING runs whose lease expired (their worker
+  crashed or lost the database) back to PENDING, or fails them once they
+  have been claimed ``max_claims`` times.
+- ``release_lease`` clears the lease when a run finishes.
+
+Runs executed by the other backends never get a lease and are ignored by
+the reaper. Lease times are naive UTC like the other timestamp columns, so
+worker clocks must agree to well within the lease duration.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Sequence, Set, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.run import RunStatus, WorkflowRun
+
+
+def claim_runs(db: Session, owner: str, limit: int, lease_seconds: float) -> List[str]:
+    """Claim up to ``limit`` PENDING runs, oldest first; returns their IDs."""
+    if limit <= 0:
+        return []
+    ids = db.execute(
+        select(WorkflowRun.id)
+        .where(WorkflowRun.status == RunStatus.PENDING)
+        .order_by(WorkflowRun.started_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if ids:
+        db.execute(
+            update(WorkflowRun)
+            .where(WorkflowRun.id.in_(ids))
+            .values(
+                status=RunStatus.RUNNING,
+                lease_owner=owner,
+                lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds),
+                claim_count=WorkflowRun.claim_count + 1,
+            )
+        )
+    db.commit()
+    return list(ids)
+
+
+def renew_leases(db: Session, owner: str, run_ids: Sequence[str], lease_seconds: float) -> Set[str]:
+    """Extend the leases ``owner`` holds on ``run_ids``; returns the IDs still held."""
+    if not run_ids:
+        return set()
+    held = db.execute(
+        update(WorkflowRun)
+        .where(
+            WorkflowRun.id.in_(run_ids),
+            WorkflowRun.lease_owner == owner,
+            WorkflowRun.status == RunStatus.RUNNING,
+        )
+        .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+        .returning(WorkflowRun.id)
+    ).scalars().all()
+    db.commit()
+    return set(held)
+
+
+def release_lease(db: Session, owner: str, run_id: str) -> None:
+    db.execute(
+        update(WorkflowRun)
+        .where(WorkflowRun.id == run_id, WorkflowRun.lease_owner == owner)
+        .values(lease_owner=None, lease_expires_at=None)
+    )
+    db.commit()
+
+
+def reap_expired(db: Session, max_claims: int) -> Tuple[int, int]:
+    """Re-queue RUNNING runs with an expired lease; returns (requeued, failed)."""
+    now = datetime.utcnow()
+    expired = (
+        WorkflowRun.status == RunStatus.RUNNING,
+        WorkflowRun.lease_expires_at < now,
+    )
+    requeued = db.execute(
+        update(WorkflowRun)
+        .where(*expired, WorkflowRun.claim_count < max_claims)
+        .values(status=RunStatus.PENDING, lease_owner=None, lease_expires_at=None)
+    ).rowcount
+    failed = db.execute(
+        update(WorkflowRun)
+        .where(*expired, WorkflowRun.claim_count >= max_claims)
+        .values(
+            status=RunStatus.FAILED,
+            error_message=f"Run abandoned: its worker lease expired {max_claims} times",
+            completed_at=now,
+            lease_owner=None,
+            lease_expires_at=None,
+        )
+    ).rowcount
+    db.commit()
+    return requeued, failed
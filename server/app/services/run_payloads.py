@@ -0,0 +1,127 @@
+"""
+Run-scoped, content-addressed storage for large node inputs.
+
+A node execution records the node's own resolved inputs (its data after
+template resolution). Trigger/webhook nodes record ``TRIGGER_REF``
+instead: their input is the run's ``trigger_data``, which is already
+stored on the run. Inputs often share big values: every node templated on ``{{trigger.articles}}``
+receives the same list. Each top-level input value whose JSON is at least
+``NODE_INPUT_INLINE_BYTES`` is therefore stored once per run in
+``run_payloads``, keyed by its SHA-256, and the execution keeps
+``{"$payload": "<hash>"}`` in its place. ``expand`` puts the values back
+(and the trigger data for ``TRIGGER_REF``) when a run is read.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.run import RunPayload
+
+PAYLOAD_KEY = "$payload"
+TRIGGER_REF = {"$trigger": True}
+
+
+def _is_ref(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and PAYLOAD_KEY in value
+
+
+class PayloadEncoder:
+    """Replaces large input values with references, collecting new payloads.
+
+    Hashes are memoised per object, so a value shared by many nodes of a
+    run is serialised once. One encoder serves one executor (one run).
+    """
+
+    def __init__(self, inline_bytes: Optional[int] = None):
+        self.inline_bytes = settings.NODE_INPUT_INLINE_BYTES if inline_bytes is None else inline_bytes
+        # id(value) -> (value, hash, stored data, size); hash is None for
+        # small values. Holding the value keeps its id from being reused.
+        self._memo: Dict[int, Tuple[Any, Optional[str], Any, int]] = {}
+        self._stored: Dict[str, Set[str]] = {}
+        self._pending: List[Dict[str, Any]] = []
+
+    def encode(self, run_id: str, inputs: Any) -> Any:
+        """Return ``inputs`` with large top-level values replaced by references."""
+        if self.inline_bytes <= 0 or not isinstance(inputs, dict):
+            return inputs
+        return {key: self._encode_value(run_id, value) for key, value in inputs.items()}
+
+    def _encode_value(self, run_id: str, value: Any) -> Any:
+        if not isinstance(value, (dict, list, str)):
+            return value
+        memo = self._memo.get(id(value))
+        if memo is None or memo[0] is not value:
+            memo = (value, None, None, 0)
+            if not isinstance(value, str) or len(value) >= self.inline_bytes:
+                encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+                if len(encoded) >= self.inline_bytes:
+                    digest = hashlib.sha256(encoded.encode()).hexdigest()
+                    # What the JSON column will hold
+                    memo = (value, digest, json.loads(encoded), len(encoded))
+            self._memo[id(value)] = memo
+        _, digest, data, size = memo
+        if digest is None:
+            return value
+        stored = self._stored.setdefault(run_id, set())
+        if digest not in stored:
+            stored.add(digest)
+            self._pending.append({
+                "run_id": run_id, "hash": digest, "data": data, "size_bytes": size,
+                "created_at": datetime.utcnow(),
+            })
+        return {PAYLOAD_KEY: digest}
+
+    def take_pending(self) -> List[Dict[str, Any]]:
+        """Payload rows to insert before the executions that reference them
+        (see ``drop_stored``)."""
+        rows, self._pending = self._pending, []
+        return rows
+
+
+def drop_stored(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """``rows`` without those already stored by an earlier attempt of the
+    run (resume)."""
+    if not rows:
+        return rows
+    existing = set(db.execute(
+        select(RunPayload.run_id, RunPayload.hash).where(
+            RunPayload.run_id.in_({r["run_id"] for r in rows}),
+            RunPayload.hash.in_({r["hash"] for r in rows}),
+        )
+    ).all())
+    return [r for r in rows if (r["run_id"], r["hash"]) not in existing]
+
+
+def load_payloads(db: Session, run_id: str, hashes: Iterable[str]) -> Dict[str, Any]:
+    hashes = set(hashes)
+    if not hashes:
+        return {}
+    return dict(db.execute(
+        select(RunPayload.hash, RunPayload.data).where(
+            RunPayload.run_id == run_id, RunPayload.hash.in_(hashes)
+        )
+    ).all())
+
+
+def references(inputs: Any) -> Set[str]:
+    if not isinstance(inputs, dict):
+        return set()
+    return {v[PAYLOAD_KEY] for v in inputs.values() if _is_ref(v)}
+
+
+def expand(inputs: Any, payloads: Dict[str, Any], trigger_data: Any = None) -> Any:
+    """Put referenced payloads (and the run's trigger data) back into stored inputs."""
+    if inputs == TRIGGER_REF:
+        return trigger_data
+    if not isinstance(inputs, dict):
+        return inputs
+    return {
+        key: payloads.get(value[PAYLOAD_KEY], value) if _is_ref(value) else value
+        for key, value in inputs.items()
+    }
@@ -0,0 +1,206 @@
+"""
+{{path.to.value}} template compiler.
+
+Each template string is parsed once into literal and path segments
+(cached by string), and node ``data`` trees are compiled ahead of time so
+that subtrees without any template are handed back as-is instead of being
+rebuilt on every run.
+
+Resolution rules are the same as the original regex implementation:
+``{{trigger.a.b}}`` reads from the run's trigger data, ``{{node_id.a.b}}``
+reads from that node's result, unknown roots are left untouched and
+``None`` renders as an empty string.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"\{\{([^}]+)\}\}")
+
+
+def _get_nested(obj: Any, keys) -> Any:
+    """Safely traverse nested dict keys."""
+    for k in keys:
+        if isinstance(obj, dict):
+            obj = obj.get(k)
+        else:
+            return None
+    return obj
+
+
+class _Ref:
+    """A single {{root.rest}} token."""
+
+    __slots__ = ("root", "rest", "raw")
+
+    def __init__(self, expr: str, raw: str):
+        path = expr.strip().split(".")
+        self.root = path[0]
+        self.rest: Tuple[str, ...] = tuple(path[1:])
+        self.raw = raw
+
+    def lookup(self, trigger_data: dict, results: dict) -> Tuple[bool, Any]:
+        """Return (found, value); ``found`` is False for unknown roots."""
+        if self.root == "trigger":
+            return True, _get_nested(trigger_data, self.rest)
+        if self.root in results:
+            return True, _get_nested(results[self.root], self.rest)
+        return False, None
+
+
+class Template:
+    """A compiled template string: literal ``str`` segments and ``_Ref`` tokens."""
+
+    __slots__ = ("source", "segments", "single", "is_static")
+
+    def __init__(self, source: str):
+        self.source = source
+        segments = []
+        pos = 0
+        for m in _TOKEN_RE.finditer(source):
+            if m.start() > pos:
+                segments.append(source[pos:m.start()])
+            segments.append(_Ref(m.group(1), m.group(0)))
+            pos = m.end()
+        if pos < len(source):
+            segments.append(source[pos:])
+        self.segments = tuple(segments)
+        self.is_static = not any(isinstance(s, _Ref) for s in segments)
+
+        # Whole string (ignoring surrounding whitespace) is exactly one token:
+        # resolve_ref may then return the raw value instead of a string.
+        refs = [s for s in segments if isinstance(s, _Ref)]
+        self.single: Optional[_Ref] = (
+            refs[0] if len(refs) == 1 and source.strip() == refs[0].raw else None
+        )
+
+    def render(self, trigger_data: dict, results: dict) -> str:
+        if self.is_static:
+            return self.source
+        parts = []
+        for seg in self.segments:
+            if type(seg) is str:
+                parts.append(seg)
+                continue
+            found, val = seg.lookup(trigger_data, results)
+            if not found:
+                parts.append(seg.raw)
+            elif val is not None:
+                parts.append(str(val))
+        return "".join(parts)
+
+    def resolve(self, trigger_data: dict, results: dict) -> Any:
+        """Like ``render`` but keeps the native type of a lone {{path}} token."""
+        if self.single is not None:
+            found, val = self.single.lookup(trigger_data, results)
+            return val if found else self.source
+        return self.render(trigger_data, results)
+
+
+@lru_cache(maxsize=4096)
+def compile_template(value: str) -> Template:
+    return Template(value)
+
+
+# ── Compiled data trees ──────────────────────────────────────────────────────
+
+class _Static:
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def render(self, trigger_data: dict, results: dict) -> Any:
+        return self.value
+
+
+class _Str:
+    __slots__ = ("template",)
+
+    def __init__(self, template: Template):
+        self.template = template
+
+    def render(self, trigger_data: dict, results: dict) -> Any:
+        return self.template.render(trigger_data, results)
+
+
+class _Dict:
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items
+
+    def render(self, trigger_data: dict, results: dict) -> Any:
+        return {k: v.render(trigger_data, results) for k, v in self.items}
+
+
+class _List:
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items
+
+    def render(self, trigger_data: dict, results: dict) -> Any:
+        return [v.render(trigger_data, results) for v in self.items]
+
+
+def compile_data(data: Any):
+    """Compile a data tree; the result has ``render(trigger_data, results)``.
+
+    Subtrees that contain no template compile to a static node that returns
+    the original object without copying, so callers must treat rendered
+    data as read-only.
+    """
+    if isinstance(data, str):
+        template = compile_template(data)
+        return _Static(data) if template.is_static else _Str(template)
+    if isinstance(data, dict):
+        items = tuple((k, compile_data(v)) for k, v in data.items())
+        if all(isinstance(v, _Static) for _, v in items):
+            return _Static(data)
+        return _Dict(items)
+    if isinstance(data, list):
+        items = tuple(compile_data(v) for v in data)
+        if all(isinstance(v, _Static) for v in items):
+            return _Static(data)
+        return _List(items)
+    return _Static(data)
+
+
+# ── Resolution helpers ───────────────────────────────────────────────────────
+
+def resolve_value(value: str, trigger_data: dict, results: dict) -> str:
+    """Replace {{path.to.value}} references in a string."""
+    if not isinstance(value, str) or "{{" not in value:
+        return value
+    template = compile_template(value)
+    return value if template.is_static else template.render(trigger_data, results)
+
+
+def resolve_ref(value: str, trigger_data: dict, results: dict) -> Any:
+    """Resolve a template reference, preserving the native type of the value.
+
+    When the entire string is a single {{path}} token, the raw resolved value
+    (list, dict, etc.) is returned without stringification.  For strings that
+    contain multiple tokens or surrounding text, falls back to resolve_value.
+    """
+    if not isinstance(value, str):
+        return value
+    return compile_template(value).resolve(trigger_data, results)
+
+
+def resolve_data(data: Any, trigger_data: dict, results: dict) -> Any:
+    """Recursively resolve template variables in any data structure.
+
+    Containers whose children all resolve to themselves are returned as-is.
+    """
+    if isinstance(data, str):
+        return resolve_value(data, trigger_data, results)
+    if isinstance(data, dict):
+        out = {k: resolve_data(v, trigger_data, results) for k, v in data.items()}
+        return data if all(out[k] is v for k, v in data.items()) else out
+    if isinstance(data, list):
+        out = [resolve_data(item, trigger_data, results) for item in data]
+        return data if all(a is b for a, b in zip(out, data)) else out
+    return data
@@ -1,106 +1,45 @@
 """
 Workflow executor with:
   - Topological (edge-based) execution order
+  - Concurrent ready-queue scheduling of independent branches
   - {{node_id.field}} template variable resolution in node data
+    (compiled once per plan, see app.services.templates)
   - Condition branching (true/false paths)
   - Handlers for: trigger, webhook, action, http, database, email,
     notify, aiAgent, condition, filter, loop, transform, delay,
     humanApproval, output
 """
 
-import re
 import json
-import uuid
+import heapq
 import asyncio
 import smtplib
 import logging
-from collections import defaultdict, deque
 from datetime import datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Any, Dict, List
+from typing import AbstractSet, Any, Awaitable, Callable, Dict, Optional, Tuple
 
-import requests as req_lib
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.security import validate_url_for_ssrf
 from app.models.run import NodeExecution, NodeStatus, RunStatus, WorkflowRun
 from app.models.workflow import WorkflowVersion
 from app.services.ai_agent import AIAgent
 from app.services.article_fetcher import ArticleFetcher
+from app.services.blob_store import BlobStore, blob_store as shared_blob_store
+from app.services.execution_plan import ExecutionPlan, PlanNode, plan_cache
+from app.services.execution_writer import NodeExecutionWriter
+from app.services.http_client import SharedHttpClient, http_client as shared_http_client
+from app.services.rate_limiter import track_rate_limit_wait
+from app.services.retry import RETRYABLE_STATUS, RetryPolicy, call_with_retry
+from app.services.run_payloads import TRIGGER_REF
+from app.services.templates import resolve_data, resolve_ref, resolve_value
 
 logger = logging.getLogger("workflow")
 
 
-# ── Template resolution ────────────────────────────────────────────────────────
-
-def _get_nested(obj: Any, keys: List[str]) -> Any:
-    """Safely traverse nested dict keys."""
-    for k in keys:
-        if isinstance(obj, dict):
-            obj = obj.get(k)
-        else:
-            return None
-    return obj
-
-
-def resolve_value(value: str, trigger_data: dict, results: dict) -> str:
-    """Replace {{path.to.value}} references in a string."""
-    if not isinstance(value, str):
-        return value
-
-    def replacer(m: re.Match) -> str:
-        path = m.group(1).strip().split(".")
-        if not path:
-            return m.group(0)
-        if path[0] == "trigger":
-            val = _get_nested(trigger_data, path[1:])
-        elif path[0] in results:
-            val = _get_nested(results[path[0]], path[1:])
-        else:
-            return m.group(0)
-        return str(val) if val is not None else ""
-
-    return re.sub(r"\{\{([^}]+)\}\}", replacer, value)
-
-
-def resolve_ref(value: str, trigger_data: dict, results: dict) -> Any:
-    """Resolve a template reference, preserving the native type of the value.
-
-    When the entire string is a single {{path}} token, the raw resolved value
-    (list, dict, etc.) is returned without stringification.  For strings that
-    contain multiple tokens or surrounding text, falls back to resolve_value.
-    """
-    if not isinstance(value, str):
-        return value
-
-    m = re.fullmatch(r"\{\{([^}]+)\}\}", value.strip())
-    if m:
-        path = m.group(1).strip().split(".")
-        if not path:
-            return value
-        if path[0] == "trigger":
-            val = _get_nested(trigger_data, path[1:])
-        elif path[0] in results:
-            val = _get_nested(results[path[0]], path[1:])
-        else:
-            return value
-        return val  # Return raw value — may be list, dict, int, etc.
-
-    return resolve_value(value, trigger_data, results)
-
-
-def resolve_data(data: Any, trigger_data: dict, results: dict) -> Any:
-    """Recursively resolve template variables in any data structure."""
-    if isinstance(data, str):
-        return resolve_value(data, trigger_data, results)
-    if isinstance(data, dict):
-        return {k: resolve_data(v, trigger_data, results) for k, v in data.items()}
-    if isinstance(data, list):
-        return [resolve_data(item, trigger_data, results) for item in data]
-    return data
-
+# ── Helpers ───────────────────────────────────────────────────────────────────
 
 def _parse_json_field(value: Any) -> Any:
     """Try to parse a string as JSON; return as-is if it fails."""
@@ -112,153 +51,371 @@ def _parse_json_field(value: Any) -> Any:
     return value
 
 
-# ── Graph utilities ───────────────────────────────────────────────────────────
-
-def _topological_order(nodes: list, edges: list) -> list:
+_HTTP_NODE_TYPES = ("http", "httpRequest")
+# Handlers that use the node's data with templates resolved
+_RESOLVED_DATA_TYPES = frozenset(
+    ("action", *_HTTP_NODE_TYPES, "database", "email", "sendEmail", "notify", "humanApproval")
+)
+
+
+def _retryable_response(result: Any) -> bool:
+    """HTTP node results worth retrying (429/5xx); the last one is kept as-is."""
+    return isinstance(result, dict) and result.get("status_code") in RETRYABLE_STATUS
+
+
+def _node_timeout(data: Dict[str, Any]) -> Optional[float]:
+    """Per-attempt timeout from node data or NODE_TIMEOUT; None when disabled."""
+    try:
+        timeout = float(data.get("timeout", settings.NODE_TIMEOUT))
+    except (TypeError, ValueError):
+        timeout = settings.NODE_TIMEOUT
+    return timeout if timeout > 0 else None
+
+
+def _pack_tokens(data: Dict[str, Any]) -> Optional[int]:
+    """``packTokens`` from node data; None (use AI_SUMMARY_PACK_TOKENS) when unset or invalid."""
+    value = data.get("packTokens")
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid packTokens {value!r}; using AI_SUMMARY_PACK_TOKENS")
+        return None
+
+
+def _resolved_data(node_type: str, data: Dict[str, Any], trigger_data: dict, results: dict, template) -> Optional[dict]:
+    """The node's data with templates resolved, for handlers that use it."""
+    if node_type not in _RESOLVED_DATA_TYPES:
+        return None
+    # Prefer the plan's pre-compiled data tree; template-free subtrees come
+    # back as-is, so resolved data must be treated as read-only.
+    if template is not None:
+        return template.render(trigger_data, results)
+    return resolve_data(data, trigger_data, results)
+
+
+def _node_inputs(node_type: str, data: Dict[str, Any], resolved: Optional[dict]) -> Any:
+    """What an execution records as its input: a reference to the run's
+    trigger data for entry nodes, otherwise the resolved data, or the raw
+    data for handlers that read it directly."""
+    if node_type in ("trigger", "webhook"):
+        return TRIGGER_REF
+    return resolved if resolved is not None else data
+
+
+# ── Scheduling ────────────────────────────────────────────────────────────────
+
+def _branch_mask(nodes: Tuple[PlanNode, ...], pn: PlanNode, result: Dict[str, Any]) -> int:
+    """For condition nodes, the bitmask of children on the non-matching branch."""
+    mask = 0
+    if pn.type == "condition":
+        matched = result.get("matched_path", "true")
+        for child, handle in pn.children:
+            if handle and handle != matched and handle != "output":
+                mask |= 1 << child
+                logger.info(f"Condition branching: skipping {nodes[child].id} (handle={handle})")
+    return mask
+
+
+async def _run_dag(
+    plan: ExecutionPlan,
+    execute: Callable[[PlanNode], Awaitable[Dict[str, Any]]],
+    on_skip: Callable[[PlanNode], None],
+    results: Dict[str, Any],
+    skipped: set,
+    max_concurrency: int,
+    completed: AbstractSet[str] = frozenset(),
+) -> None:
     """
-    Kahn's algorithm. Returns nodes in execution order.
-    Falls back to array order if there are no edges.
+    Ready-queue scheduler over a compiled plan. A node is started as soon as
+    every parent has finished or been skipped, with at most ``max_concurrency``
+    nodes in flight. Ready nodes are started in topological order, so a cap of
+    1 reproduces the old sequential walk.
+
+    Skip semantics match the sequential loop: a node is skipped when a
+    condition marked it (non-matching ``sourceHandle``) or when all of its
+    parents were skipped. ``results`` and ``skipped`` are filled in place.
+
+    Nodes in ``completed`` finished in an earlier attempt of the run: their
+    result (or skip) is already in ``results``/``skipped``, so they are
+    released without being executed or recorded again.
     """
-    if not edges:
-        return list(nodes)
-
-    node_ids = [n["id"] for n in nodes]
-    adj: Dict[str, List[str]] = defaultdict(list)
-    in_degree: Dict[str, int] = {nid: 0 for nid in node_ids}
+    nodes = plan.nodes
+    waiting = [pn.in_degree for pn in nodes]
+    ready = [pn.index for pn in nodes if pn.in_degree == 0]
+    heapq.heapify(ready)
+    started_mask = 0
+    skipped_mask = 0
+    for nid in skipped:
+        if nid in plan.index:
+            skipped_mask |= 1 << plan.index[nid]
+    running: Dict[asyncio.Task, PlanNode] = {}
+
+    def release(pn: PlanNode) -> None:
+        for child, _ in pn.children:
+            if not started_mask >> child & 1:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    heapq.heappush(ready, child)
+
+    try:
+        while started_mask != (1 << len(nodes)) - 1 or running:
+            while ready and len(running) < max_concurrency:
+                pn = nodes[heapq.heappop(ready)]
+                bit = 1 << pn.index
+                if started_mask & bit:
+                    continue
+                started_mask |= bit
 
-    for edge in edges:
-        src, tgt = edge["source"], edge["target"]
-        if src in in_degree and tgt in in_degree:
-            adj[src].append(tgt)
-            in_degree[tgt] += 1
+                # Finished in an earlier attempt (resumed run)
+                if pn.id in completed:
+                    if not skipped_mask & bit:
+                        skipped_mask |= _branch_mask(nodes, pn, results[pn.id])
+                    release(pn)
+                    continue
 
-    queue = deque([nid for nid in node_ids if in_degree[nid] == 0])
-    ordered_ids: List[str] = []
+                # Explicitly skipped (non-matching branch of a condition node)
+                if skipped_mask & bit:
+                    skipped.add(pn.id)
+                    logger.info(f"Skipping node {pn.id} (explicitly skipped)")
+                    on_skip(pn)
+                    release(pn)
+                    continue
 
-    while queue:
-        nid = queue.popleft()
-        ordered_ids.append(nid)
-        for tgt in adj[nid]:
-            in_degree[tgt] -= 1
-            if in_degree[tgt] == 0:
-                queue.append(tgt)
+                # Skipped because every parent was skipped
+                if (
+                    pn.parent_mask
+                    and not pn.has_unknown_parent
+                    and skipped_mask & pn.parent_mask == pn.parent_mask
+                ):
+                    skipped_mask |= bit
+                    skipped.add(pn.id)
+                    logger.info(f"Skipping node {pn.id} (all parents skipped)")
+                    on_skip(pn)
+                    release(pn)
+                    continue
 
-    # Include any nodes left out due to cycles (shouldn't happen, but be safe)
-    seen = set(ordered_ids)
-    for nid in node_ids:
-        if nid not in seen:
-            ordered_ids.append(nid)
+                logger.info(f"Executing node {pn.id} ({pn.type})")
+                running[asyncio.create_task(execute(pn))] = pn
 
-    lookup = {n["id"]: n for n in nodes}
-    return [lookup[nid] for nid in ordered_ids if nid in lookup]
+            if not running:
+                if not ready:
+                    # Only nodes on a cycle remain (shouldn't happen, but be
+                    # safe): release the earliest one in topological order.
+                    leftover = [pn.index for pn in nodes if not started_mask >> pn.index & 1]
+                    if not leftover:
+                        break
+                    heapq.heappush(ready, leftover[0])
+                continue
+
+            finished, _ = await asyncio.wait(set(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(finished, key=lambda t: running[t].index):
+                pn = running.pop(task)
+                result = task.result()
+                results[pn.id] = result
+                skipped_mask |= _branch_mask(nodes, pn, result)
+                release(pn)
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
 
 
 # ── Executor ─────────────────────────────────────────────────────────────────
 
 class WorkflowExecutor:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        max_concurrency: Optional[int] = None,
+        http_client: Optional[SharedHttpClient] = None,
+        ai_agent: Optional[AIAgent] = None,
+        article_fetcher: Optional[ArticleFetcher] = None,
+        blob_store: Optional[BlobStore] = None,
+    ):
         self.db = db
-        self.ai_agent = AIAgent()
-        self.article_fetcher = ArticleFetcher()
+        self.max_concurrency = max_concurrency or settings.MAX_NODE_CONCURRENCY
+        self.http_client = http_client or shared_http_client
+        self.executions: Optional[NodeExecutionWriter] = None
+        # Definition-level "settings" of the run being executed
+        self.run_settings: Dict[str, Any] = {}
+        # Executions of each node in earlier attempts of the run (see _load_checkpoint)
+        self._attempts: Dict[str, int] = {}
+        # Plan of the run being executed
+        self._plan: Optional[ExecutionPlan] = None
+        # Stateless across runs, so a long-lived caller can share them
+        self.ai_agent = ai_agent or AIAgent()
+        self.article_fetcher = article_fetcher or ArticleFetcher(http_client=self.http_client)
+        self.blob_store = blob_store or shared_blob_store
+        self._db_lock = asyncio.Lock()
 
     # ── Top-level run ──────────────────────────────────────────────────────
 
     async def execute_workflow(self, run_id: str) -> Dict[str, Any]:
         logger.info(f"Starting workflow execution run_id={run_id}")
 
-        run = self.db.query(WorkflowRun).filter(WorkflowRun.id == run_id).first()
-        if not run:
+        # Runs share one event loop: every database step goes to a worker
+        # thread, one at a time per session
+        self.executions = NodeExecutionWriter(self.db, lock=self._db_lock)
+        started = await self._in_db(self._start_run, run_id)
+        if started is None:
             logger.error(f"Run not found: {run_id}")
             return {"success": False, "error": "Run not found"}
+        version_id, trigger_data = started
 
-        run.status = RunStatus.RUNNING
-        self.db.commit()
-
+        autoflush = asyncio.create_task(self.executions.autoflush())
         try:
-            version = self.db.query(WorkflowVersion).filter(
-                WorkflowVersion.id == run.workflow_version_id
-            ).first()
-            if not version:
-                raise Exception("Workflow version not found")
-
-            definition = version.definition
-            nodes: list = definition.get("nodes", [])
-            edges: list = definition.get("edges", [])
-
-            # Build parent map and outgoing-edge map for condition branching
-            # adj: node_id -> [(target_id, sourceHandle)]
-            adj: Dict[str, list] = defaultdict(list)
-            parents: Dict[str, set] = defaultdict(set)
-            for edge in edges:
-                handle = edge.get("sourceHandle") or "output"
-                adj[edge["source"]].append((edge["target"], handle))
-                parents[edge["target"]].add(edge["source"])
-
-            ordered_nodes = _topological_order(nodes, edges)
-            logger.info(f"Executing {len(ordered_nodes)} nodes in topological order")
-
-            trigger_data: dict = run.trigger_data or {}
-            results: Dict[str, Any] = {}
-            skipped: set = set()
-
-            for node in ordered_nodes:
-                nid = node["id"]
-
-                # Skip if this node was explicitly marked skipped (e.g. non-matching
-                # branch of a condition node) — must be checked before the parent
-                # check, since the condition node itself was executed (not skipped).
-                if nid in skipped:
-                    logger.info(f"Skipping node {nid} (explicitly skipped)")
-                    self._record_skipped(run_id, node)
-                    continue
-
-                # Skip if every parent was skipped
-                node_parents = parents.get(nid, set())
-                if node_parents and all(p in skipped for p in node_parents):
-                    skipped.add(nid)
-                    logger.info(f"Skipping node {nid} (all parents skipped)")
-                    self._record_skipped(run_id, node)
-                    continue
-
-                logger.info(f"Executing node {nid} ({node['type']})")
-                result = await self.execute_node(run_id, node, trigger_data, results)
-                results[nid] = result
+            plan, (results, skipped, completed) = await self._in_db(self._prepare, run_id, version_id)
+            self._plan = plan
+            self.run_settings = dict(plan.settings)
+            if not self.run_settings.get("llm_cache", True) and self.ai_agent.cache is not None:
+                self.ai_agent = AIAgent(client=self.ai_agent.client, cache=None)
+            max_concurrency = self._max_concurrency_for(plan)
+            logger.info(
+                f"Executing {len(plan)} nodes in topological order "
+                f"(max_concurrency={max_concurrency})"
+            )
+            if completed:
+                logger.info(
+                    f"Resuming run {run_id}: {len(completed)}/{len(plan)} nodes already complete"
+                )
 
-                # For condition nodes mark the non-matching branch as skipped
-                if node["type"] == "condition":
-                    matched = result.get("matched_path", "true")
-                    for target, handle in adj.get(nid, []):
-                        if handle and handle != matched and handle != "output":
-                            skipped.add(target)
-                            logger.info(f"Condition branching: skipping {target} (handle={handle})")
+            await _run_dag(
+                plan,
+                execute=lambda pn: self.execute_node(
+                    run_id, pn.node, trigger_data, results, template=pn.template
+                ),
+                on_skip=lambda pn: self._record_skipped(run_id, pn.node),
+                results=results,
+                skipped=skipped,
+                max_concurrency=max_concurrency,
+                completed=completed,
+            )
+            await self.executions.flush_async()
 
-            run.status = RunStatus.COMPLETED
-            run.completed_at = datetime.utcnow()
-            self.db.commit()
+            await self._in_db(self._finish_run, run_id, RunStatus.COMPLETED)
             logger.info(f"Workflow run {run_id} completed successfully")
             return {"success": True, "run_id": run_id, "results": results}
 
         except Exception as e:
             logger.error(f"Workflow run {run_id} failed: {e}", exc_info=True)
-            run.status = RunStatus.FAILED
-            run.error_message = str(e)
-            run.completed_at = datetime.utcnow()
-            self.db.commit()
+            try:
+                await self.executions.flush_async()
+            except Exception as flush_error:
+                logger.error(f"Could not persist node executions for run {run_id}: {flush_error}")
+            await self._in_db(self._finish_run, run_id, RunStatus.FAILED, str(e))
             return {"success": False, "error": str(e)}
 
-    def _record_skipped(self, run_id: str, node: dict):
-        execution = NodeExecution(
-            id=str(uuid.uuid4()),
-            run_id=run_id,
-            node_id=node["id"],
-            node_type=node["type"],
-            status=NodeStatus.SKIPPED,
-            started_at=datetime.utcnow(),
-            completed_at=datetime.utcnow(),
+        finally:
+            autoflush.cancel()
+
+    async def _in_db(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking session work on a worker thread."""
+        async with self._db_lock:
+            return await asyncio.to_thread(fn, *args)
+
+    def _start_run(self, run_id: str) -> Optional[Tuple[str, dict]]:
+        """Mark the run RUNNING; returns its version id and trigger data."""
+        run = self.db.query(WorkflowRun).filter(WorkflowRun.id == run_id).first()
+        if not run:
+            return None
+        started = run.workflow_version_id, run.trigger_data or {}
+        run.status = RunStatus.RUNNING
+        run.error_message = None
+        run.completed_at = None
+        self.db.commit()
+        return started
+
+    def _prepare(self, run_id: str, version_id: str):
+        """The run's plan and its checkpoint (see ``_load_checkpoint``)."""
+        version = self.db.query(WorkflowVersion).filter(WorkflowVersion.id == version_id).first()
+        if not version:
+            raise Exception("Workflow version not found")
+        plan = plan_cache.get(version)
+        return plan, self._load_checkpoint(run_id, plan)
+
+    def _finish_run(self, run_id: str, status: RunStatus, error_message: Optional[str] = None) -> None:
+        self.db.query(WorkflowRun).filter(WorkflowRun.id == run_id).update(
+            {"status": status, "error_message": error_message, "completed_at": datetime.utcnow()},
+            synchronize_session=False,
         )
-        self.db.add(execution)
         self.db.commit()
 
+    def _load_checkpoint(self, run_id: str, plan: ExecutionPlan) -> Tuple[Dict[str, Any], set, set]:
+        """Rebuild ``results``/``skipped`` from an earlier attempt of the run.
+
+        The latest execution of each node decides: SUCCESS and SKIPPED nodes
+        are complete and keep their output, anything else runs again, and so
+        does everything downstream of a node that runs again (its inputs may
+        change). Rows left RUNNING by an attempt that died are marked
+        FAILED. Earlier attempts per node are counted into
+        ``self._attempts`` so the next execution records them in
+        ``retry_count``.
+        """
+        results: Dict[str, Any] = {}
+        skipped: set = set()
+        completed: set = set()
+        self._attempts = {}
+        rows = self.db.query(
+            NodeExecution.id, NodeExecution.node_id, NodeExecution.status,
+            NodeExecution.output_data, NodeExecution.output_blob,
+        ).filter(NodeExecution.run_id == run_id).order_by(NodeExecution.started_at).all()
+        if not rows:
+            return results, skipped, completed
+
+        latest = {}
+        for row in rows:
+            latest[row.node_id] = row
+            if row.status != NodeStatus.SKIPPED:
+                self._attempts[row.node_id] = self._attempts.get(row.node_id, 0) + 1
+        # Topological order: a node is kept only if all of its parents were
+        kept_mask = 0
+        for pn in plan.nodes:
+            row = latest.get(pn.id)
+            if row is None or pn.parent_mask & ~kept_mask:
+                continue
+            if row.status == NodeStatus.SUCCESS:
+                try:
+                    results[pn.id] = self.blob_store.load_output(row.output_data, row.output_blob)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Output of node {pn.id} is unavailable ({e}); running it again")
+                    continue
+            elif row.status == NodeStatus.SKIPPED:
+                skipped.add(pn.id)
+            else:
+                continue
+            completed.add(pn.id)
+            kept_mask |= 1 << pn.index
+
+        interrupted = [row.id for row in rows if row.status in (NodeStatus.RUNNING, NodeStatus.PENDING)]
+        if interrupted:
+            self.db.query(NodeExecution).filter(NodeExecution.id.in_(interrupted)).update(
+                {"status": NodeStatus.FAILED, "error_message": "Interrupted", "completed_at": datetime.utcnow()},
+                synchronize_session=False,
+            )
+            self.db.commit()
+        return results, skipped, completed
+
+    def _max_concurrency_for(self, plan: ExecutionPlan) -> int:
+        """Per-run node concurrency: the executor cap, optionally lowered by the definition."""
+        limit = self.max_concurrency
+        requested = plan.settings.get("max_concurrency")
+        if requested:
+            try:
+                limit = min(limit, int(requested))
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring invalid max_concurrency={requested!r}")
+        return max(1, limit)
+
+    def _writer(self) -> NodeExecutionWriter:
+        # execute_node may be called outside execute_workflow; persist eagerly then
+        return self.executions or NodeExecutionWriter(self.db, strict=True, lock=self._db_lock)
+
+    def _record_skipped(self, run_id: str, node: dict):
+        self._writer().skipped(run_id, node)
+
     # ── Single-node execution ──────────────────────────────────────────────
 
     async def execute_node(
@@ -267,40 +424,106 @@ class WorkflowExecutor:
         node: Dict[str, Any],
         trigger_data: Dict[str, Any],
         previous_results: Dict[str, Any],
+        template=None,
     ) -> Dict[str, Any]:
         node_id = node["id"]
         node_type = node["type"]
 
-        execution = NodeExecution(
-            id=str(uuid.uuid4()),
-            run_id=run_id,
-            node_id=node_id,
-            node_type=node_type,
-            status=NodeStatus.RUNNING,
-            input_data=trigger_data,
-            started_at=datetime.utcnow(),
+        data = node.get("data") or {}
+        policy = RetryPolicy.from_node(data)
+        timeout = _node_timeout(data)
+        # Earlier executions of this node (resumed runs) count as retries too
+        attempts = self._attempts.get(node_id, 0)
+
+        # Rendered once: recorded as the input and shared by every attempt
+        resolved = _resolved_data(node_type, data, trigger_data, previous_results, template)
+        writer = self._writer()
+        execution_id = writer.started(
+            run_id, node, _node_inputs(node_type, data, resolved), retry_count=attempts
         )
-        self.db.add(execution)
-        self.db.commit()
 
         try:
-            result = await self._dispatch(node, node_type, trigger_data, previous_results)
-
-            execution.status = NodeStatus.SUCCESS
-            execution.output_data = result
-            execution.completed_at = datetime.utcnow()
-            self.db.commit()
+            result, retries = await call_with_retry(
+                lambda: self._dispatch(node, node_type, trigger_data, previous_results, resolved=resolved),
+                policy,
+                timeout=timeout,
+                retry_result=_retryable_response if node_type in _HTTP_NODE_TYPES else None,
+                description=f"Node {node_id}",
+            )
+            stored, digest = await self._stored_output(node_id, result)
+            writer.finished(
+                execution_id, NodeStatus.SUCCESS, output_data=stored, output_blob=digest,
+                retry_count=attempts + retries,
+            )
             logger.info(f"Node {node_id} succeeded")
             return result
 
         except Exception as e:
             logger.error(f"Node {node_id} failed: {e}", exc_info=True)
-            execution.status = NodeStatus.FAILED
-            execution.error_message = str(e)
-            execution.completed_at = datetime.utcnow()
-            self.db.commit()
+            writer.finished(
+                execution_id, NodeStatus.FAILED, error_message=str(e),
+                retry_count=attempts + getattr(e, "retries", 0),
+            )
             return {"error": str(e), "node_id": node_id}
 
+    async def _stored_output(self, node_id: str, result: Any) -> Tuple[Any, Optional[str]]:
+        """``result`` as recorded, and its blob digest: large outputs go to
+        the blob store."""
+        try:
+            return await asyncio.to_thread(self.blob_store.store_output, result)
+        except OSError as e:
+            logger.warning(f"Could not store output of node {node_id} as a blob ({e}); storing it inline")
+            return result, None
+
+    # ── AI agent ───────────────────────────────────────────────────────────
+
+    def _upstream(self, node_id: str, results: dict) -> Dict[str, Any]:
+        """Results of the nodes ``node_id`` depends on, in topological order.
+
+        Completion order of ``results`` varies between runs when branches
+        execute concurrently, and includes sibling branches, so handlers
+        that look at earlier results use this instead.
+        """
+        if self._plan is None:
+            return dict(results)
+        return {pn.id: results[pn.id] for pn in self._plan.ancestors(node_id) if pn.id in results}
+
+    async def _run_ai_agent(self, data: dict, trigger_data: dict, upstream: Dict[str, Any]) -> dict:
+        agent_type = data.get("agentType", "summarize_multiple")
+        context_override = data.get("context", "")
+
+        if agent_type == "summarize_multiple":
+            articles = trigger_data.get("articles", [])
+            if not articles:
+                for res in upstream.values():
+                    if isinstance(res, dict) and "articles" in res:
+                        articles = res["articles"]
+                        break
+            logger.info(f"AI: summarizing {len(articles)} article(s)")
+            return await self.ai_agent.process_multiple_articles(
+                articles, pack_tokens=_pack_tokens(data)
+            )
+
+        elif agent_type == "draft_email_reply":
+            return await self.ai_agent.draft_email_reply(trigger_data)
+
+        elif agent_type == "analyze_finance":
+            # Find individual_summaries from the nearest previous aiAgent result
+            analysis_input: dict = {}
+            for res in reversed(list(upstream.values())):
+                if isinstance(res, dict) and "individual_summaries" in res:
+                    analysis_input = res
+                    break
+            if not analysis_input:
+                analysis_input = trigger_data
+            return await self.ai_agent.analyze_finance(analysis_input)
+
+        else:
+            # Generic instruction-based task
+            instruction = data.get("instruction", f"Process the following as a {agent_type} task.")
+            context = context_override or json.dumps(trigger_data, indent=2)[:3000]
+            return await self.ai_agent.generic_task(instruction, context)
+
     # ── Node dispatcher ────────────────────────────────────────────────────
 
     async def _dispatch(
@@ -309,64 +532,65 @@ class WorkflowExecutor:
         node_type: str,
         trigger_data: dict,
         results: dict,
+        resolved: Optional[dict] = None,
     ) -> dict:
+        """Run a node's handler. ``resolved`` is the node's data with
+        templates resolved (``_resolved_data``); it is rendered here when
+        the caller did not."""
         data = node.get("data", {})
+        if resolved is None:
+            resolved = _resolved_data(node_type, data, trigger_data, results, None)
 
         # ── trigger / webhook ──────────────────────────────────────────────
         if node_type in ("trigger", "webhook"):
             article_urls = trigger_data.get("article_urls", [])
             if article_urls:
                 logger.info(f"Trigger: fetching {len(article_urls)} article(s)")
-                fetched = self.article_fetcher.fetch_multiple_articles(article_urls)
+                fetched = await self.article_fetcher.fetch_multiple_articles(
+                    article_urls, use_cache=self.run_settings.get("http_cache", True)
+                )
                 return {"articles": fetched, "total_urls": len(article_urls), **trigger_data}
             return {**trigger_data, "webhook_received": True}
 
         # ── action (generic pass-through) ─────────────────────────────────
         elif node_type == "action":
-            d = resolve_data(data, trigger_data, results)
+            d = resolved
             return {
                 "executed": True,
                 "action": d.get("label", "Action"),
                 "input": trigger_data,
-                "previous_nodes": list(results.keys()),
+                "previous_nodes": list(self._upstream(node["id"], results)),
             }
 
         # ── HTTP request ──────────────────────────────────────────────────
-        elif node_type in ("http", "httpRequest"):
-            d = resolve_data(data, trigger_data, results)
+        elif node_type in _HTTP_NODE_TYPES:
+            d = resolved
             method = str(d.get("method", "GET")).upper()
             url = str(d.get("url", "")).strip()
             if not url:
                 return {"error": "HTTP node: 'url' is required"}
 
-            try:
-                validate_url_for_ssrf(url)
-            except ValueError as exc:
-                logger.warning("HTTP node blocked request to '%s': %s", url, exc)
-                return {"error": f"URL validation failed: {exc}"}
-
             raw_headers = d.get("headers", "{}")
             raw_body = d.get("body", "{}")
             headers = _parse_json_field(raw_headers) if isinstance(raw_headers, str) else (raw_headers or {})
             body = _parse_json_field(raw_body) if isinstance(raw_body, str) else (raw_body or {})
 
-            def _do_request():
-                return req_lib.request(
-                    method, url, headers=headers,
-                    json=body if body else None,
-                    timeout=30,
+            try:
+                resp = await self.http_client.request(
+                    method, url, headers=headers, json=body if body else None, timeout=30,
                 )
-
-            resp = await asyncio.to_thread(_do_request)
+            except ValueError as exc:
+                logger.warning("HTTP node blocked request to '%s': %s", url, exc)
+                return {"error": f"URL validation failed: {exc}"}
             try:
                 resp_body = resp.json()
             except Exception:
                 resp_body = resp.text[:2000]
-            return {"status_code": resp.status_code, "success": resp.ok, "body": resp_body}
+            return {"status_code": resp.status_code, "success": resp.status_code < 400, "body": resp_body}
 
         # ── database (simulated) ──────────────────────────────────────────
         elif node_type == "database":
-            d = resolve_data(data, trigger_data, results)
+            d = resolved
             operation = d.get("operation", "read")
             key = d.get("key", "data")
             value = d.get("value", "")
@@ -377,7 +601,7 @@ class WorkflowExecutor:
 
         # ── send email (Gmail SMTP) ────────────────────────────────────────
         elif node_type in ("email", "sendEmail"):
-            d = resolve_data(data, trigger_data, results)
+            d = resolved
             to_addr = str(d.get("to", "")).strip()
             subject = str(d.get("subject", "No Subject")).strip()
             body_text = str(d.get("body", "")).strip()
@@ -412,7 +636,7 @@ class WorkflowExecutor:
 
         # ── notification (webhook / Slack / generic POST) ─────────────────
         elif node_type == "notify":
-            d = resolve_data(data, trigger_data, results)
+            d = resolved
             webhook_url = str(d.get("webhook_url", "")).strip()
             message = str(d.get("message", "Workflow notification"))
 
@@ -421,46 +645,21 @@ class WorkflowExecutor:
 
             payload = {"text": message, "timestamp": datetime.utcnow().isoformat()}
 
-            def _post():
-                return req_lib.post(webhook_url, json=payload, timeout=10)
-
-            resp = await asyncio.to_thread(_post)
+            try:
+                resp = await self.http_client.request("POST", webhook_url, json=payload, timeout=10)
+            except ValueError as exc:
+                logger.warning("Notify node blocked request to '%s': %s", webhook_url, exc)
+                return {"sent": False, "reason": f"URL validation failed: {exc}", "message": message}
             return {"sent": True, "status_code": resp.status_code, "message": message}
 
         # ── AI agent ──────────────────────────────────────────────────────
         elif node_type == "aiAgent":
-            agent_type = data.get("agentType", "summarize_multiple")
-            context_override = data.get("context", "")
-
-            if agent_type == "summarize_multiple":
-                articles = trigger_data.get("articles", [])
-                if not articles:
-                    for res in results.values():
-                        if isinstance(res, dict) and "articles" in res:
-                            articles = res["articles"]
-                            break
-                logger.info(f"AI: summarizing {len(articles)} article(s)")
-                return await self.ai_agent.process_multiple_articles(articles)
-
-            elif agent_type == "draft_email_reply":
-                return await self.ai_agent.draft_email_reply(trigger_data)
-
-            elif agent_type == "analyze_finance":
-                # Find individual_summaries from the nearest previous aiAgent result
-                analysis_input: dict = {}
-                for res in reversed(list(results.values())):
-                    if isinstance(res, dict) and "individual_summaries" in res:
-                        analysis_input = res
-                        break
-                if not analysis_input:
-                    analysis_input = trigger_data
-                return await self.ai_agent.analyze_finance(analysis_input)
-
-            else:
-                # Generic instruction-based task
-                instruction = data.get("instruction", f"Process the following as a {agent_type} task.")
-                context = context_override or json.dumps(trigger_data, indent=2)[:3000]
-                return await self.ai_agent.generic_task(instruction, context)
+            with track_rate_limit_wait() as waited:
+                result = await self._run_ai_agent(data, trigger_data, self._upstream(node["id"], results))
+            if waited.calls:
+                logger.info(f"AI: waited {waited.seconds:.2f}s for Gemini quota ({waited.calls} call(s))")
+                result["rate_limit_wait_seconds"] = round(waited.seconds, 3)
+            return result
 
         # ── condition (branching) ─────────────────────────────────────────
         elif node_type == "condition":
@@ -555,9 +754,9 @@ class WorkflowExecutor:
                 output = resolve_value(template, trigger_data, results)
                 parsed = _parse_json_field(output)
                 return {"output": parsed, "template_applied": True}
-            # No template → merge all available data
+            # No template → merge upstream data; later nodes win on conflicts
             merged = {**trigger_data}
-            for res in results.values():
+            for res in self._upstream(node["id"], results).values():
                 if isinstance(res, dict):
                     merged.update(res)
             return {"output": merged, "template_applied": False}
@@ -570,7 +769,7 @@ class WorkflowExecutor:
 
         # ── human approval (auto-approved for now) ────────────────────────
         elif node_type == "humanApproval":
-            d = resolve_data(data, trigger_data, results)
+            d = resolved
             return {
                 "approved": True,
                 "message": d.get("message", "Approval required"),
@@ -580,9 +779,23 @@ class WorkflowExecutor:
 
         # ── output (collector) ────────────────────────────────────────────
         elif node_type == "output":
-            return {"trigger_data": trigger_data, "previous_results": results}
+            # Snapshot: results keeps growing while other branches finish
+            return {"trigger_data": trigger_data, "previous_results": dict(results)}
 
         # ── unknown ───────────────────────────────────────────────────────
         else:
             logger.warning(f"Unknown node type: {node_type}")
             return {"message": f"Node type '{node_type}' not yet implemented", "data": data}
+
+
+async def run_workflow(run_id: str, **executor_kwargs: Any) -> Dict[str, Any]:
+    """Execute a run on the running event loop with its own session."""
+    from app.db.session import SessionLocal
+
+    db_session = SessionLocal()
+    try:
+        executor = WorkflowExecutor(db_session, **executor_kwargs)
+        return await executor.execute_workflow(run_id)
+    finally:
+        await asyncio.to_thread(db_session.close)
+
@@ -0,0 +1,336 @@
+"""
+Run worker: executes workflow runs outside the API process.
+
+    python -m app.worker [--concurrency N]
+
+Two backends, chosen by ``RUN_BACKEND``:
+
+- ``redis``: each of ``WORKER_CONCURRENCY`` consumers claims a run ID from
+  the Redis queue, executes it as a task on the worker's loop and
+  acknowledges it when it is finished. The claim is renewed every third of
+  the visibility timeout; if the worker dies, it expires and another worker
+  picks the run up. A run whose claim expired anyway is cancelled.
+- ``postgres``: the worker claims PENDING rows of ``workflow_runs`` directly
+  (see ``run_leases``) and executes them as tasks on its own loop. A
+  heartbeat renews the leases every third of ``RUN_LEASE_SECONDS`` and
+  cancels runs whose lease was lost; every worker also reaps expired leases.
+
+On SIGTERM/SIGINT the worker stops claiming and waits for the runs it has
+in progress.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+import redis
+
+from app.core.config import settings
+from app.core.logging_config import setup_logging
+from app.services.ai_agent import AIAgent
+from app.services.article_fetcher import ArticleFetcher, parse_lanes
+from app.services.extraction_pool import extraction_pool
+from app.services.http_client import SharedHttpClient, http_client as shared_http_client
+from app.services.llm_client import gemini_client
+from app.services import run_leases
+from app.services.run_queue import RunQueue
+from app.services.workflow_executor import run_workflow
+
+logger = logging.getLogger("workflow")
+
+_POLL_INTERVAL = 1.0
+
+
+def _abandon_run(run_id: str, message: str) -> None:
+    from app.db.session import SessionLocal
+    from app.models.run import RunStatus, WorkflowRun
+
+    db = SessionLocal()
+    try:
+        run = db.query(WorkflowRun).filter(WorkflowRun.id == run_id).first()
+        if run is not None and run.status in (RunStatus.PENDING, RunStatus.RUNNING):
+            run.status = RunStatus.FAILED
+            run.error_message = message
+            run.completed_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+
+
+class RunWorker:
+    def __init__(
+        self,
+        queue: RunQueue,
+        concurrency: Optional[int] = None,
+        http_client: Optional[SharedHttpClient] = None,
+        execute: Optional[Callable[[str], Awaitable[object]]] = None,
+        max_deliveries: Optional[int] = None,
+    ):
+        self.queue = queue
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.http_client = http_client or shared_http_client
+        self.execute = execute or self._execute
+        self.max_deliveries = max_deliveries or settings.RUN_QUEUE_MAX_DELIVERIES
+        self.ai_agent = AIAgent()
+        self.article_fetcher = ArticleFetcher(http_client=self.http_client)
+        self.completed = 0
+        self.lost = 0
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        if not self._stopping.is_set():
+            logger.info("Worker stopping: finishing runs in progress")
+        self._stopping.set()
+
+    async def serve(self) -> None:
+        logger.info(f"Worker consuming '{self.queue.name}' ({self.concurrency} concurrent runs)")
+        await asyncio.gather(*(self._consume() for _ in range(self.concurrency)))
+
+    async def _consume(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                claimed = await asyncio.to_thread(self.queue.claim)
+            except redis.RedisError as e:
+                logger.warning(f"Worker could not claim a run: {e}")
+                claimed = None
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), _POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._process(*claimed)
+
+    async def _process(self, run_id: str, deliveries: int) -> None:
+        if deliveries > self.max_deliveries:
+            logger.error(f"Run {run_id} abandoned after {deliveries - 1} deliveries")
+            await asyncio.to_thread(
+                _abandon_run, run_id, f"Run abandoned after {deliveries - 1} attempts by workers"
+            )
+            await asyncio.to_thread(self.queue.ack, run_id)
+            return
+
+        logger.info(f"Worker executing run {run_id} (delivery {deliveries})")
+        run = asyncio.create_task(self.execute(run_id))
+        heartbeat = asyncio.create_task(self._heartbeat(run_id))
+        try:
+            await asyncio.wait((run, heartbeat), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            run.cancel()
+            raise
+        finally:
+            heartbeat.cancel()
+        if not run.done():
+            # The claim expired: another worker may already have the run, so
+            # stop it and neither acknowledge nor release it
+            self.lost += 1
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+            logger.warning(f"Run {run_id} cancelled: claim lost")
+            return
+        try:
+            run.result()
+        except Exception as e:
+            # The executor records run failures itself; this is infrastructure
+            # (e.g. the database is down), so let the run be delivered again
+            logger.error(f"Worker could not execute run {run_id}: {e}", exc_info=True)
+            await asyncio.to_thread(self.queue.release, run_id)
+            return
+        await asyncio.to_thread(self.queue.ack, run_id)
+        self.completed += 1
+
+    async def _execute(self, run_id: str) -> None:
+        await run_workflow(
+            run_id,
+            http_client=self.http_client,
+            ai_agent=self.ai_agent,
+            article_fetcher=self.article_fetcher,
+        )
+
+    async def _heartbeat(self, run_id: str) -> None:
+        """Renew the claim on a run; returns once the claim is lost."""
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            try:
+                if not await asyncio.to_thread(self.queue.extend, run_id):
+                    return
+            except redis.RedisError as e:
+                logger.warning(f"Could not renew claim on run {run_id}: {e}")
+
+
+def _with_session(fn: Callable, *args):
+    """Call ``fn(db, *args)`` with a short-lived session (blocking)."""
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+class LeaseWorker:
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        max_claims: Optional[int] = None,
+        http_client: Optional[SharedHttpClient] = None,
+        execute: Optional[Callable[[str], Awaitable[object]]] = None,
+    ):
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.lease_seconds = lease_seconds or settings.RUN_LEASE_SECONDS
+        self.poll_interval = poll_interval or settings.RUN_CLAIM_POLL_INTERVAL
+        self.max_claims = max_claims or settings.RUN_QUEUE_MAX_DELIVERIES
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.http_client = http_client or shared_http_client
+        self.execute = execute or self._execute
+        self.ai_agent = AIAgent()
+        self.article_fetcher = ArticleFetcher(http_client=self.http_client)
+        self.completed = 0
+        self.lost = 0
+        # Runs holding a lease, and every run task (until its lease is released)
+        self._active: Dict[str, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._slot_freed = asyncio.Event()
+
+    def stop(self) -> None:
+        if not self._stopping.is_set():
+            logger.info("Worker stopping: finishing runs in progress")
+        self._stopping.set()
+
+    async def serve(self) -> None:
+        logger.info(f"Worker {self.owner} claiming runs ({self.concurrency} concurrent runs)")
+        background = [asyncio.create_task(self._heartbeat()), asyncio.create_task(self._reap())]
+        try:
+            while not self._stopping.is_set():
+                claimed = await self._claim()
+                for run_id in claimed:
+                    task = asyncio.create_task(self._run(run_id))
+                    self._active[run_id] = task
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                if claimed and len(self._active) < self.concurrency:
+                    continue  # there may be more waiting
+                self._slot_freed.clear()
+                waiters = [asyncio.create_task(self._stopping.wait())]
+                if len(self._active) >= self.concurrency:
+                    waiters.append(asyncio.create_task(self._slot_freed.wait()))
+                _, pending = await asyncio.wait(
+                    waiters, timeout=None if len(waiters) > 1 else self.poll_interval,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for waiter in pending:
+                    waiter.cancel()
+            # Includes runs that finished but are still releasing their lease
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            for task in background:
+                task.cancel()
+
+    async def _claim(self) -> list:
+        free = self.concurrency - len(self._active)
+        if free <= 0:
+            return []
+        try:
+            return await asyncio.to_thread(
+                _with_session, run_leases.claim_runs, self.owner, free, self.lease_seconds
+            )
+        except Exception as e:
+            logger.warning(f"Worker could not claim runs: {e}")
+            return []
+
+    async def _run(self, run_id: str) -> None:
+        logger.info(f"Worker executing run {run_id}")
+        try:
+            await self.execute(run_id)
+            self.completed += 1
+        except asyncio.CancelledError:
+            logger.warning(f"Run {run_id} cancelled: lease lost")
+        except Exception as e:
+            logger.error(f"Worker could not execute run {run_id}: {e}", exc_info=True)
+        finally:
+            self._active.pop(run_id, None)
+            self._slot_freed.set()
+        try:
+            await asyncio.to_thread(_with_session, run_leases.release_lease, self.owner, run_id)
+        except Exception as e:
+            # The lease simply expires; the reaper ignores finished runs
+            logger.warning(f"Could not release lease on run {run_id}: {e}")
+
+    async def _execute(self, run_id: str) -> None:
+        await run_workflow(
+            run_id,
+            http_client=self.http_client,
+            ai_agent=self.ai_agent,
+            article_fetcher=self.article_fetcher,
+        )
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            run_ids = list(self._active)
+            try:
+                held = await asyncio.to_thread(
+                    _with_session, run_leases.renew_leases, self.owner, run_ids, self.lease_seconds
+                )
+            except Exception as e:
+                logger.warning(f"Could not renew leases: {e}")
+                continue
+            for run_id in run_ids:
+                task = self._active.get(run_id)
+                if run_id not in held and task is not None and not task.done():
+                    # Another worker may already have it; never run it twice
+                    self.lost += 1
+                    task.cancel()
+
+    async def _reap(self) -> None:
+        while True:
+            try:
+                requeued, failed = await asyncio.to_thread(
+                    _with_session, run_leases.reap_expired, self.max_claims
+                )
+                if requeued or failed:
+                    logger.warning(f"Reaped expired leases: {requeued} run(s) re-queued, {failed} failed")
+            except Exception as e:
+                logger.warning(f"Could not reap expired leases: {e}")
+            await asyncio.sleep(self.lease_seconds)
+
+
+async def _main(concurrency: Optional[int]) -> None:
+    await shared_http_client.start()
+    await asyncio.to_thread(extraction_pool.start)
+    if settings.RUN_BACKEND == "postgres":
+        worker = LeaseWorker(concurrency=concurrency)
+    else:
+        worker = RunWorker(RunQueue(), concurrency=concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.serve()
+    finally:
+        await asyncio.to_thread(extraction_pool.shutdown)
+        parse_lanes.shutdown()
+        await shared_http_client.aclose()
+        gemini_client.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Execute queued workflow runs")
+    parser.add_argument("--concurrency", type=int, default=None, help="runs executed at once")
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(_main(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
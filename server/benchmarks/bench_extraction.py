@@ -0,0 +1,128 @@
+"""
+Benchmark: streaming, early-exit extraction vs. parsing the whole page.
+
+Each mode runs in a fresh subprocess so peak RSS (``ru_maxrss``) is not
+polluted by the other. Pages are fed in 64 KiB chunks, as they would arrive
+from the network, and the streaming mode honours ``ARTICLE_MAX_BYTES``.
+Run from the server directory, optionally against saved pages:
+
+    python -m benchmarks.bench_extraction [--corpus DIR]
+
+Without ``--corpus`` a set of synthetic pages (0.1-7 MB, script-heavy
+chrome around an ``<article>``) is generated.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+CHUNK = 64 * 1024
+
+
+def synthetic_page(paragraphs: int, script_kb: int) -> bytes:
+    line = "var cfg = {a: 1 < 2, b: '</p>'}; track();\n"
+    head_script = "<script>" + line * (script_kb * 4) + "</script>"
+    script = "<script>" + line * (script_kb * 20) + "</script>"
+    nav = "<nav><ul>" + "".join(f"<li><a href='/s{i}'>Section {i}</a></li>" for i in range(200)) + "</ul></nav>"
+    body = "".join(
+        f"<p>Paragraph {i}: Lorem ipsum dolor sit amet, <b>consectetur</b> adipiscing elit, "
+        f"sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.</p>\n"
+        for i in range(paragraphs)
+    )
+    return (
+        f"<!doctype html><html><head><meta charset='utf-8'><title>Synthetic {paragraphs}</title>"
+        f"{head_script}</head><body><header><h1>Site</h1>{nav}</header>"
+        f"<article><h1>Story with {paragraphs} paragraphs</h1>{body}</article>"
+        f"<footer><p>Footer</p></footer>{script}</body></html>"
+    ).encode("utf-8")
+
+
+def write_synthetic(directory: Path) -> None:
+    for paragraphs, script_kb in ((50, 64), (500, 512), (5000, 2048), (20000, 4096)):
+        (directory / f"synthetic-{paragraphs}.html").write_bytes(synthetic_page(paragraphs, script_kb))
+
+
+def worker(mode: str, paths: list) -> None:
+    """Extract every page in ``paths`` and print timings and peak RSS as JSON."""
+    from app.core.config import settings
+    from app.services.article_fetcher import StreamingExtractor, extract_article
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = {}
+    for path in paths:
+        data = Path(path).read_bytes()
+        start = time.perf_counter()
+        if mode == "full":
+            extracted = extract_article(data, path)
+            read = len(data)
+        else:
+            extractor = StreamingExtractor(path)
+            limit = min(len(data), settings.ARTICLE_MAX_BYTES)
+            for offset in range(0, limit, CHUNK):
+                if extractor.feed(data[offset:min(offset + CHUNK, limit)]):
+                    break
+            extracted = extractor.result()
+            read = extractor.bytes_read
+        timings[Path(path).name] = {
+            "ms": (time.perf_counter() - start) * 1000,
+            "bytes_read": read,
+            "extracted": extracted,
+        }
+        del data
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"timings": timings, "peak_rss_kb": peak - baseline}))
+
+
+def run_mode(mode: str, paths: list) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_extraction", "--worker", mode, *paths],
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="directory of saved .html pages")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("paths", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.paths)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(args.corpus) if args.corpus else Path(tmp)
+        if not args.corpus:
+            write_synthetic(corpus)
+        paths = sorted(str(p) for p in corpus.glob("*.html"))
+        if not paths:
+            sys.exit(f"no .html files in {corpus}")
+
+        full, streaming = run_mode("full", paths), run_mode("streaming", paths)
+
+    print(f"{'page':<28}{'size':>10}{'full ms':>10}{'stream ms':>11}{'bytes read':>12}  same output")
+    for path in paths:
+        name = Path(path).name
+        f, s = full["timings"][name], streaming["timings"][name]
+        print(
+            f"{name:<28}{f['bytes_read'] / 1024:>8.0f}KB{f['ms']:>10.1f}{s['ms']:>11.1f}"
+            f"{s['bytes_read'] / 1024:>10.0f}KB  {f['extracted'] == s['extracted']}"
+        )
+    print(f"peak RSS over baseline: full {full['peak_rss_kb'] / 1024:.1f} MB, "
+          f"streaming {streaming['peak_rss_kb'] / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
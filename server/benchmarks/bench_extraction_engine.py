@@ -0,0 +1,119 @@
+"""
+Benchmark: lxml extraction engine vs. the original BeautifulSoup extractor.
+
+Runs every page of the checked-in corpus (``benchmarks/corpus``) through the
+legacy extractor, ``extract_article`` and the streaming extractor, and
+reports throughput (pages/sec) and output quality against the expected
+titles and text in ``corpus/expected.json``: title accuracy and the mean
+token-level F1 of the extracted content. Run from the server directory:
+
+    python -m benchmarks.bench_extraction_engine [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from app.services.extraction import extract_article, extract_html  # noqa: E402
+
+CORPUS = Path(__file__).parent / "corpus"
+_WORD_RE = re.compile(r"\w+")
+
+
+# ── Original implementation (baseline) ──────────────────────────────────────
+
+def legacy_extract_article(html: bytes, url: str) -> dict:
+    soup = BeautifulSoup(html, 'lxml')
+
+    for script in soup(["script", "style", "nav", "footer", "header"]):
+        script.decompose()
+
+    if soup.find('h1'):
+        title = soup.find('h1').get_text().strip()
+    elif soup.find('title'):
+        title = soup.find('title').get_text().strip()
+    else:
+        title = url
+
+    content = ""
+    article_tags = soup.find_all(['article', 'main'])
+    if article_tags:
+        for tag in article_tags:
+            paragraphs = tag.find_all('p')
+            content += ' '.join([p.get_text().strip() for p in paragraphs])
+    else:
+        paragraphs = soup.find_all('p')
+        content = ' '.join([p.get_text().strip() for p in paragraphs])
+
+    content = ' '.join(content.split())
+    if len(content) > 5000:
+        content = content[:5000] + "..."
+    return {"title": title, "content": content}
+
+
+# ── Quality ──────────────────────────────────────────────────────────────────
+
+def token_f1(got: str, expected: str) -> float:
+    got_tokens = Counter(_WORD_RE.findall(got.lower()))
+    expected_tokens = Counter(_WORD_RE.findall(expected.lower()))
+    overlap = sum((got_tokens & expected_tokens).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(got_tokens.values())
+    recall = overlap / sum(expected_tokens.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def load_corpus():
+    expected = json.loads((CORPUS / "expected.json").read_text())
+    return [(name, (CORPUS / name).read_bytes(), want) for name, want in sorted(expected.items())]
+
+
+ENGINES = {
+    "legacy (BeautifulSoup)": legacy_extract_article,
+    "extract_article (lxml)": extract_article,
+    "streaming": extract_html,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    corpus = load_corpus()
+    total_bytes = sum(len(html) for _, html, _ in corpus)
+    print(f"{len(corpus)} pages, {total_bytes / 1024:.0f} KB, x{args.repeat}")
+
+    for label, extract in ENGINES.items():
+        titles, f1s, misses = 0, [], []
+        for name, html, want in corpus:
+            got = extract(html, name)
+            titles += got["title"] == want["title"]
+            f1s.append(token_f1(got["content"], want["text"]))
+            if got["title"] != want["title"] or f1s[-1] < 0.99:
+                misses.append(name)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for name, html, _ in corpus:
+                extract(html, name)
+        elapsed = time.perf_counter() - start
+
+        pages_per_sec = len(corpus) * args.repeat / elapsed
+        print(
+            f"{label:<24} {pages_per_sec:8.0f} pages/s   titles {titles}/{len(corpus)}   "
+            f"mean F1 {sum(f1s) / len(f1s):.3f}   {'off: ' + ', '.join(misses) if misses else ''}"
+        )
+
+
+if __name__ == "__main__":
+    main()
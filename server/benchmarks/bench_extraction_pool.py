@@ -0,0 +1,113 @@
+"""
+Benchmark: API event-loop latency while a 50-URL trigger is processed.
+
+Mirrors production: the shared HTTP client lives on the "API" loop, and the
+run fetches articles from its own loop in a background thread. A probe on
+the API loop wakes every 5 ms and records how late it was - the delay any
+API request would see. Compared with extraction in threads of the API
+process (``EXTRACTION_WORKERS=0``) and in the process pool. Pages are served
+from a local HTTP server. Run from the server directory:
+
+    python -m benchmarks.bench_extraction_pool [--workers N] [--urls 50]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services import http_client as http_client_module  # noqa: E402
+from app.services.article_fetcher import ArticleFetcher  # noqa: E402
+from app.services.extraction_pool import ExtractionPool  # noqa: E402
+from app.services.http_client import SharedHttpClient  # noqa: E402
+from benchmarks.bench_extraction import synthetic_page  # noqa: E402
+
+PAGE = synthetic_page(3000, 256)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        try:
+            self.wfile.write(PAGE)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+async def measure(base_url: str, urls: int, pool: ExtractionPool, streaming: bool) -> dict:
+    client = SharedHttpClient()
+    await client.start()
+    fetcher = ArticleFetcher(http_client=client, cache=None, streaming=streaming, extraction_pool=pool)
+    lags = []
+    done = threading.Event()
+
+    def run_trigger():
+        asyncio.run(fetcher.fetch_multiple_articles([f"{base_url}/{i}" for i in range(urls)]))
+        done.set()
+
+    start = time.perf_counter()
+    threading.Thread(target=run_trigger, daemon=True).start()
+    while not done.is_set():
+        before = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append((time.perf_counter() - before - 0.005) * 1000)
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "p50": statistics.median(lags),
+        "p99": lags[int(len(lags) * 0.99) - 1],
+        "max": lags[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--urls", type=int, default=50)
+    args = parser.parse_args()
+
+    # The local server is on loopback, which SSRF validation rejects
+    async def loopback(_):
+        return ("127.0.0.1",)
+
+    http_client_module.validate_url_for_ssrf_async = loopback
+    http_client_module.resolve_public_host_async = loopback
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    print(f"{args.urls} URLs x {len(PAGE) / 1024:.0f} KB, probe lag on the API loop (ms)")
+    for label, workers, streaming in (
+        ("in-process, full parse", 0, False),
+        ("in-process, streaming", 0, True),
+        (f"pool x{args.workers}, full parse", args.workers, False),
+        (f"pool x{args.workers}, streaming", args.workers, True),
+    ):
+        pool = ExtractionPool(workers=workers)
+        pool.start()
+        try:
+            r = asyncio.run(measure(base_url, args.urls, pool, streaming))
+        finally:
+            pool.shutdown()
+        print(f"{label:<30} total {r['elapsed']:6.2f}s   p50 {r['p50']:6.2f}   p99 {r['p99']:7.2f}   max {r['max']:7.2f}")
+    httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Micro-benchmark: compiled templates vs. the original regex resolver.
+
+Covers deep node ``data`` dicts (mostly template-free, a few templated
+leaves) and long ``results`` maps. Run from the server directory:
+
+    python -m benchmarks.bench_templates
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.templates import compile_data, resolve_data, resolve_ref  # noqa: E402
+
+
+# ── Original implementation (baseline) ──────────────────────────────────────
+
+def _legacy_get_nested(obj, keys):
+    for k in keys:
+        if isinstance(obj, dict):
+            obj = obj.get(k)
+        else:
+            return None
+    return obj
+
+
+def legacy_resolve_value(value, trigger_data, results):
+    if not isinstance(value, str):
+        return value
+
+    def replacer(m):
+        path = m.group(1).strip().split(".")
+        if path[0] == "trigger":
+            val = _legacy_get_nested(trigger_data, path[1:])
+        elif path[0] in results:
+            val = _legacy_get_nested(results[path[0]], path[1:])
+        else:
+            return m.group(0)
+        return str(val) if val is not None else ""
+
+    return re.sub(r"\{\{([^}]+)\}\}", replacer, value)
+
+
+def legacy_resolve_ref(value, trigger_data, results):
+    if not isinstance(value, str):
+        return value
+    m = re.fullmatch(r"\{\{([^}]+)\}\}", value.strip())
+    if m:
+        path = m.group(1).strip().split(".")
+        if path[0] == "trigger":
+            return _legacy_get_nested(trigger_data, path[1:])
+        if path[0] in results:
+            return _legacy_get_nested(results[path[0]], path[1:])
+        return value
+    return legacy_resolve_value(value, trigger_data, results)
+
+
+def legacy_resolve_data(data, trigger_data, results):
+    if isinstance(data, str):
+        return legacy_resolve_value(data, trigger_data, results)
+    if isinstance(data, dict):
+        return {k: legacy_resolve_data(v, trigger_data, results) for k, v in data.items()}
+    if isinstance(data, list):
+        return [legacy_resolve_data(item, trigger_data, results) for item in data]
+    return data
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────────────
+
+def deep_data(depth: int, width: int, templated_every: int) -> dict:
+    """A ``width``-ary tree of dicts; every Nth leaf holds a template."""
+    counter = [0]
+
+    def build(level):
+        if level == depth:
+            counter[0] += 1
+            if counter[0] % templated_every == 0:
+                return f"Hello {{{{trigger.user.name}}}}, see {{{{node-{counter[0] % 50}.body.title}}}}"
+            return f"static value {counter[0]}"
+        return {f"k{i}": build(level + 1) for i in range(width)}
+
+    return build(0)
+
+
+def long_results(n: int) -> dict:
+    return {f"node-{i}": {"body": {"title": f"Title {i}", "items": list(range(5))}} for i in range(n)}
+
+
+def bench(label, legacy, compiled, number):
+    t_old = min(timeit.repeat(legacy, number=number, repeat=5))
+    t_new = min(timeit.repeat(compiled, number=number, repeat=5))
+    print(
+        f"{label:<44} legacy {t_old / number * 1e6:9.1f} us   "
+        f"compiled {t_new / number * 1e6:9.1f} us   speedup {t_old / t_new:5.1f}x"
+    )
+
+
+def main():
+    trigger = {"user": {"name": "Ada"}, "article_urls": ["https://example.com"] * 20}
+    results = long_results(500)
+
+    for depth, width, every in ((4, 4, 10), (6, 3, 25), (3, 10, 1000)):
+        data = deep_data(depth, width, every)
+        plan_template = compile_data(data)
+        assert plan_template.render(trigger, results) == legacy_resolve_data(data, trigger, results)
+        bench(
+            f"resolve_data depth={depth} width={width} 1/{every} tmpl",
+            lambda: legacy_resolve_data(data, trigger, results),
+            lambda: resolve_data(data, trigger, results),
+            number=200,
+        )
+        bench(
+            "  precompiled plan template",
+            lambda: legacy_resolve_data(data, trigger, results),
+            lambda: plan_template.render(trigger, results),
+            number=200,
+        )
+
+    ref = "{{node-499.body.items}}"
+    bench(
+        "resolve_ref single token, 500 results",
+        lambda: legacy_resolve_ref(ref, trigger, results),
+        lambda: resolve_ref(ref, trigger, results),
+        number=20000,
+    )
+    mixed = "Report for {{trigger.user.name}}: " + " | ".join(
+        f"{{{{node-{i}.body.title}}}}" for i in range(0, 500, 10)
+    )
+    bench(
+        "resolve_value 50 tokens, 500 results",
+        lambda: legacy_resolve_value(mixed, trigger, results),
+        lambda: resolve_data(mixed, trigger, results),
+        number=2000,
+    )
+
+
+if __name__ == "__main__":
+    main()
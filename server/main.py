@@ -6,11 +6,18 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
 
-from app.api import workflows, runs, nodes, tasks
+from app.api import workflows, runs, nodes, tasks, metrics
 from app.core.config import settings
 from app.core.logging_config import setup_logging
 from app.db.session import engine
 from app.db.base import Base
+from app.services.article_fetcher import parse_lanes
+from app.services.extraction_pool import extraction_pool
+from app.services.http_client import http_client
+from app.services.llm_client import gemini_client
+from app.services.retention import retention_loop
+from app.services.run_executor import run_executor
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,9 +29,21 @@ async def lifespan(app: FastAPI):
     setup_logging()
     logger.info("🚀 Starting AI Workflow Automation Platform")
     logger.info(f"Database: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'configured'}")
+    await http_client.start()
+    app.state.http_client = http_client
+    await asyncio.to_thread(extraction_pool.start)
+    if settings.RUN_BACKEND == "background":
+        await asyncio.to_thread(run_executor.start)
+    retention = asyncio.create_task(retention_loop())
     yield
     # Shutdown
     logger.info("👋 Shutting down AI Workflow Automation Platform")
+    retention.cancel()
+    await asyncio.to_thread(run_executor.shutdown)
+    await asyncio.to_thread(extraction_pool.shutdown)
+    parse_lanes.shutdown()
+    await http_client.aclose()
+    gemini_client.shutdown()
 
 
 app = FastAPI(
@@ -49,6 +68,7 @@ app.include_router(workflows.router, prefix="/api/workflows", tags=["workflows"]
 app.include_router(runs.router, prefix="/api/runs", tags=["runs"])
 app.include_router(nodes.router, prefix="/api/nodes", tags=["nodes"])
 app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
 
 
 # Static frontend (when running as single image with frontend build in server/static)
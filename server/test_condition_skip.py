@@ -18,7 +18,7 @@ import asyncio
 from collections import defaultdict
 from typing import Any, Dict
 
-from app.services.workflow_executor import _topological_order
+from app.services.execution_plan import topological_order as _topological_order
 
 
 # --------------------------------------------------------------------------- #
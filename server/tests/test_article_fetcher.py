@@ -0,0 +1,216 @@
+"""Tests for concurrent, host-polite article fetching."""
+
+import asyncio
+import os
+import sys
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services import article_fetcher
+from app.services.article_fetcher import ArticleFetcher, ParseLanes, StreamingExtractor, extract_article
+from app.services.extraction import TextCounter, extract_html
+
+PAGE = b"<html><head><title>T</title></head><body><h1>%s</h1><p>Body text.</p></body></html>"
+
+
+class FakeHttpClient:
+    """Stands in for SharedHttpClient; records per-host concurrency."""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.active = Counter()
+        self.peak = Counter()
+        self.total_peak = 0
+
+    async def request(self, method, url, headers=None, json=None, timeout=30):
+        host = urlparse(url).netloc
+        self.active[host] += 1
+        self.peak[host] = max(self.peak[host], self.active[host])
+        self.total_peak = max(self.total_peak, sum(self.active.values()))
+        try:
+            await asyncio.sleep(self.delays.get(url, 0.02))
+        finally:
+            self.active[host] -= 1
+        if url.endswith("/404"):
+            return httpx.Response(404, request=httpx.Request(method, url))
+        return httpx.Response(200, content=PAGE % url.encode(), request=httpx.Request(method, url))
+
+    async def stream(self, method, url, on_chunk, on_response=None, headers=None, timeout=30, max_bytes=None):
+        response = await self.request(method, url, headers=headers, timeout=timeout)
+        if response.is_success:
+            if on_response:
+                on_response(response)
+            on_chunk(response.content[:max_bytes])
+        return response
+
+
+def fetch(urls, client, **kwargs):
+    return asyncio.run(ArticleFetcher(http_client=client).fetch_multiple_articles(urls, **kwargs))
+
+
+def test_results_keep_input_order_and_shape():
+    urls = [f"https://site{i % 3}.example/{i}" for i in range(9)] + ["https://site0.example/404"]
+    client = FakeHttpClient(delays={urls[0]: 0.1})
+    articles = fetch(urls, client)
+
+    assert [a["url"] for a in articles] == urls
+    assert all(a["success"] and a["title"] == a["url"] for a in articles[:-1])
+    assert articles[0]["content"] == "Body text."
+    assert articles[-1]["success"] is False
+    assert articles[-1]["error"].startswith("Failed to fetch URL")
+
+
+def test_global_and_per_host_limits():
+    urls = [f"https://a.example/{i}" for i in range(6)] + [f"https://b.example/{i}" for i in range(6)]
+    client = FakeHttpClient()
+    fetch(urls, client, concurrency=3, per_host=2)
+
+    assert client.peak["a.example"] == 2
+    assert client.peak["b.example"] == 2
+    assert client.total_peak == 3
+
+
+def test_url_timeout_and_overall_deadline():
+    urls = ["https://slow.example/1", "https://fast.example/1", "https://slow.example/2"]
+    client = FakeHttpClient(delays={urls[0]: 5, urls[2]: 5})
+
+    articles = fetch(urls, client, url_timeout=0.1)
+    assert [a["success"] for a in articles] == [False, True, False]
+    assert "timed out" in articles[0]["error"]
+
+    articles = fetch(urls, client, per_host=1, url_timeout=10, deadline=0.2)
+    assert [a["success"] for a in articles] == [False, True, False]
+    assert "deadline" in articles[2]["error"]
+
+
+def stream_extract(page, chunk_size):
+    extractor = StreamingExtractor("https://x.example/")
+    for i in range(0, len(page), chunk_size):
+        if extractor.feed(page[i:i + chunk_size]):
+            break
+    return extractor
+
+
+def test_streaming_extractor_matches_full_parse_at_any_chunk_boundary():
+    page = (
+        "<html><head><title>Head title</title><meta charset='utf-8'></head><body>"
+        "<header><h1>Site name</h1></header><h1>Real <b>headline</b></h1>"
+        "<nav><p>Menu</p></nav><article><p>Hello <b>wörld</b><script>if (a < b) x = '</p>';</script> again</p>"
+        "<p>Second</p></article><p>Outside</p><footer><p>Footer</p></footer></body></html>"
+    ).encode("utf-8")
+    expected = extract_article(page, "https://x.example/")
+    assert expected == {"title": "Real headline", "content": "Hello wörld again Second"}
+    for chunk_size in range(1, 40):
+        assert stream_extract(page, chunk_size).result() == expected, chunk_size
+
+
+def test_streaming_extractor_stops_once_text_limit_is_reached():
+    page = b"<html><body><article>" + b"<p>Some paragraph text here.</p>" * 5000 + b"</article></body></html>"
+    extractor = stream_extract(page, 4096)
+
+    assert extractor.done
+    assert extractor.bytes_read < len(page) // 5
+    assert extractor.result() == extract_article(page, "https://x.example/")
+
+
+LONG_PAGE = b"<html><body><article>" + b"<p>Some paragraph text here.</p>" * 5000 + b"</article></body></html>"
+
+
+class ChunkedServer:
+    """Fake SharedHttpClient delivering a page in 4 KiB chunks, as the real one
+    does: callbacks run on the calling loop and a True from ``on_chunk`` stops."""
+
+    def __init__(self, page=LONG_PAGE):
+        self.page = page
+        self.delivered = 0
+
+    async def stream(self, method, url, on_chunk, on_response=None, headers=None, timeout=30, max_bytes=None):
+        response = httpx.Response(200, headers={"content-type": "text/html"}, request=httpx.Request(method, url))
+        if on_response:
+            on_response(response)
+        for i in range(0, len(self.page), 4096):
+            self.delivered += 1
+            if on_chunk(self.page[i:i + 4096]):
+                break
+            await asyncio.sleep(0.001)
+        return response
+
+
+def test_streamed_pages_are_parsed_off_the_loop_and_stop_early(monkeypatch):
+    feed_threads = set()
+
+    class RecordingExtractor(StreamingExtractor):
+        def feed(self, chunk):
+            feed_threads.add(threading.get_ident())
+            return super().feed(chunk)
+
+    monkeypatch.setattr(article_fetcher, "StreamingExtractor", RecordingExtractor)
+    server = ChunkedServer()
+    fetcher = ArticleFetcher(http_client=server, cache=None, streaming=True)
+    article = asyncio.run(fetcher.fetch_article("https://x.example/"))
+
+    assert article["content"] == extract_article(LONG_PAGE, "https://x.example/")["content"]
+    assert feed_threads and threading.get_ident() not in feed_threads
+    assert server.delivered < len(LONG_PAGE) // 4096 // 5
+
+
+def test_concurrent_streamed_fetches_share_a_bounded_set_of_threads(monkeypatch):
+    feed_threads = set()
+
+    class RecordingExtractor(StreamingExtractor):
+        def feed(self, chunk):
+            feed_threads.add(threading.get_ident())
+            return super().feed(chunk)
+
+    monkeypatch.setattr(article_fetcher, "StreamingExtractor", RecordingExtractor)
+    lanes = ParseLanes(2)
+    fetcher = ArticleFetcher(http_client=ChunkedServer(), cache=None, streaming=True, lanes=lanes)
+    urls = [f"https://site{i}.example/" for i in range(6)]
+    articles = asyncio.run(fetcher.fetch_multiple_articles(urls, concurrency=6))
+
+    expected = extract_article(LONG_PAGE, urls[0])["content"]
+    assert all(a["success"] and a["content"] == expected for a in articles)
+    assert len(feed_threads) <= 2
+    assert [users for _, users in lanes._lanes] == [0, 0]
+    lanes.shutdown()
+
+
+class InlinePool:
+    """Stands in for a started ExtractionPool; records the bodies it gets."""
+
+    started = True
+
+    def __init__(self):
+        self.bodies = []
+
+    async def extract(self, html, url, encoding=None, streaming=True):
+        self.bodies.append(html)
+        return extract_html(html, url, encoding, streaming)
+
+
+def test_pooled_downloads_stop_once_the_page_has_enough_text():
+    server = ChunkedServer()
+    pool = InlinePool()
+    fetcher = ArticleFetcher(http_client=server, cache=None, streaming=True, extraction_pool=pool)
+    article = asyncio.run(fetcher.fetch_article("https://x.example/"))
+
+    assert article["content"] == extract_article(LONG_PAGE, "https://x.example/")["content"]
+    assert len(pool.bodies[0]) < len(LONG_PAGE) // 5
+
+
+def test_text_counter_follows_the_extractor_bucket():
+    # Once an <article> is seen only its paragraphs count; scripts never do
+    page = (b"<html><body><article><p>Inside.</p></article>" + b"<p>Outside text.</p>" * 2000
+            + b"<script>" + b"<p>x</p>" * 5000 + b"</script></body></html>")
+    counter = TextCounter()
+    assert not any(counter.feed(page[i:i + 100]) for i in range(0, len(page), 100))
+    assert extract_html(page, "u")["content"] == "Inside."
+
+    page = b"<html><body><div>" + b"<p>Unclosed paragraph text<div>not a paragraph</div>" * 2000
+    counter = TextCounter()
+    assert counter.feed(page)
@@ -0,0 +1,174 @@
+"""Tests for the blob store for large node outputs, and run retention."""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.api import nodes, runs
+from app.models.run import NodeExecution, RunPayload, RunStatus, WorkflowRun
+from app.models.workflow import Workflow, WorkflowVersion
+from app.services import blob_store as blob_store_module
+from app.services.blob_store import BLOB_KEY, BlobStore
+from app.services.retention import collect_garbage, purge_runs
+from app.services.workflow_executor import WorkflowExecutor
+from tests.conftest import api_client
+
+ARTICLES = [{"title": f"Article {i}", "text": "lorem ipsum " * 200} for i in range(40)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(root=str(tmp_path / "blobs"))
+
+
+def age(store, digest, seconds):
+    path = store._path(digest)
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_blobs_are_compressed_and_deduplicated(store):
+    data = b"repetitive " * 10_000
+    digest, stored = store.put(data)
+    assert stored < len(data) / 10
+    assert store.put(data) == (digest, stored)
+    assert list(store.digests()) == [digest]
+    assert store.get(digest) == data
+    with pytest.raises(ValueError):
+        store.get("../../etc/passwd")
+
+
+def test_only_large_outputs_leave_the_row(store):
+    small = {"status_code": 200, "body": "ok"}
+    assert store.store_output(small, inline_bytes=1024) == (small, None)
+
+    ref, digest = store.store_output({"articles": ARTICLES, "total_urls": 40}, inline_bytes=1024)
+    assert ref == {BLOB_KEY: digest, "size_bytes": ref["size_bytes"], "summary": ref["summary"]}
+    assert ref["summary"] == {"articles": "array(40 items)", "total_urls": 40}
+    assert store.load_output(ref, digest) == {"articles": ARTICLES, "total_urls": 40}
+    # Only the digest column marks a reference, not the shape of the output
+    lookalike = {BLOB_KEY: "not a digest", "size_bytes": 1, "summary": {}}
+    assert store.load_output(lookalike, None) is lookalike
+
+
+# ── Executor and API ────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def Session(Session):
+    db = Session()
+    db.add(Workflow(id="wf", name="wf"))
+    db.add(WorkflowVersion(id="blobs-v1", workflow_id="wf", version=1, definition={
+        "nodes": [
+            {"id": "t", "type": "trigger", "data": {}},
+            {"id": "flaky", "type": "action", "data": {}},
+            {"id": "o", "type": "output", "data": {}},
+        ],
+        "edges": [{"source": "t", "target": "flaky"}, {"source": "flaky", "target": "o"}],
+    }))
+    db.add(WorkflowRun(id="run", workflow_id="wf", workflow_version_id="blobs-v1",
+                       status=RunStatus.PENDING, trigger_data={"articles": ARTICLES}))
+    db.commit()
+    db.close()
+    return Session
+
+
+class FlakyExecutor(WorkflowExecutor):
+    def __init__(self, db, store, fail):
+        super().__init__(db, http_client=object(), ai_agent=object(), article_fetcher=object(), blob_store=store)
+        self.fail = fail
+        self.seen = None
+
+    async def _dispatch(self, node, node_type, trigger_data, results, resolved=None):
+        if node["id"] == "flaky":
+            self.seen = results.get("t")
+            if self.fail:
+                raise RuntimeError("blip")
+            return {"ok": True}
+        return await super()._dispatch(node, node_type, trigger_data, results, resolved=resolved)
+
+
+def api(Session, monkeypatch, store):
+    monkeypatch.setattr(nodes, "blob_store", store)
+    return api_client(Session, {"/api/runs": runs.router, "/api/nodes": nodes.router})
+
+
+def test_large_outputs_are_fetched_lazily(Session, store, monkeypatch):
+    monkeypatch.setattr(blob_store_module.settings, "NODE_OUTPUT_INLINE_BYTES", 4096)
+    db = Session()
+    asyncio.run(FlakyExecutor(db, store, fail=False).execute_workflow("run"))
+    trigger = db.query(NodeExecution).filter(NodeExecution.node_id == "t").one()
+    assert trigger.output_blob == trigger.output_data[BLOB_KEY]
+    db.close()
+
+    client = api(Session, monkeypatch, store)
+    executions = {ex["node_id"]: ex for ex in client.get("/api/runs/run").json()["node_executions"]}
+    assert executions["t"]["output_data"]["summary"]["articles"] == "array(40 items)"
+    assert executions["o"]["output_data"][BLOB_KEY]
+    assert [executions[n]["output_in_blob"] for n in ("t", "flaky", "o")] == [True, False, True]
+
+    full = client.get("/api/nodes/run/nodes/t").json()
+    assert full["output_data"]["articles"] == ARTICLES
+    listing = client.get("/api/nodes/run/nodes").json()["nodes"]
+    assert [(n["node_id"], n["output_in_blob"]) for n in listing] == [("t", True), ("flaky", False), ("o", True)]
+    assert client.get("/api/nodes/run/nodes/missing").status_code == 404
+
+
+def test_user_data_shaped_like_a_reference_is_plain_output(Session, store, monkeypatch):
+    db = Session()
+    db.get(WorkflowRun, "run").trigger_data = {BLOB_KEY: "../../etc/passwd"}
+    db.commit()
+    asyncio.run(FlakyExecutor(db, store, fail=False).execute_workflow("run"))
+    db.close()
+
+    client = api(Session, monkeypatch, store)
+    response = client.get("/api/nodes/run/nodes/t")
+    assert response.status_code == 200
+    assert response.json()["output_data"][BLOB_KEY] == "../../etc/passwd"
+    assert list(store.digests()) == []
+
+
+def test_resumed_runs_read_outputs_back_from_blobs(Session, store, monkeypatch):
+    monkeypatch.setattr(blob_store_module.settings, "NODE_OUTPUT_INLINE_BYTES", 4096)
+    db = Session()
+    asyncio.run(FlakyExecutor(db, store, fail=True).execute_workflow("run"))
+    resumed = FlakyExecutor(db, store, fail=False)
+    asyncio.run(resumed.execute_workflow("run"))
+    assert resumed.seen["articles"] == ARTICLES
+    assert db.get(WorkflowRun, "run").status == RunStatus.COMPLETED
+    db.close()
+
+
+# ── Retention ───────────────────────────────────────────────────────────────
+
+
+def test_retention_purges_old_runs_then_their_blobs(Session, store, monkeypatch):
+    monkeypatch.setattr(blob_store_module.settings, "NODE_OUTPUT_INLINE_BYTES", 4096)
+    db = Session()
+    asyncio.run(FlakyExecutor(db, store, fail=False).execute_workflow("run"))
+    referenced = set(store.digests())
+    orphan, _ = store.put(b"left behind by a crashed worker")
+    fresh, _ = store.put(b"written, row not flushed yet")
+    for digest in referenced | {orphan}:
+        age(store, digest, 7200)
+
+    # Referenced blobs and fresh blobs survive
+    assert collect_garbage(db, store, grace=3600) == 1
+    assert set(store.digests()) == referenced | {fresh}
+
+    # Recent runs are kept; old ones go with their rows, then their blobs
+    assert purge_runs(db, older_than_days=30) == 0
+    db.get(WorkflowRun, "run").completed_at = datetime.utcnow() - timedelta(days=31)
+    db.commit()
+    assert purge_runs(db, older_than_days=30) == 1
+    assert db.query(NodeExecution).count() == 0
+    assert db.query(RunPayload).count() == 0
+    assert collect_garbage(db, store, grace=3600) == len(referenced)
+    assert set(store.digests()) == {fresh}
+    db.close()
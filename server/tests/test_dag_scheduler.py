@@ -0,0 +1,138 @@
+"""Tests for the concurrent ready-queue scheduler (_run_dag)."""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.execution_plan import compile_plan, topological_order
+from app.services.workflow_executor import WorkflowExecutor, _resolved_data, _run_dag
+
+
+def schedule(nodes, edges, delays=None, matched="true", max_concurrency=8):
+    """Run the scheduler with fake nodes; returns (results, skipped, order, peak)."""
+    delays = delays or {}
+    plan = compile_plan({"nodes": nodes, "edges": edges})
+    results, skipped, order = {}, set(), []
+    in_flight = {"now": 0, "peak": 0}
+
+    async def execute(pn):
+        node = pn.node
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(delays.get(node["id"], 0))
+        in_flight["now"] -= 1
+        order.append(node["id"])
+        if node["type"] == "condition":
+            return {"matched_path": matched}
+        return {"done": True}
+
+    asyncio.run(_run_dag(
+        plan, execute, lambda pn: None,
+        results, skipped, max_concurrency,
+    ))
+    return results, skipped, order, in_flight["peak"]
+
+
+def fan_out():
+    nodes = [{"id": i, "type": "action"} for i in ("trigger", "http", "ai", "join")]
+    edges = [
+        {"source": "trigger", "target": "http"},
+        {"source": "trigger", "target": "ai"},
+        {"source": "http", "target": "join"},
+        {"source": "ai", "target": "join"},
+    ]
+    return nodes, edges
+
+
+def test_independent_branches_run_concurrently():
+    nodes, edges = fan_out()
+    start = time.monotonic()
+    results, _, order, peak = schedule(nodes, edges, delays={"http": 0.2, "ai": 0.2})
+    elapsed = time.monotonic() - start
+
+    assert peak == 2
+    assert elapsed < 0.35, "branches should overlap, not run back to back"
+    assert order[0] == "trigger" and order[-1] == "join"
+    assert set(results) == {"trigger", "http", "ai", "join"}
+
+
+def test_concurrency_cap_of_one_is_sequential_topological_order():
+    nodes, edges = fan_out()
+    _, _, order, peak = schedule(nodes, edges, delays={"http": 0.05}, max_concurrency=1)
+
+    assert peak == 1
+    assert order == [n["id"] for n in topological_order(nodes, edges)]
+
+
+def test_condition_skips_non_matching_branch_and_keeps_join():
+    nodes = [
+        {"id": "trigger", "type": "trigger"},
+        {"id": "condition", "type": "condition"},
+        {"id": "true_node", "type": "action"},
+        {"id": "false_node", "type": "action"},
+        {"id": "false_child", "type": "action"},
+        {"id": "join_node", "type": "action"},
+    ]
+    edges = [
+        {"source": "trigger", "target": "condition", "sourceHandle": "output"},
+        {"source": "condition", "target": "true_node", "sourceHandle": "true"},
+        {"source": "condition", "target": "false_node", "sourceHandle": "false"},
+        {"source": "false_node", "target": "false_child"},
+        {"source": "true_node", "target": "join_node"},
+        {"source": "false_node", "target": "join_node"},
+    ]
+    results, skipped, _, _ = schedule(nodes, edges, matched="true")
+
+    assert skipped == {"false_node", "false_child"}
+    assert "true_node" in results and "join_node" in results
+    assert "false_node" not in results and "false_child" not in results
+
+
+def test_cycle_does_not_deadlock():
+    nodes = [{"id": i, "type": "action"} for i in ("a", "b", "c")]
+    edges = [
+        {"source": "a", "target": "b"},
+        {"source": "b", "target": "c"},
+        {"source": "c", "target": "b"},
+    ]
+    results, _, order, _ = schedule(nodes, edges)
+
+    assert order[0] == "a"
+    assert set(results) == {"a", "b", "c"}
+
+
+def test_merged_upstream_data_follows_topological_order_not_completion():
+    # "a" and "b" both write "action"; "a" finishes last and "s" is a sibling
+    nodes = [
+        {"id": "t", "type": "trigger", "data": {}},
+        {"id": "a", "type": "action", "data": {"label": "A"}},
+        {"id": "b", "type": "action", "data": {"label": "B"}},
+        {"id": "s", "type": "transform", "data": {"template": '{"sibling": true}'}},
+        {"id": "m", "type": "transform", "data": {}},
+        {"id": "j", "type": "action", "data": {}},
+    ]
+    edges = [
+        {"source": "t", "target": "a"}, {"source": "t", "target": "b"}, {"source": "t", "target": "s"},
+        {"source": "a", "target": "m"}, {"source": "b", "target": "m"}, {"source": "m", "target": "j"},
+    ]
+    plan = compile_plan({"nodes": nodes, "edges": edges})
+    executor = WorkflowExecutor(None, http_client=object(), ai_agent=object(), article_fetcher=object())
+    executor._plan = plan
+    trigger, results = {"user": "ada"}, {}
+    delays = {"a": 0.1}
+
+    async def execute(pn):
+        await asyncio.sleep(delays.get(pn.id, 0))
+        data = pn.node.get("data", {})
+        resolved = _resolved_data(pn.type, data, trigger, results, pn.template)
+        return await executor._dispatch(pn.node, pn.type, trigger, results, resolved=resolved)
+
+    asyncio.run(_run_dag(plan, execute, lambda pn: None, results, set(), 8))
+
+    merged = results["m"]["output"]
+    assert merged["action"] == "B"
+    assert "sibling" not in merged and "output" not in merged
+    assert results["j"]["previous_nodes"] == ["t", "a", "b", "m"]
@@ -0,0 +1,123 @@
+"""Tests for compiled execution plans and the plan LRU."""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.execution_plan import PlanCache, compile_plan
+from app.services.workflow_executor import WorkflowExecutor
+
+
+DEFINITION = {
+    "nodes": [
+        {"id": "email", "type": "email", "data": {"to": "{{trigger.email}}"}},
+        {"id": "trigger", "type": "trigger", "data": {"label": "Input"}},
+        {"id": "cond", "type": "condition", "data": {"field": "trigger.x"}},
+    ],
+    "edges": [
+        {"source": "trigger", "target": "cond"},
+        {"source": "cond", "target": "email", "sourceHandle": "true"},
+        {"source": "ghost", "target": "email"},
+    ],
+    "settings": {"max_concurrency": 2},
+}
+
+
+def version(vid, workflow_id="wf-1", definition=DEFINITION):
+    return SimpleNamespace(id=vid, workflow_id=workflow_id, definition=definition)
+
+
+def test_compile_orders_and_indexes_nodes():
+    plan = compile_plan(DEFINITION)
+
+    assert [pn.id for pn in plan.nodes] == ["trigger", "cond", "email"]
+    trigger, cond, email = plan.nodes
+    assert trigger.children == ((1, "output"),)
+    assert cond.children == ((2, "true"),)
+    assert email.parent_mask == 1 << cond.index
+    assert email.in_degree == 1
+    assert email.has_unknown_parent
+    assert email.template.render({"email": "a@b.c"}, {}) == {"to": "a@b.c"}
+    assert trigger.template.render({}, {}) is trigger.node["data"]
+    assert plan.settings["max_concurrency"] == 2
+
+
+def test_plan_is_isolated_from_definition_mutation():
+    definition = {"nodes": [{"id": "a", "type": "action", "data": {"label": "x"}}], "edges": []}
+    plan = compile_plan(definition)
+    definition["nodes"][0]["data"]["label"] = "{{trigger.y}}"
+
+    assert plan.nodes[0].node["data"]["label"] == "x"
+    assert plan.nodes[0].template.render({"y": 1}, {}) == {"label": "x"}
+
+
+def test_cache_hits_evicts_and_invalidates():
+    cache = PlanCache(maxsize=2)
+    first = cache.get(version("v1"))
+
+    assert cache.get(version("v1")) is first
+    cache.get(version("v2"))
+    cache.get(version("v3", workflow_id="wf-2"))
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 3}
+
+    cache.invalidate_workflow("wf-1")
+    assert cache.stats()["size"] == 1
+    assert cache.get(version("v1")) is not first
+
+
+BRANCHES = {
+    "nodes": [
+        {"id": "t", "type": "trigger", "data": {}},
+        {"id": "fetch", "type": "fetchArticles", "data": {}},
+        {"id": "side", "type": "fetchArticles", "data": {}},
+        {"id": "sum", "type": "aiAgent", "data": {"agentType": "summarize_multiple"}},
+        {"id": "ai", "type": "aiAgent", "data": {"agentType": "analyze_finance"}},
+    ],
+    "edges": [
+        {"source": "t", "target": "fetch"},
+        {"source": "t", "target": "side"},
+        {"source": "fetch", "target": "sum"},
+        {"source": "sum", "target": "ai"},
+    ],
+}
+
+
+def test_ancestors_are_transitive_and_in_topological_order():
+    plan = compile_plan(BRANCHES)
+    assert [pn.id for pn in plan.ancestors("ai")] == ["t", "fetch", "sum"]
+    assert plan.ancestors("t") == ()
+    assert plan.ancestors("missing") == ()
+
+
+class RecordingAgent:
+    def __init__(self):
+        self.inputs = []
+
+    async def process_multiple_articles(self, articles, pack_tokens=None):
+        self.inputs.append(articles)
+        return {"individual_summaries": articles}
+
+    async def analyze_finance(self, data):
+        self.inputs.append(data)
+        return {}
+
+
+def test_ai_agent_inputs_come_from_ancestors_whatever_the_completion_order():
+    agent = RecordingAgent()
+    executor = WorkflowExecutor(None, http_client=object(), ai_agent=agent, article_fetcher=object())
+    executor._plan = compile_plan(BRANCHES)
+    # "side" finished last here but is not upstream of either agent
+    results = {
+        "t": {}, "fetch": {"articles": ["mine"]}, "sum": {"individual_summaries": ["mine"]},
+        "side": {"articles": ["other"], "individual_summaries": ["other"]},
+    }
+
+    async def run():
+        await executor._run_ai_agent({}, {}, executor._upstream("sum", results))
+        await executor._run_ai_agent({"agentType": "analyze_finance"}, {}, executor._upstream("ai", results))
+
+    asyncio.run(run())
+    assert agent.inputs == [["mine"], {"individual_summaries": ["mine"]}]
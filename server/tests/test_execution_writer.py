@@ -0,0 +1,108 @@
+"""Tests for write-behind NodeExecution persistence."""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.models.run import NodeExecution, NodeStatus
+from app.services.execution_writer import NodeExecutionWriter
+
+
+@pytest.fixture
+def db(engine, db):
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute",
+        lambda conn, cursor, stmt, *args: statements.append(stmt.split()[0]),
+    )
+    db.statements = statements
+    return db
+
+
+NODE_A = {"id": "a", "type": "action"}
+NODE_B = {"id": "b", "type": "http"}
+
+
+def test_transitions_are_buffered_and_coalesced(db):
+    writer = NodeExecutionWriter(db, strict=False, max_pending=100, flush_interval=60)
+    ex_a = writer.started("run-1", NODE_A, {"x": 1})
+    writer.finished(ex_a, NodeStatus.SUCCESS, output_data={"ok": True})
+    writer.skipped("run-1", NODE_B)
+
+    assert db.query(NodeExecution).count() == 0
+    writer.flush()
+
+    rows = {r.node_id: r for r in db.query(NodeExecution).all()}
+    assert rows["a"].status == NodeStatus.SUCCESS
+    assert rows["a"].output_data == {"ok": True}
+    assert rows["a"].input_data == {"x": 1}
+    assert rows["b"].status == NodeStatus.SKIPPED
+    assert db.statements.count("INSERT") == 1
+    assert "UPDATE" not in db.statements
+
+
+def test_finish_after_flush_becomes_bulk_update(db):
+    writer = NodeExecutionWriter(db, strict=False, max_pending=2, flush_interval=60)
+    ex_a = writer.started("run-1", NODE_A, {})
+    ex_b = writer.started("run-1", NODE_B, {})  # size threshold -> flush
+    assert db.query(NodeExecution).filter_by(status=NodeStatus.RUNNING).count() == 2
+
+    writer.finished(ex_a, NodeStatus.SUCCESS, output_data={"a": 1})
+    writer.finished(ex_b, NodeStatus.FAILED, error_message="boom")
+
+    rows = {r.node_id: r for r in db.query(NodeExecution).all()}
+    assert rows["a"].status == NodeStatus.SUCCESS and rows["a"].completed_at
+    assert rows["b"].status == NodeStatus.FAILED and rows["b"].error_message == "boom"
+
+
+def test_strict_mode_commits_every_transition(db):
+    writer = NodeExecutionWriter(db, strict=True)
+    ex_a = writer.started("run-1", NODE_A, {})
+    assert db.query(NodeExecution).filter_by(id=ex_a, status=NodeStatus.RUNNING).count() == 1
+
+    writer.finished(ex_a, NodeStatus.SUCCESS, output_data={})
+    assert db.query(NodeExecution).filter_by(id=ex_a, status=NodeStatus.SUCCESS).count() == 1
+    assert writer.flushes == 2
+
+
+def test_flushes_on_an_event_loop_run_off_the_loop(engine, db):
+    threads = set()
+    event.listen(engine, "before_cursor_execute", lambda *args: threads.add(threading.get_ident()))
+
+    async def run():
+        writer = NodeExecutionWriter(db, strict=False, max_pending=2, flush_interval=60)
+        ex_a = writer.started("run-1", NODE_A, {})
+        writer.started("run-1", NODE_B, {})  # size threshold -> background flush
+        await asyncio.sleep(0)  # the flush has taken the batch; the rest waits for it
+        writer.finished(ex_a, NodeStatus.SUCCESS, output_data={"a": 1})
+        await writer.flush_async()
+        return writer.flushes
+
+    assert asyncio.run(run()) == 2
+    assert threading.get_ident() not in threads
+    rows = {r.node_id: r.status for r in db.query(NodeExecution).all()}
+    assert rows == {"a": NodeStatus.SUCCESS, "b": NodeStatus.RUNNING}
+
+
+def test_strict_mode_on_an_event_loop_writes_each_transition_off_the_loop(engine, db):
+    threads = set()
+    event.listen(engine, "before_cursor_execute", lambda *args: threads.add(threading.get_ident()))
+
+    async def run():
+        writer = NodeExecutionWriter(db, strict=True)
+        ex_a = writer.started("run-1", NODE_A, {})
+        writer.finished(ex_a, NodeStatus.SUCCESS, output_data={})
+        writer.skipped("run-1", NODE_B)
+        await writer.flush_async()
+        return writer.flushes
+
+    assert asyncio.run(run()) == 3
+    assert threading.get_ident() not in threads
+    rows = {r.node_id: r.status for r in db.query(NodeExecution).all()}
+    assert rows == {"a": NodeStatus.SUCCESS, "b": NodeStatus.SKIPPED}
@@ -0,0 +1,43 @@
+"""Tests for HTML extraction against the checked-in benchmark corpus."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.extraction import extract_article, extract_html
+
+CORPUS = Path(__file__).parent.parent / "benchmarks" / "corpus"
+EXPECTED = json.loads((CORPUS / "expected.json").read_text())
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+@pytest.mark.parametrize("streaming", [False, True])
+def test_corpus_page(name, streaming):
+    got = extract_html((CORPUS / name).read_bytes(), name, streaming=streaming)
+    assert got == {"title": EXPECTED[name]["title"], "content": EXPECTED[name]["text"]}
+
+
+def test_nested_containers_are_not_counted_twice():
+    page = b"<main><article><p>Once.</p></article></main><p>Elsewhere.</p>"
+    assert extract_article(page, "u")["content"] == "Once."
+
+
+def test_header_encoding_is_used_without_meta_charset():
+    page = "<title>Café</title><p>crème</p>".encode("latin-1")
+    assert extract_article(page, "u", encoding="iso-8859-1") == {"title": "Café", "content": "crème"}
+
+
+def test_empty_and_textless_pages_fall_back_to_url():
+    assert extract_article(b"", "https://x.example/") == {"title": "https://x.example/", "content": ""}
+    assert extract_article(b"<div></div>", "https://x.example/")["title"] == "https://x.example/"
+
+
+def test_content_is_truncated():
+    page = b"<article>" + b"<p>" + b"word " * 3000 + b"</p></article>"
+    content = extract_article(page, "u")["content"]
+    assert len(content) == 5003 and content.endswith("...")
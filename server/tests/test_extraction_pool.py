@@ -0,0 +1,56 @@
+"""Tests for process-pool HTML extraction."""
+
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.article_fetcher import ArticleFetcher
+from app.services.extraction import extract_article, extract_html
+from app.services.extraction_pool import ExtractionPool
+
+PAGE = (
+    "<html><head><title>Pooled</title></head><body><article>"
+    + "<p>Paragraph with some text.</p>" * 400
+    + "</article></body></html>"
+).encode()
+
+
+class FakeHttpClient:
+    async def stream(self, method, url, on_chunk, on_response=None, headers=None, timeout=30, max_bytes=None):
+        on_chunk(PAGE[:max_bytes])
+        return httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-8"},
+                              request=httpx.Request(method, url))
+
+
+def test_extract_html_matches_full_parse():
+    assert extract_html(PAGE, "u") == extract_article(PAGE, "u")
+    assert extract_html(PAGE, "u", streaming=False) == extract_article(PAGE, "u")
+
+
+def test_pool_extracts_in_workers_and_shuts_down():
+    pool = ExtractionPool(workers=1, queue_size=2)
+    pool.start()
+    try:
+        assert pool.started
+        fetcher = ArticleFetcher(http_client=FakeHttpClient(), cache=None, extraction_pool=pool)
+
+        async def run():
+            return await fetcher.fetch_multiple_articles([f"https://a.example/{i}" for i in range(5)])
+
+        articles = asyncio.run(run())
+        expected = extract_article(PAGE, "u")
+        assert all(a["success"] and a["content"] == expected["content"] for a in articles)
+    finally:
+        pool.shutdown()
+    assert not pool.started
+
+
+def test_unstarted_pool_extracts_in_a_thread():
+    pool = ExtractionPool(workers=0)
+    pool.start()
+    assert not pool.started
+    assert asyncio.run(pool.extract(PAGE, "u"))["title"] == "Pooled"
@@ -0,0 +1,120 @@
+"""Tests for the on-disk article cache and conditional revalidation."""
+
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services import http_cache
+from app.services.article_fetcher import ArticleFetcher
+from app.services.http_cache import ArticleCache, freshness_lifetime
+
+URL = "https://news.example/story"
+PAGE = b"<html><head><title>Story</title></head><body><p>Fresh text.</p></body></html>"
+
+
+class RevalidatingServer:
+    """Fake SharedHttpClient that honours If-None-Match."""
+
+    def __init__(self, cache_control="max-age=0", etag='"v1"'):
+        self.cache_control = cache_control
+        self.etag = etag
+        self.requests = []
+
+    async def request(self, method, url, headers=None, json=None, timeout=30):
+        self.requests.append(dict(headers or {}))
+        response_headers = {"Cache-Control": self.cache_control}
+        if self.etag:
+            response_headers["ETag"] = self.etag
+        if self.etag and (headers or {}).get("If-None-Match") == self.etag:
+            return httpx.Response(304, headers=response_headers, request=httpx.Request(method, url))
+        return httpx.Response(200, content=PAGE, headers=response_headers, request=httpx.Request(method, url))
+
+    async def stream(self, method, url, on_chunk, on_response=None, headers=None, timeout=30, max_bytes=None):
+        response = await self.request(method, url, headers=headers, timeout=timeout)
+        if response.is_success:
+            if on_response:
+                on_response(response)
+            on_chunk(response.content[:max_bytes])
+        return response
+
+
+def fetch(fetcher, **kwargs):
+    return asyncio.run(fetcher.fetch_article(URL, **kwargs))
+
+
+def test_freshness_lifetime():
+    assert freshness_lifetime({"cache-control": "public, max-age=60"}) == 60
+    assert freshness_lifetime({"cache-control": "no-cache"}) == 0
+    assert freshness_lifetime({"cache-control": "no-store"}) is None
+    assert freshness_lifetime({"cache-control": "private, max-age=60"}) is None
+
+
+def test_stale_entry_is_revalidated_with_etag(tmp_path):
+    cache = ArticleCache(str(tmp_path), max_bytes=1 << 20)
+    server = RevalidatingServer()
+    fetcher = ArticleFetcher(http_client=server, cache=cache)
+
+    first = fetch(fetcher)
+    second = fetch(fetcher)
+
+    assert first == second
+    assert second["content"] == "Fresh text."
+    assert "If-None-Match" not in server.requests[0]
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+    assert (cache.misses, cache.revalidated, cache.hits) == (1, 1, 0)
+
+
+def test_fresh_entry_skips_the_request(tmp_path):
+    cache = ArticleCache(str(tmp_path), max_bytes=1 << 20)
+    server = RevalidatingServer(cache_control="max-age=300")
+    fetcher = ArticleFetcher(http_client=server, cache=cache)
+
+    fetch(fetcher)
+    assert fetch(fetcher)["title"] == "Story"
+    assert len(server.requests) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_no_store_and_bypass_are_not_cached(tmp_path):
+    cache = ArticleCache(str(tmp_path), max_bytes=1 << 20)
+    server = RevalidatingServer(cache_control="no-store")
+    fetcher = ArticleFetcher(http_client=server, cache=cache)
+    fetch(fetcher)
+    assert cache.get(URL) is None
+
+    server = RevalidatingServer(cache_control="max-age=300")
+    fetcher = ArticleFetcher(http_client=server, cache=cache)
+    fetch(fetcher, use_cache=False)
+    fetch(fetcher, use_cache=False)
+    assert len(server.requests) == 2
+    assert cache.get(URL) is None
+
+
+def test_eviction_keeps_directory_under_cap(tmp_path):
+    cache = ArticleCache(str(tmp_path), max_bytes=2000)
+    headers = {"cache-control": "max-age=300"}
+    for i in range(20):
+        cache.put(f"https://a.example/{i}", "t", "x" * 200, headers)
+
+    total = sum(p.stat().st_size for p in tmp_path.glob("*/*.json"))
+    assert total <= 2000
+    assert cache.evictions > 0
+    assert cache.get("https://a.example/19") is not None
+    assert cache.get("https://a.example/0") is None
+
+
+def test_entries_from_another_extractor_are_misses(tmp_path, monkeypatch):
+    cache = ArticleCache(str(tmp_path), max_bytes=1 << 20)
+    cache.put(URL, "Story", "Old extraction.", {"cache-control": "max-age=300"})
+    assert cache.get(URL)["content"] == "Old extraction."
+
+    monkeypatch.setattr(http_cache, "EXTRACTOR_VERSION", http_cache.EXTRACTOR_VERSION + 1)
+    assert cache.get(URL) is None
+    server = RevalidatingServer(cache_control="max-age=300")
+    result = fetch(ArticleFetcher(http_client=server, cache=cache))
+    assert result["content"] == "Fresh text."
+    assert cache.get(URL)["content"] == "Fresh text."
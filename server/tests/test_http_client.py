@@ -0,0 +1,163 @@
+"""Tests for the shared pooled HTTP client."""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services import http_client as http_client_module
+from app.services.http_client import SharedHttpClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        payload = json.dumps({"echo": json.loads(body)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "http://169.254.169.254/latest/meta-data/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/host":
+            payload = self.headers["Host"].encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        # A large streamed body; clients are expected to stop reading early
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(1024 * 1024))
+        self.end_headers()
+        try:
+            for _ in range(256):
+                self.wfile.write(b"x" * 4096)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+_real_resolve = http_client_module.resolve_public_host_async
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # The local test server lives on loopback, which SSRF validation rejects;
+    # allow it (and the made-up name app.test) but keep checking everything else
+    async def resolve(hostname):
+        if hostname in ("127.0.0.1", "app.test"):
+            return ("127.0.0.1",)
+        if hostname == "dual.test":
+            # Nothing listens on 127.0.0.2: the first address refuses
+            return ("127.0.0.2", "127.0.0.1")
+        return await _real_resolve(hostname)
+
+    async def validate(url):
+        return await resolve(urlparse(url).hostname)
+
+    monkeypatch.setattr(http_client_module, "resolve_public_host_async", resolve)
+    monkeypatch.setattr(http_client_module, "validate_url_for_ssrf_async", validate)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_requests_from_another_loop_are_bridged_to_the_owner_loop(server):
+    client = SharedHttpClient(max_connections_per_host=2)
+    owner_loop = asyncio.new_event_loop()
+    threading.Thread(target=owner_loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(client.start(), owner_loop).result()
+
+    async def run_elsewhere():
+        responses = await asyncio.gather(*(
+            client.request("POST", f"{server}/hook", json={"n": i}) for i in range(5)
+        ))
+        return [r.json()["echo"]["n"] for r in responses]
+
+    try:
+        assert asyncio.run(run_elsewhere()) == [0, 1, 2, 3, 4]
+        # Idle hosts do not keep a semaphore
+        assert client._host_slots == {}
+    finally:
+        asyncio.run_coroutine_threadsafe(client.aclose(), owner_loop).result()
+        owner_loop.call_soon_threadsafe(owner_loop.stop)
+
+
+def test_unstarted_client_still_works(server):
+    response = asyncio.run(SharedHttpClient().request("POST", f"{server}/x", json={"a": 1}))
+    assert response.status_code == 200
+    assert response.json() == {"echo": {"a": 1}}
+
+
+def test_ssrf_validation_is_enforced():
+    with pytest.raises(ValueError):
+        asyncio.run(SharedHttpClient().request("GET", "http://169.254.169.254/latest/meta-data/"))
+
+
+def test_stream_stops_at_max_bytes(server):
+    chunks = []
+    response = asyncio.run(SharedHttpClient().stream(
+        "GET", f"{server}/big", lambda chunk: chunks.append(chunk) and False, max_bytes=10000,
+    ))
+    assert response.status_code == 200
+    assert sum(len(c) for c in chunks) == 10000
+
+
+def test_stream_stops_when_consumer_is_done(server):
+    seen = []
+
+    def on_chunk(chunk):
+        seen.append(len(chunk))
+        return True
+
+    asyncio.run(SharedHttpClient().stream("GET", f"{server}/big", on_chunk))
+    assert len(seen) == 1
+
+
+def test_connections_use_the_validated_address(server):
+    # app.test does not exist in DNS; the request only works if the client
+    # connects to the address returned by validation
+    port = urlparse(server).port
+    response = asyncio.run(SharedHttpClient().request("GET", f"http://app.test:{port}/host"))
+    assert response.text == f"app.test:{port}"
+
+
+def test_redirects_to_internal_addresses_are_blocked(server):
+    with pytest.raises(ValueError, match="not permitted"):
+        asyncio.run(SharedHttpClient().request("GET", f"{server}/redirect"))
+
+
+def test_connections_fall_back_to_the_next_validated_address(server):
+    port = urlparse(server).port
+    response = asyncio.run(SharedHttpClient().request("GET", f"http://dual.test:{port}/host"))
+    assert response.text == f"dual.test:{port}"
+
+
+def test_transport_errors_surface_as_httpx_errors(server, monkeypatch):
+    async def refused(hostname):
+        return ("127.0.0.2",)
+
+    monkeypatch.setattr(http_client_module, "resolve_public_host_async", refused)
+    port = urlparse(server).port
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(SharedHttpClient().request("GET", f"http://app.test:{port}/host"))
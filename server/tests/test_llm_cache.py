@@ -0,0 +1,130 @@
+"""Tests for the content-addressed LLM response cache."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.llm_cache import LLMCache, cache_key
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class Upstream:
+    def __init__(self, delay=0.05):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self, text="answer"):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return text
+
+
+def make_cache(tmp_path):
+    return LLMCache(path=str(tmp_path / "llm.sqlite3"), ttl=60)
+
+
+def test_key_depends_on_model_and_prompt():
+    assert cache_key("m", "p") == cache_key("m", "p")
+    assert cache_key("m", "p") != cache_key("m2", "p")
+    assert cache_key("m", "p") != cache_key("m", "p2")
+
+
+def test_second_call_is_served_from_sqlite(tmp_path):
+    cache = make_cache(tmp_path)
+    upstream = Upstream()
+
+    async def run():
+        first = await cache.get_or_generate("m", "prompt", upstream)
+        second = await cache.get_or_generate("m", "prompt", upstream)
+        return first, second
+
+    assert asyncio.run(run()) == ("answer", "answer")
+    assert upstream.calls == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["hits_local"]) == (1, 1)
+    assert stats["saved_latency_seconds"] > 0
+
+
+def test_concurrent_identical_prompts_are_coalesced(tmp_path):
+    cache = make_cache(tmp_path)
+    upstream = Upstream(delay=0.1)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_generate("m", "same", upstream) for _ in range(10)))
+
+    assert asyncio.run(run()) == ["answer"] * 10
+    assert upstream.calls == 1
+    assert cache.stats()["coalesced"] == 9
+
+
+def test_failures_are_not_cached_and_reach_every_waiter(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise TimeoutError("slow model")
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_generate("m", "p", failing) for _ in range(3)), return_exceptions=True
+        )
+
+    assert all(isinstance(r, TimeoutError) for r in asyncio.run(run()))
+    assert len(calls) == 1
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_redis_tier_is_shared_between_processes(tmp_path):
+    redis = FakeRedis()
+    upstream = Upstream()
+    one = LLMCache(path=str(tmp_path / "a.sqlite3"), ttl=60, redis_client=redis)
+    two = LLMCache(path=str(tmp_path / "b.sqlite3"), ttl=60, redis_client=redis)
+
+    asyncio.run(one.get_or_generate("m", "p", upstream))
+    assert asyncio.run(two.get_or_generate("m", "p", upstream)) == "answer"
+    assert upstream.calls == 1
+    assert two.stats()["hits_redis"] == 1
+
+
+def test_unreadable_redis_entries_are_misses(tmp_path):
+    redis = FakeRedis()
+    redis.data[f"llm:{cache_key('m', 'p')}"] = b"not json"
+    redis.data[f"llm:{cache_key('m', 'q')}"] = '{"text": "old format"}'
+    upstream = Upstream()
+    cache = LLMCache(path=str(tmp_path / "llm.sqlite3"), ttl=60, redis_client=redis)
+
+    assert asyncio.run(cache.get_or_generate("m", "p", upstream)) == "answer"
+    assert asyncio.run(cache.get_or_generate("m", "q", upstream)) == "answer"
+    assert upstream.calls == 2
+    assert cache.stats()["errors"] == 2
+    # Replaced by the regenerated responses
+    assert all("response" in value for value in redis.data.values())
+
+
+def test_lru_eviction_caps_entries(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "llm.sqlite3"), ttl=60, max_entries=50)
+    # Eviction runs every 100 writes
+    for i in range(200):
+        cache._store_local(cache_key("m", str(i)), str(i), 0.1)
+    (count,) = cache._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+    assert count == 50
+    assert cache._lookup(cache_key("m", "199")) == ("199", 0.1)
+    assert cache._lookup(cache_key("m", "0")) is None
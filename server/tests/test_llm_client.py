@@ -0,0 +1,215 @@
+"""Tests for the shared, non-blocking Gemini client."""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.ai_agent import AIAgent, _pack
+from app.services.llm_client import GeminiClient
+from app.services.retry import RetryPolicy
+from app.services.workflow_executor import _pack_tokens
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Blocking stand-in for GenerativeModel; records peak concurrency."""
+
+    def __init__(self, delay=0.1, text='{"summary": "s", "key_points": ["k"], "confidence": 0.9}'):
+        self.delay = delay
+        self.text = text
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, request_options=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return FakeResponse(self.text)
+
+
+def test_generation_does_not_block_the_event_loop():
+    client = GeminiClient(model=FakeModel(delay=0.2), max_concurrency=2)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await client.generate("hello")
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 10
+
+
+def test_pool_bounds_concurrent_calls():
+    model = FakeModel(delay=0.05)
+    client = GeminiClient(model=model, max_concurrency=3)
+
+    async def run():
+        await asyncio.gather(*(client.generate(str(i)) for i in range(12)))
+
+    asyncio.run(run())
+    assert model.peak == 3
+
+
+def test_timeout_raises():
+    client = GeminiClient(model=FakeModel(delay=0.5), max_concurrency=1)
+    with pytest.raises(TimeoutError, match="timed out"):
+        asyncio.run(client.generate("slow", timeout=0.05))
+
+
+def test_time_queued_for_a_pool_thread_does_not_count_toward_the_timeout():
+    client = GeminiClient(model=FakeModel(delay=0.1), max_concurrency=1, retry_policy=RetryPolicy(attempts=1))
+
+    async def run():
+        # The last call waits ~0.3s for the single thread, well over its timeout
+        return await asyncio.gather(*(client.generate(str(i), timeout=0.2) for i in range(4)))
+
+    assert len(asyncio.run(run())) == 4
+
+
+def test_agent_uses_the_shared_client_and_reports_timeouts():
+    fast = AIAgent(client=GeminiClient(model=FakeModel(delay=0.01), max_concurrency=2), cache=None)
+    result = asyncio.run(fast.summarize_article("text"))
+    assert result == {"success": True, "data": {"summary": "s", "key_points": ["k"], "confidence": 0.9}}
+
+    slow = AIAgent(client=GeminiClient(model=FakeModel(delay=0.5), max_concurrency=1, timeout=0.05), cache=None)
+    result = asyncio.run(slow.generic_task("do it", "ctx"))
+    assert result["success"] is False
+    assert "timed out" in result["error"]
+
+
+class ScriptedAgent(AIAgent):
+    """AIAgent whose per-article summaries take scripted times or fail."""
+
+    def __init__(self, delays, failures=()):
+        super().__init__(client=GeminiClient(model=FakeModel(delay=0, text='{"overview": "o"}')), cache=None)
+        self.delays = delays
+        self.failures = set(failures)
+        self.active = 0
+        self.peak = 0
+
+    async def summarize_article(self, article_text):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delays[article_text])
+        finally:
+            self.active -= 1
+        if article_text in self.failures:
+            return {"success": False, "error": "boom", "data": {"summary": "Error: boom", "key_points": []}}
+        return {"success": True, "data": {"summary": f"sum {article_text}", "key_points": [article_text]}}
+
+
+def articles(n):
+    return [{"title": f"T{i}", "content": str(i)} for i in range(n)]
+
+
+def test_summaries_fan_out_under_the_concurrency_limit():
+    agent = ScriptedAgent({str(i): 0.05 for i in range(8)}, failures={"3"})
+    start = time.perf_counter()
+    result = asyncio.run(agent.process_multiple_articles(articles(8), concurrency=4))
+    elapsed = time.perf_counter() - start
+
+    assert agent.peak == 4
+    assert elapsed < 0.3
+    assert [s["article_title"] for s in result["individual_summaries"]] == [f"T{i}" for i in range(8)]
+    assert result["individual_summaries"][3]["summary"] == "Error: boom"
+    assert result["combined_summary"] == {"overview": "o"}
+
+
+def test_quorum_and_deadline_cut_off_stragglers():
+    delays = {"0": 0.01, "1": 0.01, "2": 0.01, "3": 5}
+    start = time.perf_counter()
+    result = asyncio.run(ScriptedAgent(delays).process_multiple_articles(articles(4), concurrency=4, quorum=0.75))
+    assert time.perf_counter() - start < 1
+    assert result["individual_summaries"][3]["summary"].startswith("Summary unavailable")
+    assert result["individual_summaries"][3]["key_points"] == []
+
+    start = time.perf_counter()
+    result = asyncio.run(ScriptedAgent(delays).process_multiple_articles(articles(4), concurrency=4, deadline=0.2))
+    assert time.perf_counter() - start < 1
+    assert [s["summary"] for s in result["individual_summaries"][:3]] == ["sum 0", "sum 1", "sum 2"]
+
+
+class PackingModel:
+    """Answers packed prompts with a JSON array covering the articles it was sent."""
+
+    def __init__(self, drop=()):
+        self.drop = set(drop)
+        self.calls = 0
+
+    def generate_content(self, prompt, request_options=None):
+        self.calls += 1
+        if prompt.startswith("Based on these article summaries"):
+            return FakeResponse('{"overview": "o"}')
+        ids = [int(i) for i in re.findall(r"^### Article (\d+)$", prompt, re.MULTILINE)]
+        if not ids:
+            return FakeResponse('{"summary": "single", "key_points": []}')
+        body = re.split(r"^### Article \d+$", prompt, flags=re.MULTILINE)[1:]
+        items = [
+            {"id": i, "summary": f"packed {text.split()[0]}", "key_points": []}
+            for i, text in zip(ids, body)
+            if text.split()[0] not in self.drop
+        ]
+        return FakeResponse("```json\n" + json.dumps(items) + "\n```")
+
+
+def test_pack_respects_the_token_budget():
+    short = [{"content": "x" * 400}] * 10  # 100 + 150 tokens each
+    assert _pack(short, 1000) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+    assert _pack(short, 0) == [[i] for i in range(10)]
+    assert _pack([{"content": "x" * 100000}, {"content": "y"}], 1000) == [[0], [1]]
+
+
+def test_pack_tokens_from_node_data_are_coerced():
+    assert _pack_tokens({"packTokens": "4000"}) == 4000
+    assert _pack_tokens({"packTokens": 0}) == 0
+    assert _pack_tokens({}) is None
+    assert _pack_tokens({"packTokens": "lots"}) is None
+    assert _pack_tokens({"packTokens": [1]}) is None
+
+
+def test_packing_cuts_requests_and_keeps_the_output_shape():
+    model = PackingModel()
+    agent = AIAgent(client=GeminiClient(model=model), cache=None)
+    result = asyncio.run(agent.process_multiple_articles(articles(40), pack_tokens=16000))
+
+    assert model.calls == 2  # one packed prompt plus the combined overview
+    summaries = result["individual_summaries"]
+    assert [s["article_title"] for s in summaries] == [f"T{i}" for i in range(40)]
+    assert [s["summary"] for s in summaries] == [f"packed {i}" for i in range(40)]
+    assert result["combined_summary"] == {"overview": "o"}
+
+
+def test_articles_missing_from_a_packed_response_fall_back_to_single_calls():
+    model = PackingModel(drop={"2", "5"})
+    agent = AIAgent(client=GeminiClient(model=model), cache=None)
+    result = asyncio.run(agent.process_multiple_articles(articles(6), pack_tokens=16000))
+
+    assert model.calls == 4
+    assert [s["summary"] for s in result["individual_summaries"]] == [
+        "packed 0", "packed 1", "single", "packed 3", "packed 4", "single",
+    ]
@@ -0,0 +1,104 @@
+"""Tests for keyset pagination of the list endpoints."""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.api import runs, workflows
+from app.api.pagination import encode_cursor
+from app.models.run import RunStatus, WorkflowRun
+from app.models.workflow import Workflow, WorkflowVersion
+from tests.conftest import api_client
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def db(db):
+    for w in range(3):
+        db.add(Workflow(id=f"wf-{w}", name=f"Workflow {w}", created_at=START + timedelta(minutes=w)))
+        for v in range(1, 4):
+            db.add(WorkflowVersion(id=f"wf-{w}-v{v}", workflow_id=f"wf-{w}", version=v, definition={"nodes": []}))
+    for i in range(25):
+        db.add(WorkflowRun(
+            id=f"run-{i:02d}", workflow_id=f"wf-{i % 2}", workflow_version_id=f"wf-{i % 2}-v1",
+            status=RunStatus.FAILED if i % 5 == 0 else RunStatus.COMPLETED,
+            trigger_data={"payload": "x" * 100},
+            # Pairs of runs share a timestamp so the id breaks ties
+            started_at=START + timedelta(seconds=i // 2),
+        ))
+    db.commit()
+    return db
+
+
+@pytest.fixture
+def client(db, Session):
+    return api_client(Session, {"/api/workflows": workflows.router, "/api/runs": runs.router})
+
+
+def walk(client, url, key):
+    items, cursor = [], None
+    while True:
+        sep = "&" if "?" in url else "?"
+        page = client.get(f"{url}{sep}cursor={cursor}" if cursor else url).json()
+        items.extend(page[key])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def test_run_pages_cover_every_run_once_in_order(client):
+    ids = [run["id"] for run in walk(client, "/api/runs/?limit=4", "runs")]
+    assert ids == [f"run-{i:02d}" for i in reversed(range(25))]
+
+
+def test_run_filters_combine_with_pagination(client):
+    failed = walk(client, "/api/runs/?limit=2&status=failed&workflow_id=wf-0", "runs")
+    assert [r["id"] for r in failed] == ["run-20", "run-10", "run-00"]
+    assert client.get("/api/runs/?status=bogus").status_code == 422
+
+
+def test_rows_inserted_meanwhile_do_not_shift_pages(client, db):
+    first = client.get("/api/runs/?limit=5").json()
+    db.add(WorkflowRun(id="run-new", workflow_id="wf-0", workflow_version_id="wf-0-v1",
+                       status=RunStatus.PENDING, started_at=START + timedelta(days=1)))
+    db.commit()
+    second = client.get(f"/api/runs/?limit=5&cursor={first['next_cursor']}").json()
+    assert [r["id"] for r in second["runs"]] == [f"run-{i:02d}" for i in range(19, 14, -1)]
+
+
+def test_list_queries_never_load_json_columns(client, engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    client.get("/api/runs/?limit=5")
+    client.get("/api/workflows/wf-0/versions")
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert selects
+    assert not any("trigger_data" in s or "definition" in s for s in selects)
+
+
+def test_legacy_all_flag_keeps_the_old_shapes(client):
+    assert len(client.get("/api/runs/?all=true").json()["runs"]) == 25
+    assert "next_cursor" not in client.get("/api/runs/?all=true").json()
+    workflows_list = client.get("/api/workflows/?all=true").json()
+    assert [w["id"] for w in workflows_list] == ["wf-2", "wf-1", "wf-0"]
+    versions = client.get("/api/workflows/wf-1/versions?all=true").json()
+    assert [v["version"] for v in versions] == [3, 2, 1]
+    assert versions[0]["definition"] == {"nodes": []}
+
+
+def test_workflow_and_version_pages(client):
+    assert [w["id"] for w in walk(client, "/api/workflows/?limit=2", "workflows")] == ["wf-2", "wf-1", "wf-0"]
+    versions = walk(client, "/api/workflows/wf-0/versions?limit=2", "versions")
+    assert [v["version"] for v in versions] == [3, 2, 1]
+    assert "definition" not in versions[0]
+
+
+def test_bad_cursors_are_rejected(client):
+    assert client.get("/api/runs/?cursor=not-a-cursor").status_code == 400
+    assert client.get(f"/api/runs/?cursor={encode_cursor([1])}").status_code == 400
@@ -0,0 +1,162 @@
+"""Query-plan regression tests: hot API queries must use an index.
+
+Seeds a synthetic dataset in SQLite, calls the endpoints, captures the SQL
+they issue and checks ``EXPLAIN QUERY PLAN`` for each statement touching a
+hot table: it must search an index, never scan the table.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.api import runs, workflows
+from app.models.run import NodeExecution, NodeStatus, RunStatus, WorkflowRun
+from app.models.workflow import Workflow, WorkflowVersion
+from tests.conftest import api_client, make_engine
+
+WORKFLOWS = 200
+VERSIONS = 5
+RUNS = 20_000
+NODES_PER_RUN = 5
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = make_engine(tmp_path_factory.mktemp("plans") / "seed.db")
+    with engine.begin() as conn:
+        conn.execute(insert(Workflow), [
+            {"id": f"wf-{w}", "name": f"Workflow {w}", "created_at": START} for w in range(WORKFLOWS)
+        ])
+        conn.execute(insert(WorkflowVersion), [
+            {
+                "id": f"wf-{w}-v{v}", "workflow_id": f"wf-{w}", "version": v,
+                "definition": {"nodes": [], "edges": []}, "is_published": v % 2 == 1,
+            }
+            for w in range(WORKFLOWS) for v in range(1, VERSIONS + 1)
+        ])
+        conn.execute(insert(WorkflowRun), [
+            {
+                "id": f"run-{r}", "workflow_id": f"wf-{r % WORKFLOWS}",
+                "workflow_version_id": f"wf-{r % WORKFLOWS}-v1",
+                "status": RunStatus.COMPLETED, "started_at": START + timedelta(seconds=r),
+                "claim_count": 0,
+            }
+            for r in range(RUNS)
+        ])
+        conn.execute(insert(NodeExecution), [
+            {
+                "id": f"ex-{r}-{n}", "run_id": f"run-{r}", "node_id": f"n{n}", "node_type": "action",
+                "status": NodeStatus.SUCCESS, "started_at": START + timedelta(seconds=r, milliseconds=n),
+            }
+            for r in range(RUNS) for n in range(NODES_PER_RUN)
+        ])
+        conn.execute(text("ANALYZE"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def client(engine):
+    return api_client(sessionmaker(bind=engine), {"/api/workflows": workflows.router, "/api/runs": runs.router})
+
+
+@pytest.fixture
+def plans(engine):
+    """Calls made inside ``with plans(table) as seen`` record the query plan
+    of every SELECT on ``table`` in ``seen``."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    class Recorder:
+        def __init__(self, table):
+            self.table = table
+            self.plans = []
+
+        def __enter__(self):
+            captured.clear()
+            event.listen(engine, "before_cursor_execute", capture)
+            return self.plans
+
+        def __exit__(self, *exc):
+            event.remove(engine, "before_cursor_execute", capture)
+            with engine.connect() as conn:
+                for statement, parameters in captured:
+                    if f"FROM {self.table}" not in statement:
+                        continue
+                    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                    self.plans.append(" | ".join(row[-1] for row in rows))
+
+    return Recorder
+
+
+def assert_indexed(seen, table, index=None):
+    assert seen, f"no query on {table} was issued"
+    for plan in seen:
+        assert f"SCAN {table}" not in plan, plan
+        assert f"SEARCH {table}" in plan, plan
+        if index:
+            assert index in plan, plan
+
+
+def test_run_details_search_executions_by_run(client, plans):
+    with plans("node_executions") as seen:
+        response = client.get("/api/runs/run-12345")
+    assert len(response.json()["node_executions"]) == NODES_PER_RUN
+    assert_indexed(seen, "node_executions", "ix_node_executions_run_id_started_at")
+
+
+def test_workflow_details_search_runs_and_published_versions(client, plans):
+    with plans("workflow_runs") as seen_runs:
+        response = client.get("/api/workflows/wf-7/details")
+    assert len(response.json()["recent_runs"]) == 10
+    assert_indexed(seen_runs, "workflow_runs", "ix_workflow_runs_workflow_id_started_at")
+
+    with plans("workflow_versions") as seen_versions:
+        client.get("/api/workflows/wf-7/details")
+    assert_indexed(seen_versions, "workflow_versions", "ix_workflow_versions_workflow_id_is_published_version")
+
+
+def test_starting_a_run_searches_the_latest_published_version(client, plans, monkeypatch):
+    async def started(run, db):
+        return "started"
+
+    monkeypatch.setattr(runs, "_start_execution", started)
+    with plans("workflow_versions") as seen:
+        response = client.post("/api/runs/", json={"workflow_id": "wf-3", "trigger_data": {}})
+    assert response.status_code == 200
+    assert_indexed(seen, "workflow_versions", "ix_workflow_versions_workflow_id_is_published_version")
+
+
+def test_filtered_run_pages_search_by_workflow(client, plans):
+    with plans("workflow_runs") as seen:
+        page = client.get("/api/runs/?workflow_id=wf-9&limit=20").json()
+        client.get(f"/api/runs/?workflow_id=wf-9&limit=20&cursor={page['next_cursor']}")
+    assert_indexed(seen, "workflow_runs", "ix_workflow_runs_workflow_id_started_at")
+
+
+def test_versions_list_and_numbering_search_by_workflow(client, plans):
+    with plans("workflow_versions") as seen:
+        client.get("/api/workflows/wf-11/versions")
+        response = client.post("/api/workflows/wf-11/versions", json={"nodes": [], "edges": []})
+    assert response.json()["version"] == VERSIONS + 1
+    assert_indexed(seen, "workflow_versions")
+
+
+def test_version_numbers_are_unique_per_workflow(engine):
+    from sqlalchemy.exc import IntegrityError
+
+    db = sessionmaker(bind=engine)()
+    db.add(WorkflowVersion(id="dup", workflow_id="wf-0", version=1, definition={}))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.close()
@@ -0,0 +1,73 @@
+"""Tests for the Gemini RPM/TPM rate limiter."""
+
+import asyncio
+import os
+import sys
+import time
+
+import redis
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.llm_client import GeminiClient
+from app.services.rate_limiter import RateLimiter, track_rate_limit_wait
+from tests.test_llm_client import FakeModel
+
+
+class BrokenRedis:
+    def register_script(self, script):
+        def run(keys, args):
+            raise redis.ConnectionError("down")
+        return run
+
+
+def test_burst_up_to_the_limit_then_callers_queue():
+    limiter = RateLimiter(rpm=600, tpm=0, redis_client=None)  # 10 per second
+
+    async def run():
+        start = time.perf_counter()
+        waits = await asyncio.gather(*(limiter.acquire() for _ in range(605)))
+        return waits, time.perf_counter() - start
+
+    waits, elapsed = asyncio.run(run())
+    assert waits[:600] == [0.0] * 600
+    # Later callers are queued in arrival order, 0.1s apart
+    assert [round(w, 1) for w in waits[600:]] == [0.1, 0.2, 0.3, 0.4, 0.5]
+    assert 0.45 < elapsed < 1.0
+    assert limiter.stats()["delayed"] == 5
+
+
+def test_token_bucket_limits_large_prompts():
+    limiter = RateLimiter(rpm=0, tpm=6000, redis_client=None)  # 100 tokens per second
+
+    async def run():
+        await limiter.acquire(6000)
+        return await limiter.acquire(20)
+
+    assert 0.15 < asyncio.run(run()) < 0.25
+
+
+def test_waits_are_reported_to_the_enclosing_node():
+    limiter = RateLimiter(rpm=600, tpm=0, redis_client=None)
+    client = GeminiClient(model=FakeModel(delay=0), rate_limiter=limiter)
+
+    async def run():
+        await asyncio.gather(*(limiter.acquire() for _ in range(600)))
+        with track_rate_limit_wait() as waited:
+            # Tasks spawned inside the block report to the same meter
+            await asyncio.gather(*(asyncio.create_task(client.generate("x")) for _ in range(2)))
+        return waited
+
+    waited = asyncio.run(run())
+    assert waited.calls == 2
+    assert 0.25 < waited.seconds < 0.35  # 0.1s + 0.2s
+
+
+def test_redis_errors_fall_back_to_local_buckets():
+    limiter = RateLimiter(rpm=60, tpm=0, redis_client=BrokenRedis())
+
+    async def run():
+        return [await limiter.acquire() for _ in range(3)]
+
+    assert asyncio.run(run()) == [0.0, 0.0, 0.0]
+    assert limiter.stats()["errors"] == 3
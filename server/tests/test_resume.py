@@ -0,0 +1,148 @@
+"""Tests for resuming runs from stored node executions."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.api import runs
+from app.models.run import NodeExecution, NodeStatus, RunStatus, WorkflowRun
+from app.models.workflow import Workflow, WorkflowVersion
+from app.services.workflow_executor import WorkflowExecutor
+from tests.conftest import api_client
+
+DEFINITION = {
+    "nodes": [
+        {"id": "t", "type": "trigger", "data": {}},
+        {"id": "cond", "type": "condition", "data": {}},
+        {"id": "yes", "type": "action", "data": {}},
+        {"id": "no", "type": "action", "data": {}},
+        {"id": "flaky", "type": "action", "data": {}},
+        {"id": "out", "type": "output", "data": {}},
+    ],
+    "edges": [
+        {"source": "t", "target": "cond"},
+        {"source": "cond", "target": "yes", "sourceHandle": "true"},
+        {"source": "cond", "target": "no", "sourceHandle": "false"},
+        {"source": "yes", "target": "flaky"},
+        {"source": "flaky", "target": "out"},
+    ],
+}
+
+
+@pytest.fixture
+def db(db):
+    db.add(Workflow(id="wf", name="wf"))
+    db.add(WorkflowVersion(id="resume-v1", workflow_id="wf", version=1, definition=DEFINITION))
+    db.add(WorkflowRun(id="run", workflow_id="wf", workflow_version_id="resume-v1", status=RunStatus.PENDING))
+    db.commit()
+    return db
+
+
+class CountingExecutor(WorkflowExecutor):
+    """Executes nodes as stubs, failing ``flaky`` while ``fail`` is set."""
+
+    def __init__(self, db, fail):
+        super().__init__(db, max_concurrency=1, http_client=object(), ai_agent=object(), article_fetcher=object())
+        self.fail = fail
+        self.calls = []
+
+    async def _dispatch(self, node, node_type, trigger_data, results, resolved=None):
+        self.calls.append(node["id"])
+        if node["id"] == "flaky" and self.fail:
+            raise RuntimeError("upstream blip")
+        if node_type == "condition":
+            return {"matched_path": "true"}
+        return {"node": node["id"], "seen": sorted(results)}
+
+
+def rows(db, node_id):
+    return db.query(NodeExecution).filter(NodeExecution.node_id == node_id).order_by(NodeExecution.started_at).all()
+
+
+def test_resume_runs_only_unfinished_nodes(db):
+    first = CountingExecutor(db, fail=True)
+    asyncio.run(first.execute_workflow("run"))
+    assert first.calls == ["t", "cond", "yes", "flaky", "out"]
+    assert rows(db, "flaky")[0].status == NodeStatus.FAILED
+
+    second = CountingExecutor(db, fail=False)
+    result = asyncio.run(second.execute_workflow("run"))
+    assert second.calls == ["flaky", "out"]
+    # Restored results are visible to re-executed nodes; the skip is kept
+    assert result["results"]["flaky"]["seen"] == ["cond", "t", "yes"]
+    assert [r.status for r in rows(db, "no")] == [NodeStatus.SKIPPED]
+    assert [(r.status, r.retry_count) for r in rows(db, "flaky")] == [
+        (NodeStatus.FAILED, 0), (NodeStatus.SUCCESS, 1),
+    ]
+    assert db.get(WorkflowRun, "run").status == RunStatus.COMPLETED
+
+
+def test_executions_left_running_are_marked_interrupted(db):
+    asyncio.run(CountingExecutor(db, fail=False).execute_workflow("run"))
+    # Simulate a crash while "out" was executing
+    out = rows(db, "out")[0]
+    out.status = NodeStatus.RUNNING
+    db.commit()
+
+    resumed = CountingExecutor(db, fail=False)
+    asyncio.run(resumed.execute_workflow("run"))
+    assert resumed.calls == ["out"]
+    history = rows(db, "out")
+    assert [(r.status, r.error_message) for r in history] == [
+        (NodeStatus.FAILED, "Interrupted"), (NodeStatus.SUCCESS, None),
+    ]
+
+
+class FakeRunExecutor:
+    def __init__(self, owned=()):
+        self.owned = set(owned)
+        self.submitted = []
+
+    def owns(self, run_id):
+        return run_id in self.owned
+
+    def submit(self, run_id):
+        self.submitted.append(run_id)
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    """Background backend whose executor owns ``run``."""
+    executor = FakeRunExecutor(owned={"run"})
+    monkeypatch.setattr(runs.settings, "RUN_BACKEND", "background")
+    monkeypatch.setattr(runs, "run_queue", None)
+    monkeypatch.setattr(runs, "run_executor", executor)
+    return executor
+
+
+def test_pending_runs_no_backend_owns_can_be_forced(db, Session, executor):
+    client = api_client(Session, {"/api/runs": runs.router})
+    assert client.post("/api/runs/run/resume").status_code == 409
+    # Still queued in this process
+    assert client.post("/api/runs/run/resume?force=true").status_code == 409
+
+    # Left over from a process that stopped
+    executor.owned.clear()
+    response = client.post("/api/runs/run/resume?force=true")
+    assert response.status_code == 200
+    assert response.json()["status"] == "pending"
+    assert executor.submitted == ["run"]
+
+
+def test_running_runs_a_backend_still_executes_are_not_forced(db, Session, executor):
+    db.get(WorkflowRun, "run").status = RunStatus.RUNNING
+    db.commit()
+    client = api_client(Session, {"/api/runs": runs.router})
+
+    response = client.post("/api/runs/run/resume?force=true")
+    assert response.status_code == 409
+    assert executor.submitted == []
+
+    # The executor that ran it has gone away
+    executor.owned.clear()
+    assert client.post("/api/runs/run/resume?force=true").status_code == 200
+    assert executor.submitted == ["run"]
@@ -0,0 +1,170 @@
+"""Tests for retry policies, node timeouts and retried Gemini calls."""
+
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.models.run import NodeExecution, NodeStatus, RunStatus, WorkflowRun
+from app.models.workflow import Workflow, WorkflowVersion
+from app.services.llm_client import GeminiClient
+from app.services.retry import RetryPolicy, call_with_retry, is_retryable
+from app.services.workflow_executor import WorkflowExecutor
+from tests.test_llm_client import FakeResponse
+
+FAST = {"backoff": 0.01, "jitter": False}
+
+
+def test_policy_from_node_data():
+    assert RetryPolicy.from_node({}).attempts == 1
+    assert RetryPolicy.from_node({"retry": 4}).attempts == 4
+    policy = RetryPolicy.from_node({"retry": {"attempts": 3, "backoff": 2, "max_backoff": 5, "jitter": False}})
+    assert [policy.delay(i) for i in (1, 2, 3)] == [2, 4, 5]
+    assert RetryPolicy.from_node({"retry": "lots"}).attempts == 1
+
+
+def test_jitter_stays_within_half_and_full_delay():
+    policy = RetryPolicy(attempts=5, backoff=1, max_backoff=8)
+    for retry in range(1, 6):
+        base = min(8, 2 ** (retry - 1))
+        assert all(base / 2 <= policy.delay(retry) <= base for _ in range(50))
+
+
+def test_only_transient_errors_are_retryable():
+    request = httpx.Request("GET", "https://example.com")
+    assert is_retryable(TimeoutError())
+    assert is_retryable(httpx.ConnectTimeout("slow", request=request))
+    assert is_retryable(google_exceptions.TooManyRequests("quota"))
+    assert is_retryable(google_exceptions.ServiceUnavailable("down"))
+    assert not is_retryable(google_exceptions.InvalidArgument("bad prompt"))
+    assert not is_retryable(ValueError("URL validation failed"))
+
+
+def test_call_with_retry_gives_up_after_the_last_attempt():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError) as info:
+        asyncio.run(call_with_retry(flaky, RetryPolicy(attempts=3, backoff=0.01)))
+    assert len(calls) == 3
+    assert info.value.retries == 2
+
+
+# ── Executor integration ────────────────────────────────────────────────────
+
+
+def run_node(db, node_data, dispatch, node_type="action"):
+    definition = {
+        "nodes": [{"id": "n", "type": node_type, "data": node_data}],
+        "edges": [],
+    }
+    db.add(Workflow(id="wf", name="wf"))
+    db.add(WorkflowVersion(id=f"retry-{id(dispatch)}", workflow_id="wf", version=1, definition=definition))
+    db.add(WorkflowRun(id="run", workflow_id="wf", workflow_version_id=f"retry-{id(dispatch)}", status=RunStatus.PENDING))
+    db.commit()
+
+    class Executor(WorkflowExecutor):
+        async def _dispatch(self, node, node_type, trigger_data, results, resolved=None):
+            return await dispatch()
+
+    executor = Executor(db, max_concurrency=1, http_client=object(), ai_agent=object(), article_fetcher=object())
+    result = asyncio.run(executor.execute_workflow("run"))
+    return result["results"]["n"], db.query(NodeExecution).filter(NodeExecution.node_id == "n").one()
+
+
+def test_node_retries_transient_errors_and_records_the_count(db):
+    failures = [TimeoutError("slow"), ConnectionError("reset")]
+
+    async def dispatch():
+        if failures:
+            raise failures.pop(0)
+        return {"ok": True}
+
+    result, row = run_node(db, {"retry": {"attempts": 3, **FAST}}, dispatch)
+    assert result == {"ok": True}
+    assert (row.status, row.retry_count) == (NodeStatus.SUCCESS, 2)
+
+
+def test_permanent_errors_are_not_retried(db):
+    calls = []
+
+    async def dispatch():
+        calls.append(1)
+        raise ValueError("bad input")
+
+    result, row = run_node(db, {"retry": {"attempts": 3, **FAST}}, dispatch)
+    assert len(calls) == 1
+    assert result["error"] == "bad input"
+    assert (row.status, row.retry_count) == (NodeStatus.FAILED, 0)
+
+
+def test_node_timeout_applies_per_attempt(db):
+    async def dispatch():
+        await asyncio.sleep(5)
+
+    result, row = run_node(db, {"timeout": 0.05, "retry": {"attempts": 2, **FAST}}, dispatch)
+    assert "timed out after 0.05s" in result["error"]
+    assert (row.status, row.retry_count) == (NodeStatus.FAILED, 1)
+
+
+def test_http_nodes_retry_5xx_responses_and_keep_the_last_one(db):
+    responses = [503, 503, 502]
+
+    async def dispatch():
+        return {"status_code": responses.pop(0), "success": False}
+
+    result, row = run_node(db, {"retry": {"attempts": 3, **FAST}}, dispatch, node_type="http")
+    assert result["status_code"] == 502
+    assert not responses
+    assert (row.status, row.retry_count) == (NodeStatus.SUCCESS, 2)
+
+
+# ── Gemini client ───────────────────────────────────────────────────────────
+
+
+class QuotaModel:
+    """Answers 429 for the first ``failures`` calls."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def generate_content(self, prompt, request_options=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise google_exceptions.ResourceExhausted("quota exceeded")
+        return FakeResponse("ok")
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    async def acquire(self, tokens):
+        self.acquired += 1
+        return 0.0
+
+
+def test_gemini_calls_retry_quota_errors_through_the_rate_limiter():
+    limiter = CountingLimiter()
+    client = GeminiClient(
+        model=QuotaModel(failures=2), max_concurrency=1, rate_limiter=limiter,
+        retry_policy=RetryPolicy(attempts=3, backoff=0.01),
+    )
+    assert asyncio.run(client.generate("hello")) == "ok"
+    assert limiter.acquired == 3
+
+    client = GeminiClient(
+        model=QuotaModel(failures=5), max_concurrency=1, rate_limiter=CountingLimiter(),
+        retry_policy=RetryPolicy(attempts=2, backoff=0.01),
+    )
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        asyncio.run(client.generate("hello"))
@@ -0,0 +1,126 @@
+"""Tests for the in-process run executor service."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.run_executor import ExecutorFull, RunExecutorService
+
+
+class RecordingService(RunExecutorService):
+    """Runs sleep instead of executing workflows; records their event loops."""
+
+    def __init__(self, delay=0.1, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.loops = set()
+        self.peak = 0
+        self.finished = []
+        self.failed = []
+
+    def _fail_queued(self, run_ids):
+        self.failed.extend(run_ids)
+
+    async def _execute(self, run_id):
+        self.loops.add(id(asyncio.get_running_loop()))
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.finished.append(run_id)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_runs_share_one_loop_up_to_the_concurrency_limit():
+    service = RecordingService(max_runs=3, queue_size=10)
+    service.start()
+    try:
+        for i in range(9):
+            service.submit(f"run-{i}")
+        assert service.stats()["queued"] + service.stats()["active"] == 9
+        assert service.owns("run-8")
+        wait_for(lambda: len(service.finished) == 9)
+        wait_for(lambda: service.stats()["completed"] == 9)
+        assert not service.owns("run-8")
+    finally:
+        service.shutdown()
+    assert len(service.loops) == 1
+    assert service.peak == 3
+    assert service.stats()["completed"] == 9
+
+
+def test_admission_is_bounded():
+    service = RecordingService(delay=0.5, max_runs=2, queue_size=1)
+    service.start()
+    try:
+        for i in range(3):
+            service.submit(f"run-{i}")
+        with pytest.raises(ExecutorFull):
+            service.submit("run-3")
+        assert service.stats()["rejected"] == 1
+    finally:
+        service.shutdown(grace=0)
+
+
+def test_submissions_from_many_threads():
+    service = RecordingService(delay=0.01, max_runs=4, queue_size=100)
+    service.start()
+    try:
+        threads = [
+            threading.Thread(target=lambda n=n: [service.submit(f"{n}-{i}") for i in range(10)])
+            for n in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wait_for(lambda: len(service.finished) == 50)
+    finally:
+        service.shutdown()
+    assert len(service.finished) == 50
+
+
+def test_shutdown_cancels_runs_past_the_grace_period():
+    service = RecordingService(delay=10, max_runs=1, queue_size=1)
+    service.start()
+    service.submit("slow")
+    service.submit("queued")
+    wait_for(lambda: service.active == 1)
+    start = time.perf_counter()
+    service.shutdown(grace=0.1)
+    assert time.perf_counter() - start < 2
+    assert service.finished == []
+    # Nothing else would start it: left FAILED so it can be resumed
+    assert service.failed == ["queued"]
+    assert not service.owns("queued")
+    with pytest.raises(RuntimeError):
+        service.submit("late")
+
+
+def test_runs_use_an_http_client_on_the_executor_loop():
+    class ClientLoopService(RecordingService):
+        async def _execute(self, run_id):
+            self.loops.add(asyncio.get_running_loop() is self.http_client._loop)
+            self.finished.append(run_id)
+
+    service = ClientLoopService(max_runs=2, queue_size=10)
+    service.start()
+    try:
+        assert service.http_client.started
+        for i in range(4):
+            service.submit(f"run-{i}")
+        wait_for(lambda: len(service.finished) == 4)
+    finally:
+        service.shutdown()
+    # Requests run on the pool's own loop instead of hopping to another
+    assert service.loops == {True}
+    assert not service.http_client.started
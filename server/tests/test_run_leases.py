@@ -0,0 +1,136 @@
+"""Tests for lease-based run claiming (RUN_BACKEND=postgres)."""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.db import session as session_module
+from app.models.run import RunStatus, WorkflowRun
+from app.models.workflow import Workflow, WorkflowVersion
+from app.services.run_leases import claim_runs, reap_expired, release_lease, renew_leases
+from app.worker import LeaseWorker
+
+
+@pytest.fixture
+def Session(Session, monkeypatch):
+    monkeypatch.setattr(session_module, "SessionLocal", Session)
+    return Session
+
+
+def add_runs(Session, n):
+    db = Session()
+    db.add(Workflow(id="wf", name="wf"))
+    db.add(WorkflowVersion(id="v1", workflow_id="wf", version=1, definition={}))
+    start = datetime.utcnow()
+    for i in range(n):
+        db.add(WorkflowRun(
+            id=f"run-{i}", workflow_id="wf", workflow_version_id="v1",
+            status=RunStatus.PENDING, started_at=start + timedelta(seconds=i),
+        ))
+    db.commit()
+    db.close()
+
+
+def statuses(Session):
+    db = Session()
+    try:
+        return {run.id: run.status for run in db.query(WorkflowRun)}
+    finally:
+        db.close()
+
+
+def test_claims_are_exclusive_and_oldest_first(Session):
+    add_runs(Session, 5)
+    first = claim_runs(Session(), "w1", 3, 60)
+    second = claim_runs(Session(), "w2", 3, 60)
+    assert first == ["run-0", "run-1", "run-2"]
+    assert second == ["run-3", "run-4"]
+    assert set(statuses(Session).values()) == {RunStatus.RUNNING}
+
+
+def test_only_the_owner_renews_a_lease(Session):
+    add_runs(Session, 2)
+    claim_runs(Session(), "w1", 1, 60)
+    claim_runs(Session(), "w2", 1, 60)
+    assert renew_leases(Session(), "w1", ["run-0", "run-1"], 60) == {"run-0"}
+    release_lease(Session(), "w1", "run-0")
+    assert renew_leases(Session(), "w1", ["run-0"], 60) == set()
+
+
+def test_expired_leases_are_requeued_then_failed(Session):
+    add_runs(Session, 1)
+    assert claim_runs(Session(), "w1", 1, -1) == ["run-0"]  # already expired
+    assert reap_expired(Session(), max_claims=2) == (1, 0)
+    assert statuses(Session)["run-0"] == RunStatus.PENDING
+
+    assert claim_runs(Session(), "w2", 1, -1) == ["run-0"]
+    assert reap_expired(Session(), max_claims=2) == (0, 1)
+    assert statuses(Session)["run-0"] == RunStatus.FAILED
+
+
+def test_worker_executes_claimed_runs_concurrently(Session):
+    add_runs(Session, 6)
+    active = peak = 0
+    done = []
+
+    async def execute(run_id):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        done.append(run_id)
+
+    async def run():
+        worker = LeaseWorker(concurrency=3, lease_seconds=30, poll_interval=0.02, execute=execute)
+        task = asyncio.create_task(worker.serve())
+        deadline = time.monotonic() + 5
+        while len(done) < 6 and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await task
+
+    asyncio.run(run())
+    assert sorted(done) == [f"run-{i}" for i in range(6)]
+    assert peak == 3
+    db = Session()
+    assert all(run.lease_owner is None for run in db.query(WorkflowRun))
+    db.close()
+
+
+def test_worker_cancels_runs_whose_lease_was_lost(Session):
+    add_runs(Session, 1)
+    cancelled = []
+
+    async def execute(run_id):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(run_id)
+            raise
+
+    async def run():
+        worker = LeaseWorker(concurrency=1, lease_seconds=0.15, poll_interval=0.02, execute=execute)
+        task = asyncio.create_task(worker.serve())
+        await asyncio.sleep(0.03)
+        # Another worker took the run over
+        db = Session()
+        db.query(WorkflowRun).update({"lease_owner": "someone-else"})
+        db.commit()
+        db.close()
+        deadline = time.monotonic() + 2
+        while not cancelled and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await task
+        return worker
+
+    worker = asyncio.run(run())
+    assert cancelled == ["run-0"]
+    assert worker.lost == 1
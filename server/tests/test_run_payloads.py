@@ -0,0 +1,96 @@
+"""Tests for run-scoped, deduplicated storage of node inputs."""
+
+import asyncio
+import os
+import sys
+
+from sqlalchemy import func
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.api import runs
+from app.models.run import NodeExecution, RunPayload, RunStatus, WorkflowRun
+from app.models.workflow import Workflow, WorkflowVersion
+from app.services.run_payloads import PAYLOAD_KEY, TRIGGER_REF, PayloadEncoder, expand
+from app.services import workflow_executor
+from app.services.workflow_executor import WorkflowExecutor
+from tests.conftest import api_client
+
+BLOB = "x" * 50_000
+ACTIONS = 10
+
+
+def test_large_values_are_referenced_and_stored_once_per_run():
+    encoder = PayloadEncoder(inline_bytes=100)
+    shared = {"items": list(range(100))}
+    first = encoder.encode("run", {"big": shared, "small": "ok"})
+    second = encoder.encode("run", {"again": shared, "copy": {"items": list(range(100))}})
+    other_run = encoder.encode("other", {"big": shared})
+
+    assert first["small"] == "ok"
+    digest = first["big"][PAYLOAD_KEY]
+    assert second == {"again": {PAYLOAD_KEY: digest}, "copy": {PAYLOAD_KEY: digest}}
+    assert other_run == {"big": first["big"]}
+    assert [(row["run_id"], row["hash"]) for row in encoder._pending] == [("run", digest), ("other", digest)]
+    assert expand(second, {digest: shared}) == {"again": shared, "copy": shared}
+
+
+def run_fan_out(Session):
+    definition = {
+        "nodes": [{"id": "t", "type": "trigger", "data": {}}] + [
+            {"id": f"a{i}", "type": "action", "data": {"label": f"A{i}", "body": "{{trigger.blob}}"}}
+            for i in range(ACTIONS)
+        ] + [{"id": "x", "type": "transform", "data": {"template": "{{trigger.user}}"}}],
+        "edges": [{"source": "t", "target": f"a{i}"} for i in range(ACTIONS)] + [{"source": "t", "target": "x"}],
+    }
+    db = Session()
+    db.add(Workflow(id="wf", name="wf"))
+    db.add(WorkflowVersion(id="payloads-v1", workflow_id="wf", version=1, definition=definition))
+    db.add(WorkflowRun(id="run", workflow_id="wf", workflow_version_id="payloads-v1",
+                       status=RunStatus.PENDING, trigger_data={"blob": BLOB, "user": "ada"}))
+    db.commit()
+    executor = WorkflowExecutor(db, http_client=object(), ai_agent=object(), article_fetcher=object())
+    asyncio.run(executor.execute_workflow("run"))
+    return db
+
+
+def test_executions_store_resolved_inputs_and_share_the_payload(Session):
+    db = run_fan_out(Session)
+    assert db.query(func.count()).select_from(RunPayload).scalar() == 1
+    payload = db.query(RunPayload).one()
+    assert payload.data == BLOB
+
+    action = db.query(NodeExecution).filter(NodeExecution.node_id == "a3").one()
+    assert action.input_data == {"label": "A3", "body": {PAYLOAD_KEY: payload.hash}}
+    trigger = db.query(NodeExecution).filter(NodeExecution.node_id == "t").one()
+    # Trigger nodes point at the run's trigger data instead of copying it
+    assert trigger.input_data == TRIGGER_REF
+    # Handlers that resolve their own templates record the data as written
+    transform = db.query(NodeExecution).filter(NodeExecution.node_id == "x").one()
+    assert transform.input_data == {"template": "{{trigger.user}}"}
+    assert transform.output_data["output"] == "ada"
+    db.close()
+
+
+def test_node_data_is_rendered_once_per_execution(Session, monkeypatch):
+    rendered = []
+    original = workflow_executor._resolved_data
+
+    def counting(node_type, *args):
+        result = original(node_type, *args)
+        if result is not None:
+            rendered.append(node_type)
+        return result
+
+    monkeypatch.setattr(workflow_executor, "_resolved_data", counting)
+    db = run_fan_out(Session)
+    assert rendered == ["action"] * ACTIONS
+    db.close()
+
+
+def test_get_run_rebuilds_full_inputs(Session):
+    run_fan_out(Session).close()
+    client = api_client(Session, {"/api/runs": runs.router})
+    executions = {ex["node_id"]: ex for ex in client.get("/api/runs/run").json()["node_executions"]}
+    assert executions["t"]["input_data"] == {"blob": BLOB, "user": "ada"}
+    assert executions["a7"]["input_data"] == {"label": "A7", "body": BLOB}
@@ -0,0 +1,100 @@
+"""Tests for the Redis run queue, running its Lua scripts.
+
+Uses fakeredis with Lua support (``pip install "fakeredis[lua]"``) and is
+skipped without it.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from app.services.run_queue import RunQueue
+from app.worker import RunWorker
+
+
+@pytest.fixture
+def queue():
+    return RunQueue(fakeredis.FakeRedis(), name="test", visibility_timeout=0.2)
+
+
+def test_claims_are_fifo_and_acknowledged(queue):
+    for run_id in ("a", "b"):
+        queue.enqueue(run_id)
+    assert queue.claim() == ("a", 1)
+    assert queue.claim() == ("b", 1)
+    assert queue.claim() is None
+    assert queue.stats() == {"pending": 0, "processing": 2}
+
+    queue.ack("a")
+    assert queue.stats() == {"pending": 0, "processing": 1}
+    assert not queue.contains("a")
+    assert queue.contains("b")
+
+
+def test_expired_claims_are_redelivered(queue):
+    queue.enqueue("a")
+    queue.enqueue("b")
+    assert queue.claim() == ("a", 1)
+    time.sleep(0.3)
+    # The expired claim goes back ahead of runs that never were claimed
+    assert queue.claim() == ("a", 2)
+    assert not queue.extend("missing")
+
+
+def test_extending_keeps_a_claim(queue):
+    queue.enqueue("a")
+    queue.claim()
+    for _ in range(3):
+        time.sleep(0.1)
+        assert queue.extend("a")
+    assert queue.claim() is None
+
+    # Not renewed: delivered again, and the new claim can be renewed
+    time.sleep(0.3)
+    assert queue.claim() == ("a", 2)
+    assert queue.extend("a")
+
+
+def test_released_runs_are_delivered_again_right_away(queue):
+    queue.enqueue("a")
+    queue.enqueue("b")
+    queue.claim()
+    queue.release("a")
+    assert queue.claim() == ("a", 2)
+    queue.ack("a")
+    # Releasing a run that is no longer claimed does nothing
+    queue.release("a")
+    assert queue.claim() == ("b", 1)
+
+
+def test_worker_keeps_long_runs_claimed_until_acknowledged(queue):
+    executed = []
+
+    async def execute(run_id):
+        executed.append(run_id)
+        await asyncio.sleep(0.5)
+
+    async def serve():
+        worker = RunWorker(queue, concurrency=2, execute=execute)
+        task = asyncio.create_task(worker.serve())
+        deadline = time.monotonic() + 5
+        while worker.completed < 1 and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await task
+        return worker
+
+    queue.enqueue("a")
+    worker = asyncio.run(serve())
+    # Two consumers, a run longer than the visibility timeout: never run twice
+    assert executed == ["a"]
+    assert worker.lost == 0
+    assert queue.stats() == {"pending": 0, "processing": 0}
@@ -94,3 +94,72 @@ def test_hex_encoded_loopback():
     """http://0x7f000001/ == http://127.0.0.1/ — must be blocked."""
     with pytest.raises(ValueError):
         validate_url_for_ssrf("http://0x7f000001/")
+
+
+# ---------------------------------------------------------------------------
+# Blocked-range lookup and DNS cache
+# ---------------------------------------------------------------------------
+
+def test_interval_lookup_matches_linear_scan():
+    import ipaddress
+    import random
+    from app.core.security import _BLOCKED_NETWORKS, is_blocked_address
+
+    rng = random.Random(7)
+    samples = [ipaddress.IPv4Address(rng.getrandbits(32)) for _ in range(5000)]
+    samples += [ipaddress.IPv6Address(rng.getrandbits(128)) for _ in range(2000)]
+    for net in _BLOCKED_NETWORKS:
+        first, last = int(net.network_address), int(net.broadcast_address)
+        for value in (first - 1, first, last, last + 1):
+            if 0 <= value < 2 ** net.max_prefixlen:
+                samples.append(type(net.network_address)(value))
+    for ip in samples:
+        assert is_blocked_address(ip) == any(ip in net for net in _BLOCKED_NETWORKS), ip
+
+
+def test_ipv4_mapped_ipv6_is_blocked():
+    with pytest.raises(ValueError, match="not permitted"):
+        validate_url_for_ssrf("http://[::ffff:127.0.0.1]/")
+
+
+def _fake_resolver(table, calls):
+    def resolve(hostname, port):
+        calls.append(hostname)
+        return [(None, None, None, "", (ip, 0)) for ip in table[hostname]]
+    return resolve
+
+
+def test_resolution_is_cached_and_validated(monkeypatch):
+    from app.core import security
+
+    calls = []
+    cache = security.DnsCache(ttl=60, resolver=_fake_resolver(
+        {"public.test": ["93.184.216.34"], "rebind.test": ["93.184.216.34", "10.0.0.5"]}, calls,
+    ))
+    monkeypatch.setattr(security, "dns_cache", cache)
+
+    assert validate_url_for_ssrf("https://public.test/a") == ("93.184.216.34",)
+    assert validate_url_for_ssrf("https://public.test/b") == ("93.184.216.34",)
+    with pytest.raises(ValueError, match="not permitted"):
+        validate_url_for_ssrf("https://rebind.test/")
+    assert calls == ["public.test", "rebind.test"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_concurrent_async_lookups_share_one_resolution():
+    import asyncio
+    import time
+    from app.core.security import DnsCache
+
+    calls = []
+    slow = _fake_resolver({"slow.test": ["93.184.216.34"]}, calls)
+    cache = DnsCache(ttl=0, resolver=lambda h, p: (time.sleep(0.05), slow(h, p))[1])
+
+    async def run():
+        return await asyncio.gather(*(cache.lookup_async("slow.test") for _ in range(10)))
+
+    assert asyncio.run(run()) == [("93.184.216.34",)] * 10
+    assert calls == ["slow.test"]
+    # ttl=0 disables caching, so the next lookup resolves again
+    cache.lookup("slow.test")
+    assert calls == ["slow.test", "slow.test"]
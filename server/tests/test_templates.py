@@ -0,0 +1,78 @@
+"""Tests for the {{...}} template compiler against the original regex semantics."""
+
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.templates import compile_data, resolve_data, resolve_ref, resolve_value
+
+
+def legacy_resolve_value(value, trigger_data, results):
+    """The pre-compiler implementation, kept as the reference behaviour."""
+    if not isinstance(value, str):
+        return value
+
+    def replacer(m):
+        path = m.group(1).strip().split(".")
+        if path[0] == "trigger":
+            obj, keys = trigger_data, path[1:]
+        elif path[0] in results:
+            obj, keys = results[path[0]], path[1:]
+        else:
+            return m.group(0)
+        for k in keys:
+            obj = obj.get(k) if isinstance(obj, dict) else None
+        return str(obj) if obj is not None else ""
+
+    return re.sub(r"\{\{([^}]+)\}\}", replacer, value)
+
+
+TRIGGER = {"email": "a@b.c", "n": 5, "nested": {"list": [1, 2]}, "none": None}
+RESULTS = {"ai-1": {"reply": "Hi", "meta": {"score": 0.9}}, "http": {"body": {"ok": True}}}
+
+CASES = [
+    "plain text",
+    "",
+    "{{trigger.email}}",
+    "  {{ trigger.n }}  ",
+    "To: {{trigger.email}} / {{ai-1.reply}}",
+    "{{ai-1.meta.score}}{{ai-1.meta}}",
+    "{{unknown.field}} stays",
+    "{{trigger.none}}|{{trigger.missing.deep}}|",
+    "{{trigger}}",
+    "{{ }}",
+    "{{trigger.email} }}",
+    "{{http.body.ok}}",
+]
+
+
+@pytest.mark.parametrize("value", CASES)
+def test_resolve_value_matches_legacy(value):
+    assert resolve_value(value, TRIGGER, RESULTS) == legacy_resolve_value(value, TRIGGER, RESULTS)
+
+
+def test_resolve_ref_single_token_keeps_native_type():
+    assert resolve_ref("{{trigger.nested.list}}", TRIGGER, RESULTS) == [1, 2]
+    assert resolve_ref(" {{http.body}} ", TRIGGER, RESULTS) == {"ok": True}
+    assert resolve_ref("{{nope.x}}", TRIGGER, RESULTS) == "{{nope.x}}"
+    assert resolve_ref("n={{trigger.n}}", TRIGGER, RESULTS) == "n=5"
+
+
+def test_template_free_subtrees_are_not_copied():
+    static = {"headers": {"Accept": "json"}, "items": [1, "two", {"x": None}]}
+    data = {"label": "Send", "to": "{{trigger.email}}", "static": static}
+
+    assert resolve_data(static, TRIGGER, RESULTS) is static
+    resolved = resolve_data(data, TRIGGER, RESULTS)
+    assert resolved["to"] == "a@b.c"
+    assert resolved["static"] is static
+
+    compiled = compile_data(data)
+    rendered = compiled.render(TRIGGER, RESULTS)
+    assert rendered == resolved
+    assert rendered["static"] is static
+    assert compile_data(static).render(TRIGGER, RESULTS) is static
@@ -0,0 +1,112 @@
+"""Tests for the queue-consuming run worker."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import worker as worker_module
+from app.worker import RunWorker
+
+
+class MemoryQueue:
+    """In-memory stand-in for RunQueue with the same delivery semantics."""
+
+    name = "test"
+
+    def __init__(self, run_ids, visibility_timeout=300.0, claims_expire=False):
+        self.pending = list(run_ids)
+        self.visibility_timeout = visibility_timeout
+        self.claims_expire = claims_expire
+        self.deliveries = {}
+        self.acked = []
+        self.released = []
+        self.extended = []
+        self.lock = threading.Lock()
+
+    def claim(self):
+        with self.lock:
+            if not self.pending:
+                return None
+            run_id = self.pending.pop(0)
+            self.deliveries[run_id] = self.deliveries.get(run_id, 0) + 1
+            return run_id, self.deliveries[run_id]
+
+    def extend(self, run_id):
+        self.extended.append(run_id)
+        return not self.claims_expire
+
+    def ack(self, run_id):
+        self.acked.append(run_id)
+
+    def release(self, run_id):
+        self.released.append(run_id)
+        with self.lock:
+            self.pending.insert(0, run_id)
+
+
+async def serve_until(worker, condition, timeout=5.0):
+    task = asyncio.create_task(worker.serve())
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    worker.stop()
+    await task
+
+
+def test_runs_execute_concurrently_and_are_acknowledged():
+    queue = MemoryQueue([f"run-{i}" for i in range(6)])
+    active = peak = 0
+
+    async def execute(run_id):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+
+    worker = RunWorker(queue, concurrency=3, execute=execute)
+    asyncio.run(serve_until(worker, lambda: len(queue.acked) == 6))
+    assert sorted(queue.acked) == [f"run-{i}" for i in range(6)]
+    assert peak == 3
+
+
+def test_failed_executions_are_redelivered_then_abandoned(monkeypatch):
+    abandoned = []
+    monkeypatch.setattr(worker_module, "_abandon_run", lambda run_id, message: abandoned.append(run_id))
+    queue = MemoryQueue(["run-1"])
+
+    async def execute(run_id):
+        raise RuntimeError("database is down")
+
+    worker = RunWorker(queue, concurrency=1, execute=execute, max_deliveries=3)
+    asyncio.run(serve_until(worker, lambda: queue.acked))
+    assert queue.released == ["run-1"] * 3
+    assert abandoned == ["run-1"]
+    assert queue.acked == ["run-1"]
+
+
+def test_claims_are_renewed_while_a_run_executes():
+    queue = MemoryQueue(["run-1"], visibility_timeout=0.06)
+    worker = RunWorker(queue, concurrency=1, execute=lambda run_id: asyncio.sleep(0.2))
+    asyncio.run(serve_until(worker, lambda: queue.acked))
+    assert len(queue.extended) >= 3
+
+
+def test_runs_whose_claim_expired_are_cancelled():
+    queue = MemoryQueue(["run-1"], visibility_timeout=0.06, claims_expire=True)
+    finished = []
+
+    async def execute(run_id):
+        await asyncio.sleep(1)
+        finished.append(run_id)
+
+    worker = RunWorker(queue, concurrency=1, execute=execute)
+    asyncio.run(serve_until(worker, lambda: worker.lost))
+    # Another worker may have it now: neither finished, acknowledged nor released
+    assert worker.lost == 1
+    assert finished == []
+    assert queue.acked == [] and queue.released == []